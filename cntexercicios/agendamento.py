@@ -0,0 +1,426 @@
+"""
+Módulo com o agendamento da detecção dos pontos do corpo pelos contadores de exercícios,
+que decide em quais frames o detector de poses é executado e em qual região do frame,
+reutilizando os pontos do último frame inferido nos demais frames
+
+As heurísticas do agendamento (controle de movimento, amostragem adaptativa e recorte
+da região de interesse) podem alterar os pontos usados na contagem, e por isso ficam
+desativadas por padrão, sendo configuradas pela classe ConfigAgendamento
+"""
+
+from collections import deque
+
+import numpy as np
+
+__all__ = ["ConfigAgendamento", "AgendadorInferencia"]
+
+class ConfigAgendamento:
+    """
+    Configuração do agendamento da detecção dos pontos do corpo, passada aos contadores
+    pelo parâmetro "agendamento" (ver ContadorExercicios), com cada heurística ativada
+    pelo parâmetro de mesmo nome do construtor e ajustada pelos atributos de classe
+
+    O controle de movimento, ativado pelo parâmetro "controle_movimento", pula a
+    detecção dos pontos do corpo em frames sem movimento em relação ao último frame
+    em que os pontos foram detectados, reutilizando os pontos dele, exceto quando o
+    progresso do exercício está próximo de um dos limiares da contagem
+
+    A amostragem adaptativa, ativada pelo parâmetro "amostragem_adaptativa", estima a
+    frequência das repetições pelos tempos em que elas são contadas e detecta os pontos
+    do corpo apenas na frequência necessária para observar os limiares da contagem,
+    reutilizando os pontos nos frames intermediários, que na contagem sem janela de
+    arquivos de vídeo nem chegam a ser decodificados
+
+    O recorte da região de interesse, ativado pelo parâmetro "roi_inferencia", aplica
+    os filtros e detecta os pontos do corpo apenas na região do frame em volta dos pontos
+    detectados nos últimos frames inferidos, o que faz com que o custo deles dependa do
+    tamanho da pessoa e não do frame, voltando a usar o frame inteiro quando a pessoa
+    não é detectada com confiança
+    """
+
+    # parâmetros do controle de movimento, que reutiliza os pontos do corpo do último
+    # frame inferido quando os frames filtrados não mudaram (menos de FRACAO_MOVIMENTO dos
+    # pixels de uma grade com espaçamento PASSO_MOVIMENTO mudaram mais que LIMIAR_MOVIMENTO
+    # níveis), exceto quando o progresso do exercício está a menos de MARGEM_MOVIMENTO do
+    # limiar esperado pela contagem ou quando a inferência foi pulada em INTERVALO_MOVIMENTO
+    # frames seguidos
+    CONTROLE_MOVIMENTO  = False
+    PASSO_MOVIMENTO     = 4
+    LIMIAR_MOVIMENTO    = 25
+    FRACAO_MOVIMENTO    = 0.002
+    MARGEM_MOVIMENTO    = 0.1
+    INTERVALO_MOVIMENTO = 15
+
+    # parâmetros da amostragem adaptativa, que detecta os pontos do corpo a cada
+    # período de repetição / AMOSTRAS_REPETICAO frames (no máximo a cada PASSO_AMOSTRAGEM
+    # frames), com o período estimado pela mediana dos intervalos entre as últimas
+    # REPETICOES_AMOSTRAGEM repetições, desde que o progresso não possa alcançar o limiar
+    # esperado pela contagem nos frames pulados: o intervalo é limitado para que a distância
+    # até o limiar seja ao menos FATOR_MARGEM_AMOSTRAGEM vezes a maior variação do progresso
+    # por frame medida nos últimos QUADROS_VARIACAO frames inferidos multiplicada pelo
+    # intervalo, voltando a detectar os pontos em todos os frames perto do limiar, quando
+    # o progresso é inválido ou quando a repetição seguinte atrasa
+    AMOSTRAGEM_ADAPTATIVA   = False
+    AMOSTRAS_REPETICAO      = 6
+    PASSO_AMOSTRAGEM        = 8
+    REPETICOES_AMOSTRAGEM   = 4
+    FATOR_MARGEM_AMOSTRAGEM = 2.0
+    QUADROS_VARIACAO        = 30
+
+    # parâmetros do recorte da região de interesse, que aplica os filtros e detecta os
+    # pontos do corpo apenas na região em volta dos pontos dos últimos QUADROS_ROI frames
+    # inferidos, estendida em MARGEM_ROI do maior lado dela em cada direção, voltando a usar
+    # o frame inteiro quando a visibilidade média dos pontos fica abaixo de VISIBILIDADE_ROI
+    ROI_INFERENCIA   = False
+    MARGEM_ROI       = 0.25
+    VISIBILIDADE_ROI = 0.5
+    QUADROS_ROI      = 30
+
+    # fator de suavização da média móvel exponencial do tempo entre os frames processados,
+    # usado para converter o período das repetições em frames na amostragem adaptativa
+    SUAVIZACAO_PERIODO_FRAME = 0.1
+
+    def __init__(self, controle_movimento=None, amostragem_adaptativa=None, roi_inferencia=None):
+        """
+        Cria uma configuração do agendamento, com cada heurística ativada pelo parâmetro
+        de mesmo nome (por padrão o atributo de classe correspondente, desativado)
+        """
+        if controle_movimento is None:
+            controle_movimento = self.CONTROLE_MOVIMENTO
+
+        if amostragem_adaptativa is None:
+            amostragem_adaptativa = self.AMOSTRAGEM_ADAPTATIVA
+
+        if roi_inferencia is None:
+            roi_inferencia = self.ROI_INFERENCIA
+
+        self.controle_movimento    = bool(controle_movimento)
+        self.amostragem_adaptativa = bool(amostragem_adaptativa)
+        self.roi_inferencia        = bool(roi_inferencia)
+
+    def configuracao(self):
+        """
+        Retorna um dicionário serializável em JSON com os parâmetros das heurísticas
+        ativas (None nas heurísticas desativadas), que alteram os pontos detectados
+        """
+        movimento = amostragem = roi = None
+        if self.controle_movimento:
+            movimento = [
+                self.PASSO_MOVIMENTO, self.LIMIAR_MOVIMENTO, self.FRACAO_MOVIMENTO,
+                self.MARGEM_MOVIMENTO, self.INTERVALO_MOVIMENTO
+            ]
+        if self.amostragem_adaptativa:
+            amostragem = [
+                self.AMOSTRAS_REPETICAO, self.PASSO_AMOSTRAGEM, self.REPETICOES_AMOSTRAGEM,
+                self.FATOR_MARGEM_AMOSTRAGEM, self.QUADROS_VARIACAO
+            ]
+        if self.roi_inferencia:
+            roi = [self.MARGEM_ROI, self.VISIBILIDADE_ROI, self.QUADROS_ROI]
+        return {"movimento": movimento, "amostragem": amostragem, "roi": roi}
+
+    def __repr__(self):
+        return (
+            f"{type(self).__qualname__}(controle_movimento={self.controle_movimento}, "
+            f"amostragem_adaptativa={self.amostragem_adaptativa}, roi_inferencia={self.roi_inferencia})"
+        )
+
+class AgendadorInferencia:
+    """
+    Agendador da detecção dos pontos do corpo de um contador, que mantém o estado das
+    heurísticas ativas na configuração fornecida entre os frames de uma contagem
+
+    Enquanto o atributo "suspenso" for verdadeiro, os pontos são detectados em todos os
+    frames e no frame inteiro, como com todas as heurísticas desativadas, o que é usado
+    pelos contadores enquanto os pontos detectados são gravados no cache de pontos
+
+    O progresso do exercício é fornecido ao agendador como uma lista de tuplas (progresso,
+    distância até o limiar esperado pela contagem), uma por contador que recebe os pontos
+    (ver ContagemMultipla), com None nos contadores com progresso inválido, que são ignorados
+    (já que o exercício deles não está sendo feito), mas ao menos um contador deve ter um
+    progresso válido para que a detecção seja pulada
+    """
+
+    def __init__(self, config=None):
+        if config is None:
+            config = ConfigAgendamento()
+        elif not isinstance(config, ConfigAgendamento):
+            raise TypeError(
+                f"esperado ConfigAgendamento ou None para 'config', recebido tipo {type(config).__qualname__}"
+            )
+        self.config = config
+        self.suspenso = False
+
+        # detector de movimento do controle de movimento e a quantidade de inferências puladas seguidas
+        from cntexercicios.video import DetectorMovimento
+        self._detector_movimento = None
+        if config.controle_movimento:
+            self._detector_movimento = DetectorMovimento(
+                config.PASSO_MOVIMENTO, config.LIMIAR_MOVIMENTO, config.FRACAO_MOVIMENTO
+            )
+        self._puladas_seguidas = 0
+
+        # quantidade de frames restantes até a próxima detecção da amostragem adaptativa,
+        # o índice do último frame que ela agendou para ser pulado na contagem em estágios,
+        # cujos filtros não precisam ser aplicados, o tempo médio entre os frames processados
+        # e a quantidade de frames lidos e o tempo do último frame usado na estimativa
+        self.amostras_restantes = 0
+        self.proxima_amostra    = 0
+        self._periodo_frame     = None
+        self._referencia_tempo  = None
+
+        # último progresso válido de cada contador, junto com a quantidade de frames lidos
+        # no frame em que ele foi calculado, e as variações do progresso por frame medidas
+        # entre os últimos frames inferidos, usadas para limitar o intervalo da amostragem
+        self._ultimos_progressos = {}
+        self._variacoes = {}
+
+        # região de interesse (x0, y0, x1, y1), em pixels do frame original, usada
+        # na filtragem e na detecção dos próximos frames, a região usada no frame
+        # filtrado atual, None quando o frame inteiro é usado, e as caixas envolvendo
+        # os pontos dos últimos frames inferidos
+        self._roi       = None
+        self.roi_frame  = None
+        self._caixas_roi = deque(maxlen=config.QUADROS_ROI)
+
+    def reiniciar(self):
+        """
+        Reinicia o estado mantido entre os frames de uma contagem
+        """
+        if self._detector_movimento is not None:
+            self._detector_movimento.reiniciar()
+        self._puladas_seguidas = 0
+        self.amostras_restantes = self.proxima_amostra = 0
+        self._periodo_frame = self._referencia_tempo = None
+        self._ultimos_progressos.clear()
+        self._variacoes.clear()
+        self._roi = self.roi_frame = None
+        self._caixas_roi.clear()
+
+    @property
+    def ativo(self):
+        """
+        Se alguma heurística pode pular a detecção ou recortar o frame, o que faz com que
+        os pontos detectados dependam do agendamento e do progresso do exercício
+        """
+        config = self.config
+        return not self.suspenso and (
+            config.controle_movimento or config.amostragem_adaptativa or config.roi_inferencia
+        )
+
+    def configuracao(self):
+        """
+        Retorna os parâmetros das heurísticas ativas, ver ConfigAgendamento.configuracao
+        """
+        return self.config.configuracao()
+
+    def pular(self, frame, estados):
+        """
+        Verifica se a detecção dos pontos do corpo pode ser pulada no frame fornecido, seja
+        porque a amostragem adaptativa agendou a detecção para um frame posterior ou porque
+        o controle de movimento não detectou movimento desde o último frame inferido, o
+        parâmetro "estados" é uma função que retorna o progresso de cada contador (ver
+        AgendadorInferencia), chamada apenas quando necessário
+
+        O controle de movimento nunca pula a detecção quando o progresso de todos os
+        contadores é inválido ou nenhum corpo foi detectado no último frame, quando o
+        progresso está próximo do limiar esperado pela contagem, ou após INTERVALO_MOVIMENTO
+        frames pulados seguidos. Quando a detecção não é pulada, o frame passa a ser a
+        referência do controle de movimento
+        """
+        if self.suspenso:
+            self.amostras_restantes = 0
+            return False
+        if self.amostras_restantes > 0:
+            self.amostras_restantes -= 1
+            return True
+
+        detector = self._detector_movimento
+        if detector is None:
+            return False
+        # NOTE: os frames próximos de completar uma repetição (ou de reiniciá-la)
+        #       sempre são inferidos, para que a contagem não seja alterada
+        if (self._puladas_seguidas < self.config.INTERVALO_MOVIMENTO and
+            self._longe_limiares(estados(), self.config.MARGEM_MOVIMENTO) and
+            not detector.movimento(frame)):
+            self._puladas_seguidas += 1
+            return True
+        self._puladas_seguidas = 0
+        detector.atualizar(frame)
+        return False
+
+    @staticmethod
+    def _longe_limiares(estados, margem):
+        """
+        Verifica se o progresso de todos os contadores com progresso válido está a pelo
+        menos a margem fornecida do limiar esperado pela contagem, o que exige que ao
+        menos um contador tenha um progresso válido
+        """
+        validos = [estado for estado in estados if estado is not None]
+        return bool(validos) and not any(distancia < margem for _, distancia in validos)
+
+    def intervalo(self, frames_lidos, estados, repeticoes, tempo):
+        """
+        Calcula a quantidade de frames até a próxima detecção dos pontos do corpo pela
+        amostragem adaptativa, chamado a cada frame inferido com a quantidade de frames
+        lidos, o progresso de cada contador e os tempos das últimas repetições de cada
+        contador, retornando 1 (todos os frames) enquanto o período das repetições ou a
+        variação do progresso não puderem ser estimados
+
+        O menor intervalo entre os contadores com progresso válido é usado, e o intervalo
+        de cada contador é limitado pela variação do progresso medida nos últimos frames
+        inferidos, para que o progresso não alcance o limiar esperado pela contagem nos
+        frames pulados (ver ConfigAgendamento), o que faria a contagem perder repetições
+        """
+        config = self.config
+        if not config.amostragem_adaptativa or self.suspenso:
+            return 1
+        self._medir_variacoes(frames_lidos, estados)
+
+        intervalo = None
+        for indice, (estado, tempos) in enumerate(zip(estados, repeticoes)):
+            if estado is None:
+                continue
+            variacoes = self._variacoes.get(indice)
+            if not variacoes:
+                return 1
+            # NOTE: a margem cresce com o intervalo, então o intervalo máximo é a
+            #       distância até o limiar dividida pela margem de um único frame
+            margem = config.FATOR_MARGEM_AMOSTRAGEM * max(variacoes)
+            limite = estado[1] / margem if margem > 0 else config.PASSO_AMOSTRAGEM
+            candidato = min(self._intervalo_repeticoes(tempos, tempo), int(max(1, limite)))
+            intervalo = candidato if intervalo is None else min(intervalo, candidato)
+        return 1 if intervalo is None else intervalo
+
+    def _medir_variacoes(self, frames_lidos, estados):
+        """
+        Mede a variação do progresso por frame de cada contador desde o último frame
+        inferido com um progresso válido, guardando as últimas QUADROS_VARIACAO variações
+        """
+        ultimos = self._ultimos_progressos
+        for indice, estado in enumerate(estados):
+            if estado is None:
+                ultimos.pop(indice, None)
+                continue
+            anterior = ultimos.get(indice)
+            ultimos[indice] = (frames_lidos, estado[0])
+            if anterior is None or frames_lidos <= anterior[0]:
+                continue
+            variacoes = self._variacoes.get(indice)
+            if variacoes is None:
+                variacoes = self._variacoes[indice] = deque(maxlen=self.config.QUADROS_VARIACAO)
+            variacoes.append(abs(estado[0] - anterior[1]) / (frames_lidos - anterior[0]))
+
+    def _intervalo_repeticoes(self, repeticoes, tempo):
+        """
+        Calcula o intervalo entre detecções da amostragem adaptativa a partir do período
+        estimado das últimas repetições de um exercício, ou 1 caso ele não possa ser estimado
+
+        O período é estimado pelos tempos das repetições e convertido para a quantidade
+        de frames processados no período pelo tempo médio entre os frames, o que mantém
+        o intervalo correto quando frames são descartados ou a taxa de frames varia
+        """
+        # estima o período (em segundos) pelos intervalos entre as últimas repetições
+        repeticoes = list(repeticoes)[-self.config.REPETICOES_AMOSTRAGEM:]
+        if len(repeticoes) < 3 or not self._periodo_frame:
+            return 1
+        periodo = float(np.median(np.diff(repeticoes)))
+        # NOTE: uma repetição atrasada indica que o ritmo mudou ou que o exercício
+        #       parou, então o período estimado deixa de ser confiável
+        if tempo - repeticoes[-1] > 2 * periodo:
+            return 1
+        # NOTE: o período em frames é arredondado para que erros de arredondamento
+        #       dos tempos dos frames não alterem o intervalo calculado
+        frames = round(periodo / self._periodo_frame, 3)
+        return int(max(1, min(frames // self.config.AMOSTRAS_REPETICAO, self.config.PASSO_AMOSTRAGEM)))
+
+    def atualizar_tempo(self, frames_lidos, tempo):
+        """
+        Atualiza o tempo médio entre os frames processados pelo tempo do frame atual,
+        dividindo o tempo desde o último frame usado na estimativa pela quantidade de
+        frames lidos desde ele (que inclui os frames pulados sem decodificação)
+        """
+        if tempo is None:
+            return
+        referencia = self._referencia_tempo
+        self._referencia_tempo = (frames_lidos, tempo)
+        if referencia is None:
+            return
+
+        frames = frames_lidos - referencia[0]
+        duracao = tempo - referencia[1]
+        if frames <= 0 or duracao <= 0:
+            return
+        periodo = duracao / frames
+        if self._periodo_frame is None:
+            self._periodo_frame = periodo
+        else:
+            self._periodo_frame += (periodo - self._periodo_frame) * self.config.SUAVIZACAO_PERIODO_FRAME
+
+    def recortar(self, frame, passo=1):
+        """
+        Retorna a região de interesse do frame fornecido como uma view dele, ou o próprio
+        frame caso nenhuma região tenha sido definida, guardando a região usada em
+        "roi_frame" para converter os pontos detectados nela, as dimensões do recorte
+        são arredondadas para múltiplos do parâmetro "passo"
+        """
+        roi = self._roi
+        if roi is None or self.suspenso:
+            self.roi_frame = None
+            return frame
+
+        # NOTE: as dimensões do recorte são arredondadas para múltiplos do passo
+        #       de redução, para que ele seja reduzido por um fator inteiro
+        x0, y0, x1, y1 = roi
+        altura, largura = frame.shape[:2]
+        x1 = x0 + (x1 - x0) // passo * passo
+        y1 = y0 + (y1 - y0) // passo * passo
+        if x1 <= x0 or y1 <= y0:
+            self.roi_frame = None
+            return frame
+        self.roi_frame = (x0 / largura, y0 / altura, (x1 - x0) / largura, (y1 - y0) / altura)
+        return frame[y0:y1, x0:x1]
+
+    def atualizar_roi(self, landmarks, detectado, largura, altura):
+        """
+        Atualiza a região de interesse dos próximos frames a partir dos pontos detectados
+        no frame atual (um array de dimensões (33, 4) com o eixo y invertido), com as
+        dimensões fornecidas, descartando a região quando o corpo não foi detectado
+        ou a visibilidade média dos pontos está abaixo de VISIBILIDADE_ROI
+        """
+        config = self.config
+        if (not config.roi_inferencia or self.suspenso or not detectado or
+            landmarks[:, 3].mean() < config.VISIBILIDADE_ROI):
+            self._roi = None
+            self._caixas_roi.clear()
+            return
+
+        # caixa envolvendo os pontos dos últimos QUADROS_ROI frames inferidos, em pixels do
+        # frame original, que cobre todo o movimento de uma repetição, para que a região
+        # continue contendo a pessoa nos frames seguintes mesmo durante movimentos rápidos
+        caixas = self._caixas_roi
+        caixas.append((
+            landmarks[:, 0].min(), 1 - landmarks[:, 1].max(),
+            landmarks[:, 0].max(), 1 - landmarks[:, 1].min()
+        ))
+        x_min = min(caixa[0] for caixa in caixas) * largura
+        y_min = min(caixa[1] for caixa in caixas) * altura
+        x_max = max(caixa[2] for caixa in caixas) * largura
+        y_max = max(caixa[3] for caixa in caixas) * altura
+        margem = config.MARGEM_ROI * max(x_max - x_min, y_max - y_min)
+
+        # NOTE: a região atual é mantida enquanto ela contém os pontos com metade da margem e
+        #       não é muito maior que a nova região, já que cada mudança da região pode realocar os
+        #       arrays de trabalho dos filtros e desloca as coordenadas vistas pelo detector
+        #       de poses, que acompanha a pessoa entre frames
+        x0, y0 = max(0, int(np.floor(x_min - margem))), max(0, int(np.floor(y_min - margem)))
+        x1, y1 = min(largura, int(np.ceil(x_max + margem))), min(altura, int(np.ceil(y_max + margem)))
+        roi = self._roi
+        if roi is not None:
+            contem = (
+                roi[0] <= max(0, x_min - margem / 2) and roi[1] <= max(0, y_min - margem / 2) and
+                roi[2] >= min(largura, x_max + margem / 2) and roi[3] >= min(altura, y_max + margem / 2)
+            )
+            if contem and (roi[2] - roi[0]) * (roi[3] - roi[1]) <= 2 * (x1 - x0) * (y1 - y0):
+                return
+
+        self._roi = (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
@@ -0,0 +1,136 @@
+"""
+Módulo para medir o desempenho dos filtros de imagem em frames de resoluções comuns,
+que pode ser executado pela linha de comando para mostrar o tempo de cada filtro
+com diferentes quantidades de threads
+
+exemplo de usagem:
+```
+user@localhost: python -m cntexercicios.benchmark -t 1,2,4 -r 1080p,4k
+```
+"""
+
+from time import perf_counter_ns
+
+import numpy as np
+
+from cntexercicios import filtros
+
+__all__ = ["RESOLUCOES", "medir", "medir_convolucao"]
+
+# resoluções (largura, altura) usadas nas medições
+RESOLUCOES = {
+    "360p":  (640, 360),
+    "720p":  (1280, 720),
+    "1080p": (1920, 1080),
+    "4k":    (3840, 2160)
+}
+
+def medir(funcao, repeticoes=5):
+    """
+    Executa a função fornecida uma vez para aquecimento e em seguida a quantidade
+    de vezes fornecida, retornando a mediana do tempo de execução em milissegundos
+    """
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = perf_counter_ns()
+        funcao()
+        tempos.append(perf_counter_ns() - inicio)
+    return float(np.median(tempos)) / 1e6
+
+def _kernels_padrao():
+    """
+    Retorna os kernels usados pelos contadores de exercícios, indexados pelo nome
+    """
+    return {
+        "nitidez": filtros.kernel_nitidez(peso=0.5),
+        "gauss":   filtros.kernel_gauss(3, sigma=1),
+        "bordas":  filtros.kernel_deteccao_borda()
+    }
+
+def medir_convolucao(resolucoes=("1080p", "4k"), threads=(1,), kernels=None, repeticoes=5, lote=1):
+    """
+    Mede o tempo da convolução de frames aleatórios de cada resolução fornecida com
+    cada kernel (por padrão os kernels usados pelos contadores) e quantidade de threads
+    fornecidos, gerando um dicionário com a resolução, o kernel, a quantidade de
+    threads, o tempo em milissegundos e a aceleração em relação à primeira medição
+    de cada kernel e resolução
+
+    Caso 'lote' seja maior que um, os frames são convoluídos em lotes dessa
+    quantidade de frames, e o tempo medido é o tempo médio por frame do lote
+    """
+    if kernels is None:
+        kernels = _kernels_padrao()
+
+    gerador = np.random.default_rng(0)
+    for resolucao in resolucoes:
+        largura, altura = RESOLUCOES[resolucao]
+        if lote > 1:
+            frame = gerador.integers(0, 256, (lote, altura, largura, 3), dtype=np.uint8)
+        else:
+            frame = gerador.integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+        for nome, kernel in kernels.items():
+            plano = filtros.PlanoConvolucao(kernel)
+            espaco = filtros.EspacoTrabalho()
+            referencia = None
+            for quantidade in threads:
+                tempo = medir(
+                    lambda: plano(frame, threads=quantidade, espaco=espaco, lote=lote > 1), repeticoes
+                ) / lote
+                if referencia is None:
+                    referencia = tempo
+                yield {
+                    "resolucao":  resolucao,
+                    "kernel":     nome,
+                    "estrategia": plano.estrategia,
+                    "threads":    quantidade,
+                    "lote":       lote,
+                    "tempo_ms":   tempo,
+                    "aceleracao": referencia / tempo
+                }
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from optparse import OptionParser
+
+    # definição das opções de linha de comando
+    parser = OptionParser(usage="python -m cntexercicios.benchmark [opções]")
+    parser.add_option("-t", "--threads", action="store", type="string",
+        help="quantidades de threads separadas por vírgula (padrão: 1 até um por núcleo)")
+    parser.add_option("-r", "--resolucoes", action="store", type="string", default="1080p,4k",
+        help=f"resoluções separadas por vírgula, entre: {', '.join(RESOLUCOES)} (padrão: 1080p,4k)")
+    parser.add_option("-n", "--repeticoes", action="store", type="int", default=5,
+        help="quantidade de repetições de cada medição (padrão: 5)")
+    parser.add_option("-l", "--lote", action="store", type="int", default=1,
+        help="quantidade de frames convoluídos de uma vez, mostrando o tempo por frame (padrão: 1)")
+
+    # processamento das opções da linha de comando
+    opcoes, _ = parser.parse_args()
+    try:
+        if opcoes.threads is None:
+            nucleos = os.cpu_count() or 1
+            threads = sorted({1, *(1 << i for i in range(nucleos.bit_length())), nucleos})
+        else:
+            threads = [int(valor) for valor in opcoes.threads.split(",")]
+    except ValueError:
+        print("erro: quantidades de threads inválidas", file=sys.stderr)
+        exit(1)
+
+    if opcoes.lote < 1:
+        print("erro: a quantidade de frames do lote deve ser positiva", file=sys.stderr)
+        exit(1)
+
+    resolucoes = opcoes.resolucoes.split(",")
+    desconhecidas = [resolucao for resolucao in resolucoes if resolucao not in RESOLUCOES]
+    if desconhecidas:
+        print(f"erro: resoluções desconhecidas: {', '.join(desconhecidas)}", file=sys.stderr)
+        exit(1)
+
+    print(f"{'resolução':>9} {'kernel':>8} {'estratégia':>10} {'threads':>7} {'tempo (ms)':>10} {'aceleração':>10}")
+    for medicao in medir_convolucao(resolucoes, threads, repeticoes=opcoes.repeticoes, lote=opcoes.lote):
+        print(
+            f"{medicao['resolucao']:>9} {medicao['kernel']:>8} {medicao['estrategia']:>10} "
+            f"{medicao['threads']:>7} {medicao['tempo_ms']:>10.2f} {medicao['aceleracao']:>9.2f}x",
+            flush=True
+        )
@@ -0,0 +1,179 @@
+"""
+Módulo com classes para armazenar em disco os pontos do corpo (landmarks) detectados
+pelo mediapipe em cada frame de um arquivo de vídeo, permitindo que a contagem de
+exercícios seja refeita sem decodificar o vídeo e sem executar a detecção novamente
+
+Os pontos são armazenados em arquivos no formato .npy do numpy, que são carregados
+como arrays mapeados em memória, e identificados por uma chave calculada a partir
+do conteúdo do arquivo de vídeo e da configuração usada na detecção dos pontos
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from cntexercicios.landmarks import (
+    QTD_LANDMARKS, VALORES_LANDMARK, landmarks_para_array, array_para_landmarks
+)
+
+__all__ = ["CacheLandmarks", "RegistroLandmarks", "GravadorLandmarks"]
+
+# hashes de arquivos já calculados nesse processo, indexados pelo caminho
+# absoluto, tamanho e data de modificação do arquivo
+_hashes_arquivos = {}
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo do arquivo fornecido, reutilizando o hash
+    já calculado caso o arquivo não tenha sido modificado desde o último cálculo
+    """
+    estado = os.stat(caminho)
+    identificador = (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns)
+    resultado = _hashes_arquivos.get(identificador)
+    if resultado is None:
+        sha = hashlib.sha256()
+        with open(caminho, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+                sha.update(bloco)
+        resultado = _hashes_arquivos[identificador] = sha.hexdigest()
+    return resultado
+
+def pasta_cache_padrao():
+    """
+    Retorna a pasta padrão do cache de pontos, dentro da pasta de cache do usuário
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cntexercicios", "landmarks")
+
+class RegistroLandmarks:
+    """
+    Pontos do corpo armazenados em cache para todos os frames de um vídeo, contendo
+    o array 'landmarks' de dimensões (T, 33, 4) com os valores x, y, z e visibilidade
+    de cada ponto em cada frame (preenchido com NaN nos frames sem um corpo detectado)
+    e o array 'tempos' com o tempo de cada frame em milissegundos
+    """
+
+    def __init__(self, landmarks, tempos):
+        self.landmarks = landmarks
+        self.tempos    = tempos
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def detectado(self, indice):
+        """
+        Retorna se um corpo foi detectado no frame com o índice fornecido
+        """
+        return not np.isnan(self.landmarks[indice, 0, 0])
+
+    def pontos(self, indice):
+        """
+        Retorna os pontos do frame com o índice fornecido no mesmo formato retornado pelo
+        mediapipe (NormalizedLandmarkList), ou None caso nenhum corpo tenha sido detectado
+        """
+        if not self.detectado(indice):
+            return None
+        return array_para_landmarks(self.landmarks[indice])
+
+class GravadorLandmarks:
+    """
+    Acumula os pontos detectados em cada frame de um vídeo para salvá-los no cache
+    quando o vídeo termina, os arquivos só são escritos pelo método concluir, de forma
+    que uma gravação interrompida (ou descartada) não gera entradas incompletas no cache
+    """
+
+    def __init__(self, pasta):
+        self._pasta     = pasta
+        self._landmarks = []
+        self._tempos    = []
+
+    def adicionar(self, pontos, tempo):
+        """
+        Adiciona os pontos detectados no próximo frame, no formato retornado pelo
+        mediapipe ou None caso nenhum corpo tenha sido detectado, e o tempo do frame
+        em milissegundos
+        """
+        if pontos is None:
+            valores = np.full((QTD_LANDMARKS, VALORES_LANDMARK), np.nan, dtype=np.float32)
+        else:
+            valores = landmarks_para_array(
+                pontos, np.empty((QTD_LANDMARKS, VALORES_LANDMARK), dtype=np.float32)
+            )
+        self._landmarks.append(valores)
+        self._tempos.append(tempo)
+
+    def concluir(self):
+        """
+        Salva os pontos acumulados no cache, substituindo a entrada anterior caso exista
+        """
+        os.makedirs(self._pasta, exist_ok=True)
+        landmarks = np.array(self._landmarks, dtype=np.float32).reshape(-1, QTD_LANDMARKS, VALORES_LANDMARK)
+        tempos    = np.array(self._tempos, dtype=np.float64)
+
+        # NOTE: os arquivos são escritos com nomes temporários e renomeados em seguida,
+        #       com o arquivo de landmarks por último, que indica que a entrada está completa
+        for nome, array in (("tempos", tempos), ("landmarks", landmarks)):
+            destino    = os.path.join(self._pasta, f"{nome}.npy")
+            temporario = os.path.join(self._pasta, f"{nome}.tmp.npy")
+            np.save(temporario, array)
+            os.replace(temporario, destino)
+        self.descartar()
+
+    def descartar(self):
+        """
+        Descarta os pontos acumulados sem salvá-los
+        """
+        self._landmarks = []
+        self._tempos    = []
+
+class CacheLandmarks:
+    """
+    Cache em disco dos pontos do corpo detectados em arquivos de vídeo, cada entrada
+    do cache é uma pasta nomeada pela chave calculada pelo método chave, contendo
+    os arquivos landmarks.npy e tempos.npy
+    """
+
+    def __init__(self, pasta=None):
+        """
+        Cria um cache de pontos na pasta fornecida pelo parâmetro 'pasta',
+        ou na pasta retornada pela função pasta_cache_padrao caso seja None
+        """
+        if pasta is None:
+            pasta = pasta_cache_padrao()
+        elif not isinstance(pasta, str):
+            raise TypeError(f"esperado str ou None para 'pasta', recebido tipo {type(pasta).__qualname__}")
+        self.pasta = pasta
+
+    @staticmethod
+    def chave(video, configuracao):
+        """
+        Calcula a chave de um vídeo a partir do hash do conteúdo do arquivo de vídeo
+        e da configuração usada na detecção dos pontos, que deve ser um objeto
+        serializável em JSON contendo tudo que afeta os pontos detectados
+        """
+        config = json.dumps(configuracao, sort_keys=True, ensure_ascii=True)
+        hash_config = hashlib.sha256(config.encode("ascii")).hexdigest()
+        return f"{hash_arquivo(video)[:32]}-{hash_config[:16]}"
+
+    def carregar(self, chave):
+        """
+        Carrega os pontos armazenados com a chave fornecida como arrays mapeados em
+        memória, retornando um RegistroLandmarks ou None caso a chave não exista
+        """
+        pasta = os.path.join(self.pasta, chave)
+        try:
+            landmarks = np.load(os.path.join(pasta, "landmarks.npy"), mmap_mode="r")
+            tempos    = np.load(os.path.join(pasta, "tempos.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(landmarks) != len(tempos):
+            return None
+        return RegistroLandmarks(landmarks, tempos)
+
+    def gravador(self, chave):
+        """
+        Retorna um GravadorLandmarks para armazenar os pontos de um vídeo com a chave fornecida
+        """
+        return GravadorLandmarks(os.path.join(self.pasta, chave))
@@ -0,0 +1,458 @@
+"""
+Módulo para a contagem de exercícios em vários vídeos ao mesmo tempo em um único processo,
+como várias webcams de uma mesma sala, mostrando todos os vídeos lado a lado em uma única
+janela ou contando sem interface gráfica
+
+Cada vídeo é lido pela sua própria thread de captura, mas os filtros e a detecção dos
+pontos do corpo de todos os vídeos são executados por um único conjunto de threads de
+trabalho, que atendem os vídeos com frames disponíveis em ordem circular, o que impede
+que um vídeo mais lento ocupe as threads enquanto os demais esperam. Como o mediapipe,
+o opencv e os filtros são carregados uma única vez no processo e a quantidade de threads
+de trabalho é limitada pela quantidade de núcleos, o uso de memória e do processador é
+menor que o de um processo de contagem por vídeo
+
+Também pode ser executado pela linha de comando, ver o módulo cntexercicios.cameras.__main__
+"""
+
+import os
+import math
+import threading
+
+import cv2
+import numpy as np
+
+from cntexercicios import estagios
+
+__all__ = ["ContagemCameras"]
+
+# intervalo (em segundos) entre as verificações de encerramento das threads de trabalho
+_INTERVALO_ESPERA = 0.05
+
+class _Escalonador:
+    """
+    Distribui os frames dos vídeos entre as threads de trabalho em ordem circular, cada
+    vídeo é processado por no máximo uma thread por vez (já que o estado da contagem
+    depende da ordem dos frames) e, após ter um frame processado, o vídeo só é atendido
+    novamente depois que todos os outros vídeos com frames disponíveis forem atendidos
+    """
+
+    def __init__(self, fluxos, parar):
+        self._fluxos   = fluxos
+        self._parar    = parar
+        self._proximo  = 0
+        self._condicao = threading.Condition()
+
+    def notificar(self):
+        """
+        Acorda as threads de trabalho que esperam por frames
+        """
+        with self._condicao:
+            self._condicao.notify_all()
+
+    def obter(self):
+        """
+        Retorna uma tupla (fluxo, item) com o próximo vídeo com um frame disponível na
+        ordem circular e o item (tempo, frame) lido dele, esperando por um frame caso
+        necessário, ou None caso todos os vídeos tenham terminado ou a contagem seja encerrada
+        """
+        with self._condicao:
+            while not self._parar.is_set():
+                quantidade = len(self._fluxos)
+                for deslocamento in range(quantidade):
+                    indice = (self._proximo + deslocamento) % quantidade
+                    fluxo = self._fluxos[indice]
+                    if fluxo.ocupado or fluxo.encerrado:
+                        continue
+
+                    item = fluxo.fila.obter(bloquear=False)
+                    if item is None:
+                        continue
+                    if item is estagios.FIM or isinstance(item, BaseException):
+                        fluxo.encerrar(None if item is estagios.FIM else item)
+                        continue
+
+                    fluxo.ocupado = True
+                    self._proximo = (indice + 1) % quantidade
+                    return fluxo, item
+
+                if self.terminado():
+                    self._condicao.notify_all()
+                    return None
+                self._condicao.wait(_INTERVALO_ESPERA)
+        return None
+
+    def liberar(self, fluxo):
+        """
+        Devolve o vídeo fornecido ao escalonador após o processamento de um frame dele
+        """
+        with self._condicao:
+            fluxo.ocupado = False
+            self._condicao.notify_all()
+
+    def terminado(self):
+        """
+        Retorna se todos os vídeos terminaram e nenhum deles está sendo processado
+        """
+        return all(fluxo.encerrado and not fluxo.ocupado for fluxo in self._fluxos)
+
+class _FilaFluxo(estagios.FilaEstagios):
+    """
+    Fila entre a thread de captura de um vídeo e as threads de trabalho,
+    que acorda as threads de trabalho a cada frame colocado nela
+    """
+
+    def __init__(self, tamanho, politica, parar, escalonador):
+        super().__init__(tamanho, politica, parar)
+        self._escalonador = escalonador
+
+    def colocar(self, item):
+        colocado = super().colocar(item)
+        if colocado:
+            self._escalonador.notificar()
+        return colocado
+
+class _Fluxo:
+    """
+    Estado de um dos vídeos da contagem: o contador, a fila de frames capturados,
+    o último frame processado junto com o estado da contagem mostrado na janela
+    e o erro que encerrou a contagem do vídeo, se houver
+    """
+
+    def __init__(self, contador, tamanho_fila, parar, escalonador):
+        # NOTE: em dispositivos de captura apenas o frame mais recente é mantido
+        #       na fila, enquanto em arquivos de vídeo todos os frames são contados
+        if contador._baixa_latencia:
+            fila = _FilaFluxo(1, estagios.DESCARTAR_ANTIGOS, parar, escalonador)
+        else:
+            fila = _FilaFluxo(tamanho_fila, estagios.BLOQUEAR, parar, escalonador)
+        self.contador  = contador
+        self.fila      = fila
+        self.leitor    = None
+        self.ocupado   = False
+        self.encerrado = False
+        self.erro      = None
+        self.janela    = None
+        self.versao    = 0
+
+    def encerrar(self, erro=None):
+        """
+        Encerra a contagem do vídeo, registrando o erro que a encerrou, se houver
+        """
+        self.encerrado = True
+        if erro is not None and self.erro is None:
+            self.erro = erro
+
+    def processar(self, item, pose=None):
+        """
+        Aplica os filtros, detecta o corpo e conta o exercício no frame fornecido junto
+        com o tempo dele pela tupla (tempo, frame), usando o detector de poses fornecido
+        caso exista (ver o método ContadorExercicios.processar_frame), guardando o estado
+        mostrado na janela
+        """
+        contador = self.contador
+        tempo, frame = item
+        descartados = getattr(self.leitor, "descartados", 0) + self.fila.descartados
+        contador.processar_frame(tempo, frame, pose=pose, descartados=descartados)
+        self.janela = frame, contador._estado_janela()
+        self.versao += 1
+
+class ContagemCameras:
+    """
+    Conta um exercício em vários vídeos (arquivos ou dispositivos de captura) ao mesmo
+    tempo em um único processo, com um contador por vídeo, usando um conjunto de threads
+    de trabalho compartilhado entre os vídeos para aplicar os filtros e detectar os pontos
+    do corpo, e mostrando os vídeos lado a lado em uma única janela
+    """
+
+    # tamanho máximo (largura, altura) de cada vídeo na janela
+    TAMANHO_QUADRO = (640, 360)
+
+    # quantidade de frames lidos antecipadamente de cada arquivo de vídeo
+    # até serem processados (dispositivos de captura mantêm apenas um frame)
+    TAMANHO_FILA = 2
+
+    # título da janela
+    TITULO = "Cameras"
+
+    def __init__(self, exercicio, videos, trabalhadores=None, compartilhar_poses=False, **kwargs):
+        """
+        Cria os contadores do exercício fornecido pelo parâmetro "exercicio" (um dos nomes
+        retornados pela função cntexercicios.exercicios.listar_contadores) para cada vídeo
+        fornecido pelo parâmetro "videos", uma sequência de caminhos de arquivos de vídeo
+        e índices de dispositivos de captura, os demais parâmetros são repassados aos
+        contadores (ver a classe ContadorExercicios)
+
+        Os filtros e a detecção dos pontos do corpo são executados por "trabalhadores"
+        threads (por padrão uma por núcleo, limitado pela quantidade de vídeos). Cada
+        contador tem o seu próprio detector de poses, já que o mediapipe acompanha a
+        pessoa detectada entre os frames de um mesmo vídeo, então o parâmetro "pose"
+        não é aceito, assim como a contagem em estágios, que é substituída pelas
+        threads compartilhadas, e o cache de pontos do corpo
+
+        Caso um valor verdadeiro seja passado ao parâmetro "compartilhar_poses", cada thread
+        de trabalho usa um único detector de poses para todos os vídeos, no modo de imagens
+        estáticas do mediapipe (sem acompanhar a pessoa entre frames), o que reduz o uso de
+        memória quando há mais vídeos que threads (cada detector ocupa dezenas de megabytes),
+        mas aumenta o custo da detecção em cada frame
+        """
+        from cntexercicios.exercicios import listar_contadores, instanciar_contador
+
+        if exercicio not in listar_contadores():
+            raise ValueError(f"contador para o tipo de exercício '{exercicio}' não encontrado")
+
+        if isinstance(videos, (int, str)):
+            videos = [videos]
+        videos = list(videos)
+        if not videos:
+            raise ValueError("nenhum vídeo fornecido para a contagem")
+        for video in videos:
+            if not isinstance(video, (int, str)) or isinstance(video, bool):
+                raise TypeError(
+                    f"esperado int ou str para cada vídeo, recebido tipo {type(video).__qualname__}"
+                )
+
+        if trabalhadores is None:
+            trabalhadores = min(os.cpu_count() or 1, len(videos))
+        elif not isinstance(trabalhadores, int) or isinstance(trabalhadores, bool):
+            raise TypeError(
+                "esperado int ou None para 'trabalhadores', "
+                f"recebido tipo {type(trabalhadores).__qualname__}"
+            )
+        elif trabalhadores < 1:
+            raise ValueError("'trabalhadores' deve ser um número inteiro positivo")
+
+        for parametro in ("pose", "cache_landmarks"):
+            if parametro in kwargs:
+                raise ValueError(f"o parâmetro '{parametro}' não é suportado na contagem de vários vídeos")
+        if getattr(kwargs.get("captura"), "estagios", False):
+            raise ValueError("a contagem em estágios não é suportada na contagem de vários vídeos")
+
+        self._exercicio     = exercicio
+        self._videos        = videos
+        self._trabalhadores = trabalhadores
+        # NOTE: os contadores recebem um dos detectores compartilhados para que não criem
+        #       os seus próprios, cada thread de trabalho fornece o seu detector ao
+        #       contador em cada frame processado por ela
+        self._poses = None
+        if compartilhar_poses:
+            self._poses = [self.criar_pose_compartilhada() for _ in range(trabalhadores)]
+            kwargs["pose"] = self._poses[0]
+        self._contadores    = [instanciar_contador(exercicio, video, **kwargs) for video in videos]
+        self._fluxos        = []
+        self._mostrar_pontos   = False
+        self._mostrar_metricas = False
+
+    @property
+    def contadores(self):
+        """
+        Lista com o contador de cada vídeo, na ordem dos vídeos
+        """
+        return list(self._contadores)
+
+    @property
+    def contagens(self):
+        """
+        Lista com a contagem atual de cada vídeo, na ordem dos vídeos
+        """
+        return [contador._contagem for contador in self._contadores]
+
+    @property
+    def fps(self):
+        """
+        Lista com a taxa atual de frames processados por segundo de cada vídeo
+        """
+        return [contador.instrumentacao.fps for contador in self._contadores]
+
+    def resultados(self):
+        """
+        Retorna uma lista com um dicionário por vídeo, com as chaves "video", "exercicio",
+        "contagem", "frames", "repeticoes" (o tempo de cada repetição contada, em segundos),
+        "fps" (taxa média de frames processados por segundo) e "descartados", e com a
+        chave "erro" caso a contagem do vídeo tenha falhado
+        """
+        erros = {id(fluxo.contador): fluxo.erro for fluxo in self._fluxos}
+        resultados = []
+        for video, contador in zip(self._videos, self._contadores):
+            resumo = contador.instrumentacao.resumo()
+            resultado = {
+                "video":       video,
+                "exercicio":   self._exercicio,
+                "contagem":    contador._contagem,
+                "frames":      contador._frames_lidos,
+                "repeticoes":  contador.tempos_repeticoes,
+                "fps":         resumo["fps"],
+                "descartados": resumo["descartados"]
+            }
+            erro = erros.get(id(contador))
+            if erro is not None:
+                resultado["erro"] = f"{type(erro).__qualname__}: {erro}"
+            resultados.append(resultado)
+        return resultados
+
+    def contar(self, exibir=True):
+        """
+        Conta o exercício em todos os vídeos até que todos terminem ou até que a janela
+        seja fechada, retornando a lista com a contagem de cada vídeo. Caso um valor falso
+        seja passado ao parâmetro "exibir", a contagem é feita sem janela (em dispositivos
+        de captura, até que a contagem seja interrompida, por exemplo pelo KeyboardInterrupt)
+
+        A falha na leitura ou na contagem de um vídeo encerra apenas a contagem dele,
+        o erro é informado pelo método resultados
+        """
+        from contextlib import ExitStack
+        from cntexercicios.video import abrir_video, extrair_frames, extrair_frames_recentes
+
+        parar = threading.Event()
+        self._fluxos = fluxos = []
+        escalonador = _Escalonador(fluxos, parar)
+        fluxos.extend(
+            _Fluxo(contador, self.TAMANHO_FILA, parar, escalonador) for contador in self._contadores
+        )
+        capturas, trabalhadores = [], []
+
+        with ExitStack() as pilha:
+            # NOTE: os estágios são encerrados antes das capturas, que são
+            #       fechadas na ordem inversa ao fim do contexto
+            def encerrar():
+                parar.set()
+                escalonador.notificar()
+                for estagio in capturas:
+                    estagio.aguardar()
+                for thread in trabalhadores:
+                    thread.join()
+
+            for fluxo in fluxos:
+                contador = fluxo.contador
+                captura = pilha.enter_context(abrir_video(contador._video))
+                if contador._baixa_latencia:
+                    fluxo.leitor = extrair_frames_recentes(captura, com_tempo=True)
+                else:
+                    fluxo.leitor = extrair_frames(
+                        captura, antecipar=contador._antecipar or contador._captura.FRAMES_ANTECIPADOS,
+                        com_tempo=True
+                    )
+
+                # reinicia o estado da contagem do vídeo
+                contador.iniciar_contagem()
+            pilha.callback(encerrar)
+
+            # threads de captura, uma por vídeo, seguidas das threads de trabalho
+            for indice, fluxo in enumerate(fluxos):
+                capturas.append(estagios.Estagio(
+                    lambda item: item, fluxo.leitor, fluxo.fila, parar, f"captura-{indice}"
+                ))
+            for indice in range(self._trabalhadores):
+                thread = threading.Thread(
+                    target=self._trabalhar, name=f"trabalho-{indice}", daemon=True,
+                    args=(escalonador, None if self._poses is None else self._poses[indice])
+                )
+                thread.start()
+                trabalhadores.append(thread)
+
+            if exibir:
+                self._exibir_janela(fluxos, escalonador)
+            else:
+                while not escalonador.terminado():
+                    parar.wait(_INTERVALO_ESPERA)
+
+        return self.contagens
+
+    @staticmethod
+    def criar_pose_compartilhada():
+        """
+        Cria um detector de poses do mediapipe no modo de imagens estáticas, que detecta
+        a pessoa em cada frame de forma independente e por isso pode ser compartilhado
+        entre vídeos diferentes
+        """
+        import mediapipe as mp
+        from cntexercicios.exercicios import ContadorExercicios
+        return mp.solutions.pose.Pose(static_image_mode=True, **ContadorExercicios.CONFIG_POSE)
+
+    @staticmethod
+    def _trabalhar(escalonador, pose=None):
+        """
+        Função executada pelas threads de trabalho, processa os frames dos vídeos
+        na ordem definida pelo escalonador até que a contagem termine, usando o
+        detector de poses fornecido em todos os vídeos, caso fornecido
+        """
+        while True:
+            proximo = escalonador.obter()
+            if proximo is None:
+                return
+            fluxo, item = proximo
+            try:
+                fluxo.processar(item, pose)
+            except Exception as erro:
+                fluxo.encerrar(erro)
+            finally:
+                escalonador.liberar(fluxo)
+
+    def _exibir_janela(self, fluxos, escalonador):
+        """
+        Mostra o último frame processado de cada vídeo em uma grade na janela, junto com
+        a contagem e a taxa de frames dele, até que todos os vídeos terminem ou a janela
+        seja fechada, processando as teclas "j" (mostrar pontos) e "i" (mostrar métricas)
+        """
+        colunas = math.ceil(math.sqrt(len(fluxos)))
+        linhas  = math.ceil(len(fluxos) / colunas)
+        largura, altura = self.TAMANHO_QUADRO
+        mosaico = np.zeros((altura * linhas, largura * colunas, 3), np.uint8)
+
+        chave_janela = None
+        while not escalonador.terminado():
+            # renderiza a janela apenas quando algum vídeo tem um novo frame processado
+            chave = (tuple(fluxo.versao for fluxo in fluxos), self._mostrar_pontos, self._mostrar_metricas)
+            if chave != chave_janela:
+                for indice, fluxo in enumerate(fluxos):
+                    y, x = divmod(indice, colunas)
+                    mosaico[y * altura:(y + 1) * altura, x * largura:(x + 1) * largura] = self._renderizar_quadro(fluxo)
+                cv2.imshow(self.TITULO, mosaico)
+                chave_janela = chave
+
+            tecla = cv2.waitKey(10) & 0xFF
+            if tecla in (ord("j"), ord("J")):
+                self._mostrar_pontos = not self._mostrar_pontos
+                for contador in self._contadores:
+                    contador._mostrar_pontos = self._mostrar_pontos
+            elif tecla in (ord("i"), ord("I")):
+                self._mostrar_metricas = not self._mostrar_metricas
+
+            # verifica se o usuário fechou a janela
+            if cv2.getWindowProperty(self.TITULO, cv2.WND_PROP_VISIBLE) < 1:
+                break
+
+    def _renderizar_quadro(self, fluxo):
+        """
+        Retorna o quadro de um vídeo mostrado na janela, com o último frame processado
+        reduzido para o tamanho do quadro e a contagem e a taxa de frames do vídeo
+        """
+        largura, altura = self.TAMANHO_QUADRO
+        quadro = np.zeros((altura, largura, 3), np.uint8)
+        contador = fluxo.contador
+
+        if fluxo.janela is not None:
+            frame, (contagens, pontos) = fluxo.janela
+            h, w = frame.shape[:2]
+            escala = min(largura / w, altura / h)
+            tamanho = (max(1, round(w * escala)), max(1, round(h * escala)))
+            reduzido = cv2.resize(frame, tamanho, interpolation=cv2.INTER_AREA)
+            if self._mostrar_pontos and pontos is not None:
+                import mediapipe as mp
+                mp.solutions.drawing_utils.draw_landmarks(
+                    reduzido, pontos, mp.solutions.pose.POSE_CONNECTIONS
+                )
+            quadro[:tamanho[1], :tamanho[0]] = reduzido
+        else:
+            contagens = contador._contagens()
+
+        medicoes = contador.instrumentacao
+        if self._mostrar_metricas:
+            texto = f"Contagem: {contagens[0]}\n{medicoes.texto_overlay()}"
+        else:
+            texto = f"Contagem: {contagens[0]}\nfps: {medicoes.fps:.1f}"
+        if fluxo.erro is not None:
+            texto += "\nerro na contagem"
+        elif fluxo.encerrado:
+            texto += "\nfim do video"
+        contador._renderizar_texto(quadro, (20, 20), texto)
+        return quadro
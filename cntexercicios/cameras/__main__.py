@@ -0,0 +1,73 @@
+"""
+Módulo para a contagem de exercícios em vários vídeos ao mesmo tempo pela linha de comando,
+aceita índices de dispositivos de captura (como webcams) e arquivos de vídeo como parâmetros,
+mostrando os vídeos lado a lado em uma única janela ou contando sem janela pela opção
+"--sem-janela", e escrevendo o resultado de cada vídeo no formato JSON Lines (um objeto JSON
+por linha) na saída padrão ou no arquivo fornecido pela opção "--saida" ao fim da contagem
+
+exemplo de usagem:
+```
+user@localhost: python -m cntexercicios.cameras -e polichinelos 0 1 2
+```
+"""
+
+if __name__ != "__main__":
+    raise ImportError("esse módulo não deve ser importado diretamente")
+
+# biblioteca padrão
+import sys
+
+# biblioteca do programa
+from cntexercicios.exercicios import listar_contadores
+from cntexercicios.cameras import ContagemCameras
+from cntexercicios.lote import salvar_resultados
+
+# definição das opções de linha de comando
+from optparse import OptionParser
+parser = OptionParser(usage="python -m cntexercicios.cameras [opções] (dispositivos ou arquivos de vídeo)")
+parser.add_option("-e", "--exercicio", action="store", type="string",
+    help=f"exercício a ser contado, um dos seguintes: {', '.join(listar_contadores())}")
+parser.add_option("-t", "--trabalhadores", action="store", type="int",
+    help="quantidade de threads que detectam os pontos do corpo (padrão: uma por núcleo)")
+parser.add_option("-c", "--compartilhar-poses", action="store_true", default=False,
+    help="usa um único detector de poses por thread para todos os vídeos, o que reduz o uso "
+         "de memória mas aumenta o custo da detecção")
+parser.add_option("-s", "--sem-janela", action="store_true", default=False,
+    help="conta sem mostrar os vídeos, até o fim dos vídeos ou até ser interrompido (Ctrl+C)")
+parser.add_option("-o", "--saida", action="store", type="string",
+    help="arquivo onde os resultados são escritos (padrão: saída padrão)")
+
+# processamento das opções da linha de comando
+opcoes, argumentos = parser.parse_args()
+if not argumentos or opcoes.exercicio is None:
+    parser.print_help()
+    exit(1)
+
+if opcoes.exercicio not in listar_contadores():
+    print(f"erro: exercício desconhecido '{opcoes.exercicio}'", file=sys.stderr)
+    exit(1)
+if opcoes.trabalhadores is not None and opcoes.trabalhadores < 1:
+    print("erro: a quantidade de threads de trabalho deve ser positiva", file=sys.stderr)
+    exit(1)
+
+# parâmetros numéricos são índices de dispositivos de captura
+videos = [int(argumento) if argumento.isdigit() else argumento for argumento in argumentos]
+
+# contagem dos exercícios, escrevendo os resultados ao fim da contagem
+contagem = ContagemCameras(
+    opcoes.exercicio, videos, trabalhadores=opcoes.trabalhadores,
+    compartilhar_poses=opcoes.compartilhar_poses
+)
+try:
+    contagem.contar(exibir=not opcoes.sem_janela)
+except KeyboardInterrupt:
+    pass
+except RuntimeError as erro:
+    print(f"erro: {erro}", file=sys.stderr)
+    exit(1)
+
+if opcoes.saida is None:
+    salvar_resultados(contagem.resultados(), sys.stdout)
+else:
+    with open(opcoes.saida, "w", encoding="utf-8") as arquivo:
+        salvar_resultados(contagem.resultados(), arquivo)
@@ -0,0 +1,149 @@
+"""
+Módulo com as configurações da captura dos frames e dos filtros dos contadores de
+exercícios, passadas aos contadores pelos parâmetros "captura" e "filtros" (ver
+ContadorExercicios), da mesma forma que a configuração do agendamento da detecção
+dos pontos do corpo (ver o módulo cntexercicios.agendamento)
+
+Cada opção é ativada ou ajustada pelo parâmetro de mesmo nome do construtor, e os
+valores padrão e os demais parâmetros são definidos pelos atributos de classe
+"""
+
+__all__ = ["ConfigCaptura", "ConfigFiltros"]
+
+def _checar_inteiro(nome, valor):
+    """
+    Verifica se o valor fornecido para o parâmetro 'nome' é um número inteiro não negativo
+    """
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise TypeError(f"esperado int ou None para '{nome}', recebido tipo {type(valor).__qualname__}")
+    if valor < 0:
+        raise ValueError(f"'{nome}' não pode ser um número negativo")
+
+class ConfigCaptura:
+    """
+    Configuração da leitura dos frames do vídeo pelos contadores
+
+    Os frames de arquivos de vídeo são lidos antecipadamente em outra thread, a quantidade
+    de frames armazenados pode ser configurada pelo parâmetro "antecipar_frames", sendo
+    que o valor 0 desativa a leitura antecipada
+
+    Em dispositivos de captura os frames são lidos no modo de baixa latência por padrão,
+    onde o contador sempre processa o frame mais recente e descarta os frames capturados
+    enquanto o frame anterior era processado, isso pode ser configurado pelo parâmetro
+    "baixa_latencia", que não deve ser ativado em arquivos de vídeo
+
+    No modo ocioso, ativo por padrão apenas em dispositivos de captura e configurável
+    pelo parâmetro "modo_ocioso", frames praticamente iguais ao último frame processado
+    (cenas estáticas) reutilizam o frame filtrado, os pontos do corpo e a janela já
+    renderizada, da mesma forma que o vídeo pausado
+
+    Caso um valor verdadeiro seja passado ao parâmetro "estagios" (ESTAGIOS por padrão),
+    a leitura dos frames, a aplicação dos filtros e a detecção do corpo (junto com a
+    contagem) são executadas em threads separadas conectadas por filas de tamanho
+    limitado, e a janela é renderizada na thread principal, o que faz com que a taxa
+    de frames dependa apenas do estágio mais lento, ver o módulo cntexercicios.contagem_estagios
+
+    Os parâmetros "antecipar_frames", "baixa_latencia" e "modo_ocioso" mantidos como
+    None são decididos pelo contador de acordo com o tipo do vídeo
+    """
+
+    # quantidade padrão de frames lidos antecipadamente em arquivos de vídeo
+    FRAMES_ANTECIPADOS = 4
+
+    # parâmetros do modo ocioso, onde um frame é considerado igual ao último frame
+    # processado quando menos de FRACAO_OCIOSO dos pixels de uma grade com espaçamento
+    # PASSO_OCIOSO mudaram mais que LIMIAR_OCIOSO níveis em algum canal
+    PASSO_OCIOSO   = 8
+    LIMIAR_OCIOSO  = 25
+    FRACAO_OCIOSO  = 0.002
+
+    # se a contagem é feita em estágios executados em threads separadas (leitura,
+    # preprocessamento e detecção, com a janela renderizada na thread principal),
+    # e a quantidade de itens das filas entre os estágios
+    ESTAGIOS = False
+    TAMANHO_FILA_ESTAGIOS = 2
+
+    def __init__(self, antecipar_frames=None, baixa_latencia=None, modo_ocioso=None, estagios=None):
+        """
+        Cria uma configuração da captura, com cada opção definida pelo parâmetro de mesmo
+        nome (as opções mantidas como None dependem do tipo do vídeo, exceto "estagios",
+        que é por padrão o atributo de classe ESTAGIOS)
+        """
+        if antecipar_frames is not None:
+            _checar_inteiro("antecipar_frames", antecipar_frames)
+
+        if estagios is None:
+            estagios = self.ESTAGIOS
+
+        self.antecipar_frames = antecipar_frames
+        self.baixa_latencia   = None if baixa_latencia is None else bool(baixa_latencia)
+        self.modo_ocioso      = None if modo_ocioso is None else bool(modo_ocioso)
+        self.estagios         = bool(estagios)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__qualname__}(antecipar_frames={self.antecipar_frames}, "
+            f"baixa_latencia={self.baixa_latencia}, modo_ocioso={self.modo_ocioso}, "
+            f"estagios={self.estagios})"
+        )
+
+class ConfigFiltros:
+    """
+    Configuração da aplicação dos filtros e da redução dos frames pelos contadores
+
+    Os frames são reduzidos antes da aplicação dos filtros e da detecção dos pontos do
+    corpo para que o maior lado deles tenha no máximo a quantidade de pixels fornecida
+    pelo parâmetro "resolucao_inferencia" (RESOLUCAO_INFERENCIA por padrão), o valor 0
+    (padrão) desativa a redução, já que ela pode alterar os pontos detectados, e os
+    frames mostrados na janela continuam na resolução original
+
+    Os filtros de convolução são aplicados com a quantidade de threads fornecida pelo
+    parâmetro "threads" (THREADS por padrão), dividindo os frames em faixas processadas
+    em paralelo, ver a função convolucao do módulo cntexercicios.filtros
+
+    Caso um valor verdadeiro seja passado ao parâmetro "bordas_luminancia"
+    (BORDAS_LUMINANCIA por padrão), os frames são convertidos para tons de cinza
+    quando a detecção de bordas está ativa, aplicando os kernels em um único canal,
+    o que reduz o custo da filtragem mas pode impedir a detecção dos pontos do corpo
+    """
+
+    # resolução padrão (maior lado, em pixels) dos frames usados na detecção dos pontos do corpo
+    # (desativada por padrão com o valor 0, já que a redução pode alterar os pontos detectados)
+    RESOLUCAO_INFERENCIA = 0
+
+    # quantidade padrão de threads usadas pelos filtros de convolução
+    # (o valor 0 usa uma thread por núcleo do processador)
+    THREADS = 1
+
+    # se os kernels são aplicados apenas na luminância dos frames quando a detecção
+    # de bordas está ativa (desativado por padrão, já que o detector de poses
+    # raramente encontra o corpo em bordas detectadas em tons de cinza)
+    BORDAS_LUMINANCIA = False
+
+    def __init__(self, resolucao_inferencia=None, threads=None, bordas_luminancia=None):
+        """
+        Cria uma configuração dos filtros, com cada opção definida pelo parâmetro
+        de mesmo nome (por padrão o atributo de classe correspondente)
+        """
+        if resolucao_inferencia is None:
+            resolucao_inferencia = self.RESOLUCAO_INFERENCIA
+        else:
+            _checar_inteiro("resolucao_inferencia", resolucao_inferencia)
+
+        if threads is None:
+            threads = self.THREADS
+        else:
+            _checar_inteiro("threads", threads)
+
+        if bordas_luminancia is None:
+            bordas_luminancia = self.BORDAS_LUMINANCIA
+
+        self.resolucao_inferencia = resolucao_inferencia
+        self.threads              = threads
+        self.bordas_luminancia    = bool(bordas_luminancia)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__qualname__}(resolucao_inferencia={self.resolucao_inferencia}, "
+            f"threads={self.threads}, bordas_luminancia={self.bordas_luminancia})"
+        )
@@ -0,0 +1,113 @@
+"""
+Módulo com a leitura e a gravação dos pontos do corpo no cache de pontos pelos contadores
+de exercícios, ativado pelo parâmetro "cache_landmarks" dos contadores (ver o módulo
+cntexercicios.cache_landmarks), incluindo a contagem sem janela feita apenas a partir
+dos pontos armazenados, sem abrir o vídeo
+"""
+
+import os
+from time import perf_counter_ns
+
+import numpy as np
+
+from cntexercicios import instrumentacao as instr
+
+__all__ = ["preparar_cache", "gravar_cache", "contar_registro"]
+
+def preparar_cache(contador):
+    """
+    Carrega os pontos do vídeo do contador fornecido armazenados no cache caso
+    existam, ou prepara a gravação dos pontos detectados no cache
+    """
+    contador._registro_cache = None
+    contador._gravador_cache = None
+    contador._agendador.suspenso = False
+    if contador._cache is None or not isinstance(contador._video, str) or not os.path.isfile(contador._video):
+        return
+
+    # NOTE: os pontos são detectados em todos os frames enquanto o cache é usado,
+    #       para que os pontos gravados não dependam das heurísticas do agendamento
+    contador._agendador.suspenso = True
+    contador._config_cache = contador._configuracao_deteccao()
+    chave = contador._cache.chave(contador._video, contador._config_cache)
+    contador._registro_cache = contador._cache.carregar(chave)
+    if contador._registro_cache is None:
+        contador._gravador_cache = contador._cache.gravador(chave)
+
+def gravar_cache(contador, fps_video, filtros=None):
+    """
+    Adiciona os pontos detectados no frame atual do contador fornecido à gravação do
+    cache, junto com o tempo do frame, descartando a gravação caso a configuração da
+    detecção (com a configuração dos filtros fornecida, ver _configuracao_deteccao)
+    seja alterada, o parâmetro "fps_video" é usado apenas em frames sem um tempo
+    """
+    if contador._configuracao_deteccao(filtros) != contador._config_cache:
+        contador._gravador_cache.descartar()
+        contador._gravador_cache = None
+        contador._agendador.suspenso = False
+        return
+
+    # NOTE: o tempo real do frame é armazenado, para que a contagem pelo cache use
+    #       os mesmos tempos da contagem pelo vídeo em vídeos com taxa de frames variável
+    if contador._tempo is not None:
+        tempo = contador._tempo * 1000
+    else:
+        indice = contador._frames_lidos - 1
+        tempo = indice * 1000 / fps_video if fps_video > 0 else float(indice)
+    contador._gravador_cache.adicionar(contador._pontos_mediapipe(), tempo)
+
+def contar_registro(contador, registro, arquivo_metricas=None):
+    """
+    Conta os exercícios do contador fornecido usando apenas os pontos armazenados
+    no cache, sem abrir o vídeo, retornando a contagem
+    """
+    medicoes = contador._instrumentacao
+
+    # tempo de cada frame armazenado no cache, em segundos
+    tempos = np.asarray(registro.tempos, dtype=np.float64) / 1000
+
+    # conta todos os frames de uma vez quando os contadores implementam o cálculo vetorizado,
+    # exceto com a suavização do progresso, que depende do progresso dos frames anteriores
+    if not any(atual._suavizacao_progresso for atual in contador._contadores()):
+        try:
+            t_inicio = perf_counter_ns()
+            series = [
+                atual.contar_serie(
+                    *atual.calcular_progresso_serie(registro.landmarks),
+                    estado_inicial=atual._estado_exercicio,
+                    tempos=tempos, debounce=atual._debounce_repeticao
+                )
+                for atual in contador._contadores()
+            ]
+        except NotImplementedError:
+            pass
+        else:
+            medicoes.registrar(instr.ESTAGIO_CONTAGEM, perf_counter_ns() - t_inicio)
+            medicoes.registrar_frame()
+            for atual, (contagem, acumulada, estado) in zip(contador._contadores(), series):
+                atual._frames_lidos += len(registro)
+                atual._contagem += contagem
+                atual._estado_exercicio = estado
+                # as repetições são contadas nos frames em que a contagem acumulada aumenta
+                repeticoes = tempos[np.flatnonzero(np.diff(acumulada, prepend=0))].tolist()
+                atual._repeticoes.extend(repeticoes)
+                atual._tempos_repeticoes.extend(repeticoes)
+            if arquivo_metricas is not None:
+                medicoes.salvar(arquivo_metricas)
+            return contador._contagem
+
+    for indice in range(len(registro)):
+        t_inicio = perf_counter_ns()
+        contador._pontos = None
+        contador._carregar_landmarks(registro.landmarks[indice])
+        contador._frames_lidos += 1
+        contador._tempo = float(tempos[indice])
+        t_contagem = perf_counter_ns()
+        contador._contar_exercicio()
+        medicoes.registrar(instr.ESTAGIO_INFERENCIA, t_contagem - t_inicio)
+        medicoes.registrar(instr.ESTAGIO_CONTAGEM, perf_counter_ns() - t_contagem)
+        medicoes.registrar_frame()
+
+    if arquivo_metricas is not None:
+        medicoes.salvar(arquivo_metricas)
+    return contador._contagem
@@ -0,0 +1,145 @@
+"""
+Módulo com a contagem em estágios dos contadores de exercícios, ativada pelo parâmetro
+"estagios" da configuração da captura (ver ConfigCaptura do módulo cntexercicios.configuracao),
+onde a leitura dos frames, o preprocessamento e a detecção do corpo junto com a contagem são
+executados em threads separadas (ver o módulo cntexercicios.estagios), enquanto a janela é
+renderizada na thread principal
+"""
+
+import threading
+from time import perf_counter_ns
+
+import cv2
+
+from cntexercicios import estagios
+from cntexercicios import instrumentacao as instr
+from cntexercicios.video import abrir_video, extrair_frames, extrair_frames_recentes
+
+__all__ = ["contar_estagios"]
+
+def contar_estagios(contador, exibir):
+    """
+    Processa os frames do vídeo do contador fornecido em estágios executados em threads
+    separadas, a leitura dos frames (pelos leitores do módulo cntexercicios.video), o
+    preprocessamento (redução e filtros) e a detecção do corpo junto com a contagem,
+    conectados por filas de tamanho limitado, enquanto a janela é renderizada na
+    thread atual, retornando se o vídeo foi lido até o fim
+
+    Apenas o estágio de detecção altera o estado da contagem, e a janela é renderizada
+    a partir de uma cópia do estado enviada por ele junto com o frame. Em arquivos de
+    vídeo todos os frames são contados, enquanto em dispositivos de captura os frames
+    mais antigos são descartados quando a detecção não acompanha a captura, e a janela
+    sempre mostra o frame mais recente, descartando os frames que ela não mostrou a tempo
+
+    Os filtros não são aplicados novamente no frame do vídeo pausado, as alterações
+    dos filtros durante a pausa são aplicadas a partir do frame seguinte. A configuração
+    dos filtros é alterada apenas pela thread atual, que envia uma cópia dela ao estágio
+    de preprocessamento por uma fila sempre que ela muda (ver _estado_filtros)
+    """
+    medicoes = contador._instrumentacao
+    config_captura = contador._captura
+    registrar = medicoes.registrar
+
+    parar = threading.Event()
+
+    politica = estagios.DESCARTAR_ANTIGOS if contador._baixa_latencia else estagios.BLOQUEAR
+    fila_deteccao = estagios.FilaEstagios(config_captura.TAMANHO_FILA_ESTAGIOS, politica, parar)
+    fila_janela = estagios.FilaEstagios(config_captura.TAMANHO_FILA_ESTAGIOS, estagios.DESCARTAR_ANTIGOS, parar)
+    # NOTE: apenas a configuração mais recente dos filtros interessa ao preprocessamento
+    fila_filtros = estagios.FilaEstagios(1, estagios.DESCARTAR_ANTIGOS, parar)
+    filtros = filtros_enviados = contador._estado_filtros()
+
+    def esperar_pausa():
+        while contador._pausa and not parar.is_set():
+            parar.wait(0.01)
+
+    def preprocessar(item):
+        nonlocal filtros
+        esperar_pausa()
+        novos = fila_filtros.obter(bloquear=False)
+        if novos is not None:
+            filtros = novos
+        tempo, frame = item
+        return contador._preprocessar_frame(frame, tempo, filtros)
+
+    def processar_eventos():
+        nonlocal filtros_enviados
+        contador._processar_eventos()
+        estado = contador._estado_filtros()
+        if (estado[0], estado[2]) != (filtros_enviados[0], filtros_enviados[2]):
+            fila_filtros.colocar(estado)
+            filtros_enviados = estado
+
+    def detectar(item):
+        esperar_pausa()
+        contador._detectar_frame(item, fps_video)
+        if not exibir:
+            return None
+        return (*item[:4], contador._estado_janela())
+
+    fim_video = False
+    with abrir_video(contador._video) as captura:
+        # NOTE: os frames de arquivos de vídeo sempre são lidos antecipadamente,
+        #       para que a leitura também ocorra em uma thread separada
+        if contador._baixa_latencia:
+            frame_gen = extrair_frames_recentes(captura, com_tempo=True)
+        else:
+            frame_gen = extrair_frames(
+                captura, antecipar=contador._antecipar or config_captura.FRAMES_ANTECIPADOS, com_tempo=True
+            )
+        fps_video = captura.get(cv2.CAP_PROP_FPS)
+
+        threads = [
+            estagios.Estagio(preprocessar, frame_gen, fila_deteccao, parar, "preprocessamento"),
+            estagios.Estagio(detectar, fila_deteccao, fila_janela, parar, "deteccao")
+        ]
+        try:
+            item_janela = filtrado_janela = None
+            while True:
+                # sem a janela apenas o fim do vídeo ou um erro chegam à thread atual,
+                # com a janela os eventos são processados mesmo sem novos frames
+                item = fila_janela.obter(bloquear=not exibir)
+                if item is estagios.FIM:
+                    fim_video = True
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                medicoes.descartados = getattr(frame_gen, "descartados", 0) + fila_deteccao.descartados
+                if item is None and item_janela is None:
+                    processar_eventos()
+                    continue
+
+                t_renderizacao = perf_counter_ns()
+                if item is not None:
+                    item_janela = item
+                    if item[2] is not None and item[3] is None:
+                        filtrado_janela = item[2]
+                numero, frame, _, _, estado = item_janela
+
+                chave_janela = contador._configuracao_janela(numero)
+                if chave_janela != contador._chave_janela:
+                    if contador._mostrar_filtro and filtrado_janela is not None:
+                        # mostra o frame filtrado na resolução original do vídeo,
+                        # expandindo frames em tons de cinza para o formato BGR
+                        if filtrado_janela.shape[:2] != frame.shape[:2]:
+                            filtrado_janela = cv2.resize(filtrado_janela, frame.shape[1::-1])
+                        if filtrado_janela.ndim == 2:
+                            filtrado_janela = cv2.cvtColor(filtrado_janela, cv2.COLOR_GRAY2BGR)
+                        contador._renderizar_janela(filtrado_janela, estado)
+                    else:
+                        contador._renderizar_janela(frame, estado)
+                    contador._chave_janela = chave_janela
+
+                processar_eventos()
+                if item is not None:
+                    registrar(instr.ESTAGIO_RENDERIZACAO, perf_counter_ns() - t_renderizacao)
+                # verifica se o usuário fechou a janela
+                if contador._janela_fechada():
+                    break
+        finally:
+            # encerra os estágios antes que a captura seja fechada
+            parar.set()
+            for estagio in threads:
+                estagio.aguardar()
+
+    return fim_video
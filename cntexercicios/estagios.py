@@ -0,0 +1,162 @@
+"""
+Módulo com as filas e threads usadas na contagem em estágios, onde cada estágio do
+processamento dos frames (como a leitura, o preprocessamento e a detecção dos pontos
+do corpo) é executado em uma thread separada, conectada ao estágio seguinte por uma
+fila de tamanho limitado com uma política explícita para quando a fila está cheia
+"""
+
+import queue
+import threading
+
+__all__ = ["BLOQUEAR", "DESCARTAR_ANTIGOS", "POLITICAS", "FIM", "FilaEstagios", "Estagio"]
+
+# políticas das filas quando elas estão cheias: esperar até que o estágio seguinte
+# retire um item (nenhum item é perdido) ou descartar os itens mais antigos da fila
+# (o estágio seguinte sempre recebe os itens mais recentes)
+BLOQUEAR          = "bloquear"
+DESCARTAR_ANTIGOS = "descartar_antigos"
+POLITICAS = (BLOQUEAR, DESCARTAR_ANTIGOS)
+
+# marcador do fim dos itens de uma fila
+FIM = object()
+
+# intervalo (em segundos) entre as verificações de encerramento nas operações bloqueantes
+_INTERVALO_ESPERA = 0.05
+
+class FilaEstagios:
+    """
+    Fila de tamanho limitado entre dois estágios, que bloqueia ou descarta os itens
+    mais antigos quando está cheia de acordo com a política fornecida, contando os
+    itens descartados no atributo 'descartados'. O marcador FIM e os erros gerados
+    pelos estágios nunca são descartados.
+
+    As operações bloqueantes desistem quando o evento fornecido pelo parâmetro 'parar'
+    é ativado, o que permite encerrar todos os estágios de uma vez
+    """
+
+    def __init__(self, tamanho=2, politica=BLOQUEAR, parar=None):
+        """
+        Cria uma fila de até 'tamanho' itens com a política fornecida (BLOQUEAR ou
+        DESCARTAR_ANTIGOS), que é encerrada pelo evento fornecido pelo parâmetro 'parar'
+        """
+        if not isinstance(tamanho, int) or isinstance(tamanho, bool):
+            raise TypeError(f"esperado int para 'tamanho', recebido tipo {type(tamanho).__qualname__}")
+        if tamanho < 1:
+            raise ValueError("'tamanho' deve ser um número inteiro positivo")
+        if politica not in POLITICAS:
+            raise ValueError(
+                f"política desconhecida: {politica!r}, esperado um dos valores: {', '.join(POLITICAS)}"
+            )
+
+        self._fila     = queue.Queue(maxsize=tamanho)
+        self._politica = politica
+        self._parar    = threading.Event() if parar is None else parar
+        self.descartados = 0
+
+    def colocar(self, item):
+        """
+        Coloca um item na fila de acordo com a política dela, retornando se o item
+        foi colocado (o que só não ocorre caso a fila seja encerrada enquanto espera)
+        """
+        descartavel = item is not FIM and not isinstance(item, BaseException)
+        if descartavel and self._politica == DESCARTAR_ANTIGOS:
+            # NOTE: apenas o estágio anterior coloca itens na fila, então depois
+            #       de retirar um item sempre há espaço para o novo item
+            while True:
+                try:
+                    self._fila.put_nowait(item)
+                    return True
+                except queue.Full:
+                    pass
+                try:
+                    self._fila.get_nowait()
+                    self.descartados += 1
+                except queue.Empty:
+                    pass
+
+        while not self._parar.is_set():
+            try:
+                self._fila.put(item, timeout=_INTERVALO_ESPERA)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def obter(self, bloquear=True):
+        """
+        Retira e retorna o próximo item da fila, esperando por ele caso 'bloquear' seja
+        verdadeiro, retornando None caso a fila esteja vazia sem bloquear ou o marcador
+        FIM caso a fila seja encerrada enquanto espera
+        """
+        if not bloquear:
+            try:
+                return self._fila.get_nowait()
+            except queue.Empty:
+                return None
+
+        while not self._parar.is_set():
+            try:
+                return self._fila.get(timeout=_INTERVALO_ESPERA)
+            except queue.Empty:
+                continue
+        return FIM
+
+    def __iter__(self):
+        """
+        Retorna os itens da fila até o marcador FIM, gerando os erros colocados nela
+        """
+        while True:
+            item = self.obter()
+            if item is FIM:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+class Estagio:
+    """
+    Estágio executado em uma thread, que aplica uma função a cada item lido de uma
+    entrada (uma FilaEstagios ou qualquer iterador, como os leitores de frames do módulo
+    cntexercicios.video), colocando os resultados diferentes de None na fila de saída,
+    seguidos pelo marcador FIM quando a entrada termina ou pelo erro gerado pela
+    entrada ou pela função, que é repassado aos estágios seguintes
+
+    A thread é encerrada ao fim da entrada, após um erro ou quando o evento fornecido
+    pelo parâmetro 'parar' é ativado, que também deve encerrar a fila de saída
+    """
+
+    def __init__(self, funcao, entrada, saida, parar, nome=None):
+        """
+        Inicia o estágio, que aplica a função fornecida aos itens de 'entrada'
+        colocando os resultados em 'saida' até que o evento 'parar' seja ativado
+        """
+        self._funcao  = funcao
+        self._entrada = entrada
+        self._saida   = saida
+        self._parar   = parar
+
+        self._thread = threading.Thread(target=self._executar, name=nome, daemon=True)
+        self._thread.start()
+
+    def _executar(self):
+        """
+        Função executada na thread do estágio
+        """
+        try:
+            for item in self._entrada:
+                if self._parar.is_set():
+                    return
+                resultado = self._funcao(item)
+                if resultado is not None and not self._saida.colocar(resultado):
+                    return
+        except Exception as erro:
+            self._saida.colocar(erro)
+        else:
+            self._saida.colocar(FIM)
+
+    def aguardar(self, timeout=None):
+        """
+        Espera o fim da thread do estágio, retornando se ela terminou
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
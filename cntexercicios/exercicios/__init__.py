@@ -10,6 +10,7 @@ NOTA: As funções antigas de listagem, registro e execução de contadores
 """
 
 from abc import ABC, abstractmethod
+from time import perf_counter_ns
 
 import cv2
 
@@ -74,11 +75,65 @@ class ContadorExercicios(ABC):
         super().__init__(cls, *args, **kwargs)
         ContadorExercicios.registro[cls.NOME_EXERCICIO] = cls
 
-    def __init__(self, video, titulo=None):
+    # quantidade de resoluções de frames filtrados (como as dos recortes da região de
+    # interesse) cujos arrays de trabalho dos filtros são mantidos entre frames, as
+    # resoluções usadas há mais tempo são descartadas primeiro
+    ESPACOS_FILTROS = 4
+
+    # parâmetros da contagem baseados no tempo dos frames (em segundos) e não na quantidade
+    # de frames, o que mantém o resultado quando frames são pulados ou descartados ou quando
+    # a taxa de frames varia: repetições iniciadas menos de DEBOUNCE_REPETICAO segundos após
+    # a última repetição contada são tratadas como oscilações do progresso e não são contadas,
+    # e o progresso é suavizado por uma média móvel exponencial com constante de tempo
+    # SUAVIZACAO_PROGRESSO (ambos desativados com o valor 0, o que não altera a contagem)
+    DEBOUNCE_REPETICAO   = 0.0
+    SUAVIZACAO_PROGRESSO = 0.0
+
+    # parâmetros do detector de poses criado pelo método criar_pose
+    CONFIG_POSE = {
+        "min_tracking_confidence":  0.5,
+        "min_detection_confidence": 0.5
+    }
+
+    def __init__(self, video, titulo=None, pose=None, captura=None, filtros=None, cache_landmarks=None,
+                 agendamento=None, debounce_repeticao=None, suavizacao_progresso=None):
         """
         Cria um contador de exercícios para a contagem no vídeo fornecido pelo parâmetro "video",
         o título da janela mostrando o vídeo pode ser passado pelo parâmetro "título", NÃO UTILIZE
         títulos com acentuação, isso pode fazer com que a janela não seja criada e o contador falhe
+
+        Um detector de poses do mediapipe já criado pode ser fornecido pelo parâmetro "pose"
+        para que ele seja reutilizado entre contadores (ver o método criar_pose), caso
+        contrário um novo detector é criado para o contador
+
+        A leitura dos frames (leitura antecipada, modo de baixa latência, modo ocioso e
+        contagem em estágios) pode ser configurada pelo parâmetro "captura", que recebe um
+        objeto ConfigCaptura, e a aplicação dos filtros (resolução de inferência, threads
+        dos filtros e filtragem na luminância) pelo parâmetro "filtros", que recebe um objeto
+        ConfigFiltros, ambos do módulo cntexercicios.configuracao. Por padrão a configuração
+        da captura depende do tipo do vídeo (arquivo de vídeo ou dispositivo de captura)
+
+        Os pontos do corpo detectados em arquivos de vídeo podem ser armazenados em cache
+        pelo parâmetro "cache_landmarks", que pode ser True para usar a pasta de cache padrão,
+        o caminho de uma pasta ou um objeto CacheLandmarks (do módulo cntexercicios.cache_landmarks).
+        Quando o vídeo já está no cache, os pontos armazenados são usados ao invés de detectá-los
+        novamente, e a contagem sem janela é feita sem decodificar o vídeo. Enquanto o cache
+        é usado, os pontos são detectados em todos os frames e no frame inteiro, sem as
+        heurísticas do agendamento (ver o parâmetro "agendamento"), para que os pontos
+        armazenados não dependam delas nem dos limiares da contagem
+
+        O agendamento da detecção dos pontos do corpo pode ser configurado pelo parâmetro
+        "agendamento", que pode ser um objeto ConfigAgendamento (do módulo cntexercicios.agendamento)
+        com as heurísticas que pulam a detecção em alguns frames ou a fazem apenas na região
+        em volta da pessoa, ou True para ativar todas elas. Por padrão os pontos são detectados
+        no frame inteiro em todos os frames, já que as heurísticas podem alterar a contagem
+
+        A contagem usa o tempo de cada frame (a posição dele em arquivos de vídeo ou o
+        instante da captura em dispositivos de captura) ao invés da quantidade de frames,
+        o tempo mínimo entre duas repetições contadas pode ser configurado pelo parâmetro
+        "debounce_repeticao" (DEBOUNCE_REPETICAO por padrão) e a constante de tempo da
+        suavização do progresso do exercício pelo parâmetro "suavizacao_progresso"
+        (SUAVIZACAO_PROGRESSO por padrão), ambos em segundos e desativados com o valor 0
         """
 
         # checagem de parâmetros
@@ -89,8 +144,80 @@ class ContadorExercicios(ABC):
         elif len(titulo) == 0:
             raise ValueError("'titulo' não pode ser uma string vazia")
 
-        # imports locais
-        import mediapipe as mp
+        from cntexercicios.configuracao import ConfigCaptura, ConfigFiltros
+        if captura is None:
+            captura = ConfigCaptura()
+        elif not isinstance(captura, ConfigCaptura):
+            raise TypeError(
+                f"esperado ConfigCaptura ou None para 'captura', recebido tipo {type(captura).__qualname__}"
+            )
+
+        if filtros is None:
+            filtros = ConfigFiltros()
+        elif not isinstance(filtros, ConfigFiltros):
+            raise TypeError(
+                f"esperado ConfigFiltros ou None para 'filtros', recebido tipo {type(filtros).__qualname__}"
+            )
+
+        # NOTE: a leitura antecipada não é usada em dispositivos de captura,
+        #       já que isso aumentaria o atraso entre a captura e a contagem
+        antecipar_frames = captura.antecipar_frames
+        if antecipar_frames is None:
+            antecipar_frames = 0 if isinstance(video, int) else captura.FRAMES_ANTECIPADOS
+
+        baixa_latencia = captura.baixa_latencia
+        if baixa_latencia is None:
+            baixa_latencia = isinstance(video, int)
+
+        modo_ocioso = captura.modo_ocioso
+        if modo_ocioso is None:
+            modo_ocioso = isinstance(video, int)
+
+        from cntexercicios.agendamento import ConfigAgendamento
+        if agendamento is None or agendamento is False:
+            agendamento = ConfigAgendamento()
+        elif agendamento is True:
+            agendamento = ConfigAgendamento(
+                controle_movimento=True, amostragem_adaptativa=True, roi_inferencia=True
+            )
+        elif not isinstance(agendamento, ConfigAgendamento):
+            raise TypeError(
+                "esperado bool, ConfigAgendamento ou None para 'agendamento', "
+                f"recebido tipo {type(agendamento).__qualname__}"
+            )
+
+        if debounce_repeticao is None:
+            debounce_repeticao = self.DEBOUNCE_REPETICAO
+        elif not isinstance(debounce_repeticao, (int, float)) or isinstance(debounce_repeticao, bool):
+            raise TypeError(
+                "esperado int, float ou None para 'debounce_repeticao', "
+                f"recebido tipo {type(debounce_repeticao).__qualname__}"
+            )
+        elif debounce_repeticao < 0:
+            raise ValueError("'debounce_repeticao' não pode ser um número negativo")
+
+        if suavizacao_progresso is None:
+            suavizacao_progresso = self.SUAVIZACAO_PROGRESSO
+        elif not isinstance(suavizacao_progresso, (int, float)) or isinstance(suavizacao_progresso, bool):
+            raise TypeError(
+                "esperado int, float ou None para 'suavizacao_progresso', "
+                f"recebido tipo {type(suavizacao_progresso).__qualname__}"
+            )
+        elif suavizacao_progresso < 0:
+            raise ValueError("'suavizacao_progresso' não pode ser um número negativo")
+
+        from cntexercicios.cache_landmarks import CacheLandmarks
+        if cache_landmarks is None or cache_landmarks is False:
+            cache_landmarks = None
+        elif cache_landmarks is True:
+            cache_landmarks = CacheLandmarks()
+        elif isinstance(cache_landmarks, str):
+            cache_landmarks = CacheLandmarks(cache_landmarks)
+        elif not isinstance(cache_landmarks, CacheLandmarks):
+            raise TypeError(
+                "esperado bool, str, CacheLandmarks ou None para 'cache_landmarks', "
+                f"recebido tipo {type(cache_landmarks).__qualname__}"
+            )
 
         # atributos genéricos
         self._titulo         = titulo
@@ -98,7 +225,11 @@ class ContadorExercicios(ABC):
         self._pausa          = False
         self._ajuda          = False
         self._mostrar_pontos = False
+        self._mostrar_metricas = False
         self._frame          = None
+        self._captura        = captura
+        self._antecipar      = antecipar_frames
+        self._baixa_latencia = baixa_latencia
 
         # atributos relacionados aos filtros
         from cntexercicios.filtros import kernel_nitidez, kernel_gauss, kernel_deteccao_borda
@@ -107,6 +238,15 @@ class ContadorExercicios(ABC):
         self._filtro_contraste = False
         self._mostrar_filtro   = False
 
+        # filtro de contraste com estado, que suaviza o contraste entre frames, e os
+        # arrays de trabalho dos filtros, reutilizados entre frames da mesma resolução,
+        # com um espaço de trabalho por resolução das últimas resoluções usadas
+        from collections import OrderedDict
+        from cntexercicios.filtros import ContrasteTemporal
+        self._contraste_temporal = ContrasteTemporal()
+        self._espacos_filtros    = OrderedDict()
+        self._espaco_filtros     = None
+
         # parâmetros dos filtros
         self._peso  = 0.5
         self._sigma = 1
@@ -116,14 +256,40 @@ class ContadorExercicios(ABC):
         self._filtros[self.FILTRO_GAUSS_IDX]   = kernel_gauss(3, sigma=self._sigma)
         self._filtros[self.FILTRO_BORDAS_IDX]  = kernel_deteccao_borda()
 
+        # pipeline compilado dos filtros ativos e a configuração usada para compilá-lo
+        self._pipeline_filtros = None
+        self._config_pipeline  = None
+        self._threads_filtros  = filtros.threads
+        self._bordas_luminancia = filtros.bordas_luminancia
+
+        # resolução máxima dos frames usados na detecção dos pontos do corpo e os buffers
+        # reutilizados entre frames para a redução e a conversão para RGB deles
+        self._resolucao_inferencia = filtros.resolucao_inferencia
+        self._tamanho_inferencia   = None
+        self._buffer_reduzido      = None
+        self._buffer_rgb           = None
+
         # atributos relacionado as poses
-        self._pose = mp.solutions.pose.Pose(
-            min_tracking_confidence=0.5,
-            min_detection_confidence=0.5
-        )
+        if pose is None:
+            pose = self.criar_pose()
+        self._pose = pose
         self._corpo = None
         self._pontos = None
 
+        # pontos do corpo detectados no frame atual como um array de dimensões (33, 4),
+        # com os valores x, y (invertido), z e visibilidade de cada ponto, preenchido
+        # uma única vez por frame e reutilizado entre frames (ver _posicao_landmark)
+        import numpy as np
+        from cntexercicios.landmarks import QTD_LANDMARKS, VALORES_LANDMARK
+        self._landmarks = np.full((QTD_LANDMARKS, VALORES_LANDMARK), np.nan)
+        self._detectado = False
+
+        # atributos do cache de pontos do corpo
+        self._cache          = cache_landmarks
+        self._config_cache   = None
+        self._registro_cache = None
+        self._gravador_cache = None
+
         # atributos de renderização do texto
         self._fonte          = cv2.FONT_HERSHEY_SIMPLEX
         self._tamanho_fonte  = 0.60
@@ -133,92 +299,716 @@ class ContadorExercicios(ABC):
         # atributos de contagem de exercícios
         self._contagem = 0
         self._estado_exercicio = False
+        self._frames_lidos = 0
+
+        # tempo do frame atual em segundos e o tempo de cada repetição contada
+        self._tempo           = None
+        self._tempos_repeticoes = []
+
+        # parâmetros da contagem baseados no tempo e o último progresso suavizado,
+        # junto com o tempo do frame em que ele foi calculado
+        self._debounce_repeticao   = float(debounce_repeticao)
+        self._suavizacao_progresso = float(suavizacao_progresso)
+        self._progresso_suavizado  = None
+
+        # contadores de outros exercícios que recebem os pontos detectados por esse
+        # contador em cada frame, usados pela classe ContagemMultipla
+        self._seguidores = []
+
+        # identificador do frame atual, que não muda em frames considerados iguais ao
+        # anterior no modo ocioso, e as chaves do frame filtrado e da janela renderizada,
+        # que permitem reutilizá-los enquanto o frame e a configuração não mudam
+        from cntexercicios.video import DetectorMovimento
+        self._detector_ocioso = None
+        if modo_ocioso:
+            self._detector_ocioso = DetectorMovimento(
+                captura.PASSO_OCIOSO, captura.LIMIAR_OCIOSO, captura.FRACAO_OCIOSO
+            )
+        self._id_frame        = 0
+        self._frame_filtrado  = None
+        self._chave_filtrado  = None
+        self._chave_janela    = None
+
+        # agendador da detecção dos pontos do corpo, o último progresso calculado do exercício,
+        # os tempos das últimas repetições contadas, usados no debounce das repetições e na
+        # estimativa do período delas pelo agendador, e se os pontos do frame atual foram detectados
+        from collections import deque
+        from cntexercicios.agendamento import AgendadorInferencia
+        self._agendador  = AgendadorInferencia(agendamento)
+        self._progresso  = None
+        self._repeticoes = deque(maxlen=agendamento.REPETICOES_AMOSTRAGEM)
+        self._inferido   = False
+
+        # número do último frame preprocessado
+        self._numero_frame = 0
+
+        # medições do tempo gasto em cada estágio da contagem
+        from cntexercicios.instrumentacao import Instrumentacao
+        self._instrumentacao = Instrumentacao()
+
+    @staticmethod
+    def criar_pose():
+        """
+        Cria o detector de poses do mediapipe usado pelos contadores, que pode
+        ser compartilhado entre contadores que não são usados simultaneamente
+        """
+        import mediapipe as mp
+        return mp.solutions.pose.Pose(**ContadorExercicios.CONFIG_POSE)
 
-    def contar(self):
+    def contar(self, exibir=True, arquivo_metricas=None):
         """
         Faz a contagem dos exercícios no vídeo, chamando funções internas para
         detectar o corpo da pessoa, contar o exercício, renderizar a janela,
         processar eventos e detectar quando a janela é fechada
+
+        Caso um valor falso seja passado ao parâmetro "exibir", a contagem é feita
+        sem criar a janela (e sem processar eventos dela) até o fim do vídeo,
+        o que permite usar o contador em servidores sem interface gráfica
+
+        O tempo gasto em cada estágio do processamento dos frames é medido durante a
+        contagem, e o resumo das medições é salvo no formato JSON no caminho fornecido
+        pelo parâmetro "arquivo_metricas", ou mostrado no terminal ao fim da contagem
+        caso nenhum arquivo seja fornecido e a janela seja exibida
         """
-        from cntexercicios.video import abrir_video, extrair_frames
+        # reinicia as medições e o estado mantido entre os frames para a nova contagem
+        self.iniciar_contagem()
+        medicoes = self._instrumentacao
+
+        # procura os pontos do vídeo no cache, contando diretamente
+        # pelos pontos armazenados caso a janela não seja exibida
+        from cntexercicios.contagem_cache import preparar_cache, contar_registro
+        preparar_cache(self)
+        if self._registro_cache is not None and not exibir:
+            return contar_registro(self, self._registro_cache, arquivo_metricas)
 
         # processa os frames do vídeo, contando o exercício
+        if self._captura.estagios:
+            from cntexercicios.contagem_estagios import contar_estagios
+            fim_video = contar_estagios(self, exibir)
+        else:
+            fim_video = self._contar_frames(exibir)
+
+        # salva os pontos detectados no cache caso o vídeo tenha sido lido até o fim
+        if self._gravador_cache is not None:
+            if fim_video:
+                self._gravador_cache.concluir()
+            self._gravador_cache = None
+
+        # mostra ou salva o resumo das medições
+        if arquivo_metricas is not None:
+            medicoes.salvar(arquivo_metricas)
+        elif exibir:
+            print(medicoes.texto_resumo())
+
+        # retorne o resultado
+        return self._contagem
+
+    def iniciar_contagem(self):
+        """
+        Reinicia as medições e o estado mantido entre os frames (como o estado dos filtros
+        e do agendamento da detecção) para uma nova contagem, mantendo a contagem atual,
+        deve ser chamado antes de processar os frames de um vídeo pelo método processar_frame
+        """
+        from cntexercicios.instrumentacao import Instrumentacao
+        self._instrumentacao = Instrumentacao()
+        self._contraste_temporal.reiniciar()
+        self._reiniciar_frames()
+
+    def processar_frame(self, tempo, frame, pose=None, descartados=None):
+        """
+        Aplica os filtros, detecta o corpo e conta o exercício no frame fornecido (no formato
+        BGR), com o tempo dele em segundos (ou None), para contagens em que os frames são lidos
+        fora do contador, como a contagem de vários vídeos do módulo cntexercicios.cameras,
+        após uma chamada ao método iniciar_contagem
+
+        Um detector de poses diferente do detector do contador pode ser usado no frame pelo
+        parâmetro "pose", como um detector por thread compartilhado entre contadores (que
+        não deve acompanhar a pessoa entre frames), e a quantidade total de frames descartados
+        pela leitura até esse frame pode ser informada às medições pelo parâmetro "descartados"
+        """
+        if descartados is not None:
+            self._instrumentacao.descartados = descartados
+        self._detectar_frame(self._preprocessar_frame(frame, tempo), pose=pose)
+
+    @property
+    def instrumentacao(self):
+        """
+        Medições do tempo gasto em cada estágio da contagem atual (um objeto Instrumentacao
+        do módulo cntexercicios.instrumentacao), reiniciadas no início de cada contagem
+        """
+        return self._instrumentacao
+
+    def _contar_frames(self, exibir):
+        """
+        Processa os frames do vídeo sequencialmente, aplicando os filtros, detectando
+        o corpo, contando o exercício e renderizando a janela em cada frame, retornando
+        se o vídeo foi lido até o fim
+        """
+        from cntexercicios.video import abrir_video, extrair_frames, extrair_frames_recentes
+        from cntexercicios.contagem_cache import gravar_cache
+        from cntexercicios import instrumentacao as instr
+        medicoes = self._instrumentacao
+        registrar = medicoes.registrar
+
         with abrir_video(self._video) as captura:
-            frame_gen = extrair_frames(captura)
+            if self._baixa_latencia:
+                frame_gen = extrair_frames_recentes(captura, com_tempo=True)
+            else:
+                frame_gen = extrair_frames(captura, antecipar=self._antecipar, com_tempo=True)
+            fps_video = captura.get(cv2.CAP_PROP_FPS)
 
+            fim_video = False
+            posicao = 0
             while True:
+                t_inicio = perf_counter_ns()
+                novo_frame = not self._pausa
                 if self._pausa:
                     frame = self._frame
                 else:
                     try:
-                        frame = next(frame_gen)
+                        tempo, frame = next(frame_gen)
                     except StopIteration:
+                        fim_video = True
                         break
                     else:
-                        self._frame = frame
+                        # os frames pulados sem decodificação reutilizam os pontos do
+                        # último frame, que também são armazenados no cache
+                        pulados = getattr(frame_gen, "posicao", posicao + 1) - posicao - 1
+                        posicao += pulados + 1
+                        for _ in range(pulados):
+                            self._frames_lidos += 1
+                            medicoes.registrar_inferencia(pulada=True)
+                            if self._gravador_cache is not None:
+                                gravar_cache(self, fps_video)
 
-                # aplica os filtros ativos no frame
-                frame_filtrado = self._aplicar_filtros(frame)
-                # faz a detecção do corpo da pessoa presente no vídeo
-                self._detectar_corpo(frame_filtrado)
-                # detecta a transição entre estados do exercício,
-                # aumentando a contagem dele em cada ciclo completo
-                self._contar_exercicio()
-                if self._mostrar_filtro:
-                    self._renderizar_janela(frame_filtrado)
-                else:
-                    self._renderizar_janela(frame)
+                        self._frame = frame
+                        self._tempo = tempo
+                        self._frames_lidos += 1
+                        registrar(instr.ESTAGIO_DECODIFICACAO, perf_counter_ns() - t_inicio)
+                        # NOTE: no modo ocioso, frames iguais ao último frame processado
+                        #       mantêm o identificador dele, reutilizando os resultados
+                        detector = self._detector_ocioso
+                        if detector is None or detector.movimento(frame):
+                            if detector is not None:
+                                detector.atualizar(frame)
+                            self._id_frame += 1
+
+                # aplica os filtros e detecta o corpo apenas quando o frame ou a
+                # configuração dos filtros mudam, o que não ocorre no vídeo pausado
+                # NOTE: a visualização dos filtros também faz parte da chave, já que
+                #       ela mostra o frame inteiro ao invés da região de interesse
+                chave_filtrado = (self._id_frame, self._configuracao_filtros(), self._mostrar_filtro)
+                if chave_filtrado != self._chave_filtrado:
+                    # aplica os filtros ativos no frame
+                    t_filtragem = perf_counter_ns()
+                    self._frame_filtrado = self._aplicar_filtros(frame)
+                    self._chave_filtrado = chave_filtrado
+                    # faz a detecção do corpo da pessoa presente no vídeo
+                    t_inferencia = perf_counter_ns()
+                    self._detectar_corpo(self._frame_filtrado, self._agendador.roi_frame, novo_frame)
+                    # detecta a transição entre estados do exercício,
+                    # aumentando a contagem dele em cada ciclo completo
+                    t_contagem = perf_counter_ns()
+                    if novo_frame and self._gravador_cache is not None:
+                        gravar_cache(self, fps_video)
+                    self._contar_exercicio()
+                    # agenda a próxima detecção dos pontos do corpo, pulando os frames
+                    # intermediários sem decodificá-los quando a janela não é exibida
+                    if novo_frame and self._inferido:
+                        restantes = self._intervalo_amostragem() - 1
+                        if restantes and not exibir and hasattr(frame_gen, "pular"):
+                            frame_gen.pular(restantes)
+                        else:
+                            self._agendador.amostras_restantes = restantes
+                    t_renderizacao = perf_counter_ns()
+                    registrar(instr.ESTAGIO_FILTRAGEM,  t_inferencia - t_filtragem)
+                    registrar(instr.ESTAGIO_INFERENCIA, t_contagem - t_inferencia)
+                    registrar(instr.ESTAGIO_CONTAGEM,   t_renderizacao - t_contagem)
+                elif novo_frame and self._gravador_cache is not None:
+                    gravar_cache(self, fps_video)
+                medicoes.descartados = getattr(frame_gen, "descartados", 0)
+                if not exibir:
+                    medicoes.registrar_frame()
+                    continue
+
+                # renderiza a janela apenas quando o conteúdo dela muda, caso contrário
+                # a janela continua mostrando o último frame renderizado
+                t_renderizacao = perf_counter_ns()
+                chave_janela = self._configuracao_janela(chave_filtrado)
+                if chave_janela != self._chave_janela:
+                    if self._mostrar_filtro:
+                        # mostra o frame filtrado na resolução original do vídeo,
+                        # expandindo frames em tons de cinza para o formato BGR
+                        frame_filtrado = self._frame_filtrado
+                        if frame_filtrado.shape[:2] != frame.shape[:2]:
+                            frame_filtrado = cv2.resize(frame_filtrado, frame.shape[1::-1])
+                        if frame_filtrado.ndim == 2:
+                            frame_filtrado = cv2.cvtColor(frame_filtrado, cv2.COLOR_GRAY2BGR)
+                        self._renderizar_janela(frame_filtrado)
+                    else:
+                        self._renderizar_janela(frame)
+                    self._chave_janela = chave_janela
 
                 self._processar_eventos()
+                if novo_frame:
+                    registrar(instr.ESTAGIO_RENDERIZACAO, perf_counter_ns() - t_renderizacao)
+                    medicoes.registrar_frame()
                 # verifica se o usuário fechou a janela
                 if self._janela_fechada():
                     break
 
-        # retorne o resultado
-        return self._contagem
+        return fim_video
+
+    def _preprocessar_frame(self, frame, tempo=None, filtros=None):
+        """
+        Estágio de preprocessamento da contagem em estágios (também usado pelo método
+        processar_frame), numera o frame e aplica os filtros nele exceto quando ele é igual
+        ao último frame processado (no modo ocioso) ou quando a amostragem adaptativa já
+        agendou a detecção para um frame posterior, retornando a tupla (numero, frame,
+        filtrado, roi, repetido, tempo, configuracao) usada pelo método _detectar_frame,
+        com o tempo do frame em segundos e a configuração dos filtros aplicados
+
+        Os filtros são aplicados com a cópia da configuração dos filtros fornecida pelo
+        parâmetro "filtros" (ver _estado_filtros), ou com a configuração atual do contador
+        """
+        from cntexercicios import instrumentacao as instr
+        t_filtragem = perf_counter_ns()
+        if filtros is None:
+            filtros = self._estado_filtros()
+        self._numero_frame += 1
+        numero = self._numero_frame
+
+        detector = self._detector_ocioso
+        repetido = detector is not None and not detector.movimento(frame)
+        if detector is not None and not repetido:
+            detector.atualizar(frame)
+
+        # NOTE: o frame filtrado pertence ao espaço de trabalho dos filtros,
+        #       então ele é copiado antes de ser enviado ao próximo estágio
+        filtrado = roi = None
+        if not repetido and (filtros[2] or numero > self._agendador.proxima_amostra):
+            filtrado = self._aplicar_filtros(frame, filtros).copy()
+            roi = self._agendador.roi_frame
+        self._instrumentacao.registrar(instr.ESTAGIO_FILTRAGEM, perf_counter_ns() - t_filtragem)
+        return numero, frame, filtrado, roi, repetido, tempo, filtros[0]
+
+    def _detectar_frame(self, item, fps_video=None, pose=None):
+        """
+        Estágio de detecção da contagem em estágios, detecta o corpo no frame filtrado
+        pelo método _preprocessar_frame e conta o exercício, o parâmetro "fps_video" é
+        usado apenas para gravar os pontos no cache e o parâmetro "pose" permite usar
+        outro detector de poses (ver processar_frame)
+
+        A configuração dos filtros usada na identificação dos pontos do cache é a
+        configuração com que o frame foi filtrado, enviada junto com ele
+        """
+        from cntexercicios import instrumentacao as instr
+        medicoes = self._instrumentacao
+        numero, frame, filtrado, roi, repetido, tempo, filtros = item
+        t_inferencia = perf_counter_ns()
+        self._frame = frame
+        self._tempo = tempo
+        self._frames_lidos += 1
+        if repetido:
+            medicoes.registrar_inferencia(pulada=True)
+        else:
+            self._detectar_corpo(filtrado, roi, pose=pose, filtros=filtros)
+
+        t_contagem = perf_counter_ns()
+        if self._gravador_cache is not None:
+            from cntexercicios.contagem_cache import gravar_cache
+            gravar_cache(self, fps_video, filtros)
+        if not repetido:
+            self._contar_exercicio()
+            # NOTE: os frames que a amostragem adaptativa vai pular são informados
+            #       ao preprocessamento, que deixa de aplicar os filtros neles
+            if self._inferido:
+                agendador = self._agendador
+                agendador.amostras_restantes = self._intervalo_amostragem() - 1
+                agendador.proxima_amostra = numero + agendador.amostras_restantes
+        medicoes.registrar(instr.ESTAGIO_INFERENCIA, t_contagem - t_inferencia)
+        medicoes.registrar(instr.ESTAGIO_CONTAGEM,   perf_counter_ns() - t_contagem)
+        medicoes.registrar_frame()
+
+    def _estado_janela(self):
+        """
+        Retorna uma cópia do estado da contagem mostrado na janela, uma tupla (contagens,
+        pontos) com as contagens retornadas pelo método _contagens e os pontos do corpo
+        no formato do mediapipe, ou None caso eles não sejam mostrados
+        """
+        mostrar = self._mostrar_pontos and self._detectado
+        return self._contagens(), self._pontos_mediapipe() if mostrar else None
+
+    def _reiniciar_frames(self):
+        """
+        Reinicia o estado mantido entre os frames de uma contagem
+        """
+        self._chave_filtrado = self._chave_janela = None
+        self._numero_frame = 0
+        if self._detector_ocioso is not None:
+            self._detector_ocioso.reiniciar()
+        for contador in self._contadores():
+            contador._repeticoes.clear()
+            contador._tempo = contador._progresso_suavizado = None
+        self._agendador.reiniciar()
+
+    def _contadores(self):
+        """
+        Retorna uma tupla com esse contador seguido pelos contadores que recebem os pontos dele
+        """
+        return (self, *self._seguidores)
+
+    def _contagens(self):
+        """
+        Retorna uma tupla com a contagem desse contador e dos contadores que recebem os pontos dele
+        """
+        return tuple(contador._contagem for contador in self._contadores())
+
+    def _configuracao_deteccao(self, filtros=None):
+        """
+        Retorna um dicionário serializável em JSON com a configuração que afeta os pontos
+        do corpo detectados, usado para identificar as entradas do cache de pontos, com a
+        configuração dos filtros fornecida pelo parâmetro "filtros" (ver _configuracao_filtros)
+        ou a configuração atual dos filtros
+        """
+        import mediapipe as mp
+        if filtros is None:
+            filtros = self._configuracao_filtros()
+        configuracao = {
+            "mediapipe": getattr(mp, "__version__", None),
+            "pose":      self.CONFIG_POSE,
+            "resolucao": self._resolucao_inferencia,
+            "filtros":   filtros
+        }
+        # NOTE: o agendador é suspenso enquanto o cache é usado, então os pontos armazenados
+        #       são detectados em todos os frames, caso contrário os frames inferidos dependem
+        #       das heurísticas e do progresso de todos os exercícios contados
+        if self._agendador.ativo:
+            configuracao["agendamento"] = self._agendador.configuracao()
+            configuracao["limiares"] = [
+                [contador.NOME_EXERCICIO, contador.LIMIAR_EXERCICIO_MIN, contador.LIMIAR_EXERCICIO_MAX]
+                for contador in self._contadores()
+            ]
+        return configuracao
+
+    def _configuracao_filtros(self):
+        """
+        Retorna uma tupla que identifica a configuração atual dos filtros,
+        usada para detectar quando o pipeline de filtros deve ser recompilado
+        """
+        return (
+            self._filtro_contraste, tuple(self._filtros_ativos), self._peso, self._sigma,
+            self._bordas_luminancia and self._filtros_ativos[self.FILTRO_BORDAS_IDX]
+        )
+
+    def _estado_filtros(self):
+        """
+        Retorna uma cópia da configuração dos filtros, uma tupla (configuracao, kernels,
+        mostrar) com a configuração retornada pelo método _configuracao_filtros, os kernels
+        dos filtros ativos em ordem e se o frame filtrado é mostrado na janela, o que permite
+        aplicar os filtros em outra thread enquanto a thread da janela altera os filtros
+
+        NOTE: os kernels não são copiados, já que eles são substituídos por novos
+              arrays (e nunca alterados) quando os parâmetros dos filtros mudam
+        """
+        kernels = tuple(self._filtros[idx] for idx, ativo in enumerate(self._filtros_ativos) if ativo)
+        return self._configuracao_filtros(), kernels, self._mostrar_filtro
+
+    def _compilar_filtros(self, filtros):
+        """
+        Compila os filtros ativos na cópia da configuração dos filtros fornecida (ver
+        _estado_filtros) em um pipeline de filtros, que é reutilizado em todos os frames
+        até que a configuração dos filtros seja alterada
+        """
+        from cntexercicios.filtros import PipelineFiltros
+        configuracao, kernels, _ = filtros
+        contraste = self._contraste_temporal if configuracao[0] else False
+        # NOTE: caso configurado, os kernels são aplicados apenas na luminância do
+        #       frame com a detecção de bordas ativa, já que o kernel de detecção de
+        #       bordas funciona melhor em tons de cinza, com um terço do custo
+        luminancia = configuracao[-1]
+        return PipelineFiltros(
+            kernels, contraste=contraste, threads=self._threads_filtros, luminancia=luminancia
+        )
 
-    def _aplicar_filtros(self, frame):
-        # coleta os filtros a serem aplicados
-        indices = [idx for idx, ativo in enumerate(self._filtros_ativos) if ativo]
-        filtros = [self._filtros[idx] for idx in indices]
+    def _configuracao_janela(self, chave_filtrado):
+        """
+        Retorna uma tupla que identifica o conteúdo da janela, composta pela chave
+        do frame filtrado e pelo estado dos textos e pontos mostrados sobre ele,
+        usada para evitar renderizar a janela novamente quando nada mudou
+        """
+        metricas = self._instrumentacao.texto_overlay() if self._mostrar_metricas else None
+        return (
+            chave_filtrado, self._mostrar_filtro, self._contagens(), self._ajuda, self._pausa,
+            self._mostrar_pontos, metricas
+        )
 
-        # aplica o filtro de contraste primeiro
-        if self._filtro_contraste:
-            from cntexercicios.filtros import melhorar_contraste
-            frame = melhorar_contraste(frame)
+    def _reduzir_frame(self, frame, tamanho_original=None):
+        """
+        Reduz o frame fornecido para a resolução de inferência, escrevendo o resultado
+        em um buffer reutilizado entre frames, ou retorna o próprio frame caso ele já
+        esteja dentro da resolução de inferência
 
-        # aplica os filtros ativos em sequência
-        if filtros:
-            from cntexercicios.filtros import convolucao
-            for kernel in filtros:
-                frame = convolucao(frame, kernel)
+        Caso o frame seja um recorte, o tamanho (largura, altura) do frame original deve
+        ser fornecido pelo parâmetro "tamanho_original", para que o recorte seja reduzido
+        pelo passo de redução do frame original (ver _passo_reducao)
+        """
+        # calcula o tamanho reduzido apenas quando o tamanho dos frames muda
+        altura, largura = frame.shape[:2]
+        if tamanho_original is None:
+            tamanho_original = (largura, altura)
+        chave = ((largura, altura), tamanho_original)
+        if self._tamanho_inferencia is None or self._tamanho_inferencia[0] != chave:
+            maior_lado = max(tamanho_original)
+            if tamanho_original != (largura, altura):
+                # NOTE: a redução por um fator inteiro é bem mais rápida na interpolação
+                #       por área, e os recortes têm dimensões múltiplas do passo
+                passo = self._passo_reducao(*tamanho_original)
+                tamanho = (max(1, largura // passo), max(1, altura // passo)) if passo > 1 else None
+            elif 0 < self._resolucao_inferencia < maior_lado:
+                escala  = self._resolucao_inferencia / maior_lado
+                tamanho = (max(1, round(largura * escala)), max(1, round(altura * escala)))
+            else:
+                tamanho = None
+            self._tamanho_inferencia = (chave, tamanho)
+            self._buffer_reduzido = None
+            self._selecionar_espaco(tamanho or (largura, altura))
+
+        tamanho = self._tamanho_inferencia[1]
+        if tamanho is None:
+            return frame
+        self._buffer_reduzido = cv2.resize(
+            frame, tamanho, dst=self._buffer_reduzido, interpolation=cv2.INTER_AREA
+        )
+        return self._buffer_reduzido
 
-        # retorna o frame filtrado
-        return frame
+    def _selecionar_espaco(self, dimensoes):
+        """
+        Seleciona o espaço de trabalho dos filtros usado em frames com as dimensões
+        fornecidas, criando um novo espaço caso necessário e descartando o espaço da
+        resolução usada há mais tempo quando existem mais que ESPACOS_FILTROS espaços
+        """
+        espacos = self._espacos_filtros
+        espaco = espacos.get(dimensoes)
+        if espaco is None:
+            from cntexercicios.filtros import EspacoTrabalho
+            espaco = espacos[dimensoes] = EspacoTrabalho()
+            while len(espacos) > max(1, self.ESPACOS_FILTROS):
+                espacos.popitem(last=False)
+        else:
+            espacos.move_to_end(dimensoes)
+        self._espaco_filtros = espaco
 
-    def _detectar_corpo(self, frame):
+    def _passo_reducao(self, largura, altura):
         """
-        Utiliza a biblioteca mediapipe para detecção dos pontos do corpo
-        da pessoa presente no frame fornecido, salvando eles no contador
+        Retorna o fator inteiro mais próximo da redução de um frame com as dimensões
+        fornecidas para a resolução de inferência, usado na redução dos recortes
+        """
+        maior_lado = max(largura, altura)
+        if 0 < self._resolucao_inferencia < maior_lado:
+            return max(1, round(maior_lado / self._resolucao_inferencia))
+        return 1
+
+    def _aplicar_filtros(self, frame, filtros=None):
+        """
+        Recorta a região de interesse do frame, reduz ela para a resolução de inferência e
+        aplica os filtros ativos nela, retornando o frame filtrado no formato BGR usado na
+        detecção dos pontos do corpo, ou em tons de cinza (com um único canal) caso a
+        detecção de bordas esteja ativa
+
+        Os filtros aplicados são os da cópia da configuração dos filtros fornecida pelo
+        parâmetro "filtros" (ver _estado_filtros), ou os filtros ativos no contador
+        """
+        if filtros is None:
+            filtros = self._estado_filtros()
+        altura, largura = frame.shape[:2]
+        # NOTE: o frame inteiro é usado quando o frame filtrado é mostrado na janela
+        if filtros[2]:
+            self._agendador.roi_frame = None
+        else:
+            frame = self._agendador.recortar(frame, self._passo_reducao(largura, altura))
+        frame = self._reduzir_frame(frame, (largura, altura))
+
+        # recompila o pipeline caso algum filtro tenha sido alterado
+        config = filtros[0]
+        if self._pipeline_filtros is None or config != self._config_pipeline:
+            self._pipeline_filtros = self._compilar_filtros(filtros)
+            self._config_pipeline  = config
+
+        # aplica o filtro de contraste e os filtros ativos em sequência
+        # NOTE: o frame filtrado pertence ao espaço de trabalho dos filtros,
+        #       sendo sobrescrito na filtragem do próximo frame
+        return self._pipeline_filtros(frame, espaco=self._espaco_filtros)
+
+    def _detectar_corpo(self, frame, roi=None, novo_frame=True, pose=None, filtros=None):
+        """
+        Utiliza a biblioteca mediapipe para detecção dos pontos do corpo da pessoa
+        presente no frame fornecido (no formato BGR ou em tons de cinza com um
+        único canal), salvando eles no contador
+
+        Caso o frame seja um recorte da região de interesse, a região dele deve ser
+        fornecida pelo parâmetro "roi" (ver _carregar_landmarks), e caso o frame seja
+        o mesmo frame do vídeo já processado (como no vídeo pausado), um valor falso
+        deve ser passado a "novo_frame" para que os pontos não sejam detectados novamente,
+        o parâmetro "pose" permite usar outro detector de poses no lugar do detector do contador
+        e o parâmetro "filtros" fornece a configuração dos filtros aplicados no frame (ver
+        _configuracao_deteccao)
         """
         # processamento dos pontos do corpo humano
-        if not self._pausa or self._corpo is None:
-            self._corpo  = self._pose.process(frame)
+        self._inferido = False
+        if novo_frame or self._corpo is None:
+            # usa os pontos armazenados no cache caso a configuração não tenha sido alterada
+            registro = self._registro_cache
+            indice = self._frames_lidos - 1
+            if (registro is not None and 0 <= indice < len(registro) and
+                self._configuracao_deteccao(filtros) == self._config_cache):
+                self._corpo  = registro
+                self._pontos = None
+                self._carregar_landmarks(registro.landmarks[indice])
+                return
+
+            # reutiliza os pontos do último frame inferido caso o agendador pule a detecção
+            if self._agendador.pular(frame, self._estados_progresso):
+                self._instrumentacao.registrar_inferencia(pulada=True)
+                return
+            self._inferido = True
+            self._instrumentacao.registrar_inferencia()
+
+            # NOTE: o mediapipe espera frames no formato RGB, a conversão
+            #       é feita em um buffer reutilizado entre frames
+            if self._buffer_rgb is None or self._buffer_rgb.shape[:2] != frame.shape[:2]:
+                self._buffer_rgb = None
+            conversao = cv2.COLOR_GRAY2RGB if frame.ndim == 2 else cv2.COLOR_BGR2RGB
+            self._buffer_rgb = cv2.cvtColor(frame, conversao, dst=self._buffer_rgb)
+            self._corpo  = (pose or self._pose).process(self._buffer_rgb)
             self._pontos = self._corpo.pose_landmarks
+            self._carregar_landmarks(self._pontos, roi)
 
-    def _posicao_landmark(self, landmark):
-        # retorna a posição do ponto como array
+            # os pontos detectados na região de interesse são convertidos para o frame
+            # inteiro, e o formato do mediapipe é recriado a partir deles quando necessário
+            if roi is not None:
+                self._pontos = None
+            self._agendador.atualizar_roi(self._landmarks, self._detectado, *self._frame.shape[1::-1])
+
+    def _estados_progresso(self):
+        """
+        Retorna uma lista com uma tupla (progresso, distância até o limiar esperado pela
+        contagem) com o último progresso calculado desse contador e dos contadores que
+        recebem os pontos dele, com None nos contadores com progresso inválido ou sem
+        corpo detectado, usada pelo agendador da detecção dos pontos do corpo
+        """
+        estados = []
+        for contador in self._contadores():
+            progresso = contador._progresso
+            if progresso is None or not progresso[1]:
+                estados.append(None)
+            else:
+                progresso = float(progresso[0])
+                estados.append((progresso, float(contador._distancia_limiar(progresso))))
+        return estados
+
+    def _distancia_limiar(self, progresso):
+        """
+        Retorna a distância entre o progresso fornecido e o limiar esperado pela
+        contagem (LIMIAR_EXERCICIO_MIN antes de uma repetição ser contada e
+        LIMIAR_EXERCICIO_MAX depois), negativa caso o limiar tenha sido ultrapassado
+        """
+        if self._estado_exercicio:
+            return self.LIMIAR_EXERCICIO_MAX - progresso
+        return progresso - self.LIMIAR_EXERCICIO_MIN
+
+    def _intervalo_amostragem(self):
+        """
+        Retorna a quantidade de frames até a próxima detecção dos pontos do corpo
+        agendada pela amostragem adaptativa, ver AgendadorInferencia.intervalo
+        """
+        return self._agendador.intervalo(
+            self._frames_lidos, self._estados_progresso(),
+            [contador._repeticoes for contador in self._contadores()], self._tempo
+        )
+
+    @property
+    def tempos_repeticoes(self):
+        """
+        Lista com o tempo (em segundos) do frame em que cada repetição foi contada,
+        que permite comparar as repetições contadas em contagens com configurações
+        diferentes, como uma contagem que pula frames e outra que processa todos eles
+        """
+        return list(self._tempos_repeticoes)
+
+    def _carregar_landmarks(self, pontos, roi=None):
+        """
+        Preenche o array de pontos do contador com os pontos detectados no frame atual,
+        fornecidos no formato do mediapipe (NormalizedLandmarkList), como um array de
+        dimensões (33, 4) no mesmo formato ou None caso nenhum corpo tenha sido detectado
+
+        Caso os pontos tenham sido detectados em um recorte do frame, a região dele deve ser
+        fornecida pelo parâmetro "roi" como (x, y, largura, altura) normalizados pelas
+        dimensões do frame, para que os pontos sejam convertidos para o frame inteiro
+        """
         import numpy as np
-        ponto = self._pontos.landmark[landmark]
-        return np.array((ponto.x, 1-ponto.y, ponto.z))
+        landmarks = self._landmarks
+        if pontos is None:
+            landmarks.fill(np.nan)
+        elif isinstance(pontos, np.ndarray):
+            landmarks[:] = pontos
+        else:
+            from cntexercicios.landmarks import landmarks_para_array
+            landmarks_para_array(pontos, landmarks)
+
+        # converte os pontos do recorte para o frame inteiro, com o eixo z
+        # na mesma escala do eixo x, como nos pontos do mediapipe
+        if roi is not None:
+            x, y, largura, altura = roi
+            landmarks[:, 0] *= largura
+            landmarks[:, 0] += x
+            landmarks[:, 1] *= altura
+            landmarks[:, 1] += y
+            landmarks[:, 2] *= largura
+
+        # inverte o eixo y, que cresce para baixo nos frames
+        eixo_y = landmarks[:, 1]
+        np.subtract(1, eixo_y, out=eixo_y)
+        self._detectado = not np.isnan(landmarks[0, 0])
+
+    def _pontos_mediapipe(self):
+        """
+        Retorna os pontos do corpo detectados no frame atual no formato do mediapipe,
+        criando-os a partir do array de pontos caso eles tenham vindo do cache
+        """
+        if self._pontos is None and self._detectado:
+            from cntexercicios.landmarks import array_para_landmarks
+            pontos = self._landmarks.copy()
+            pontos[:, 1] = 1 - pontos[:, 1]
+            self._pontos = array_para_landmarks(pontos)
+        return self._pontos
+
+    def _posicao_landmark(self, landmark):
+        """
+        Retorna a posição (x, y, z) do ponto com o índice fornecido, com o eixo y invertido,
+        como uma view do array de pontos do contador que não deve ser modificada
+        """
+        return self._landmarks[landmark, :3]
 
     def _contar_exercicio(self):
         """
         Faz a contagem dos exercícios utilizando a função de cálculo do progresso
         do exercício para detectar a transição de estados no exercício
         """
+        # repassa os pontos do frame atual aos contadores que acompanham esse contador,
+        # que compartilham o array de pontos dele (ver ContagemMultipla)
+        for seguidor in self._seguidores:
+            seguidor._detectado    = self._detectado
+            seguidor._frames_lidos = self._frames_lidos
+            seguidor._tempo        = self._tempo
+            seguidor._contar_exercicio()
+
+        tempo = self._tempo
+        self._agendador.atualizar_tempo(self._frames_lidos, tempo)
+
         # evita contar exercícios caso um corpo não seja detectado
-        if not self._pontos:
+        if not self._detectado:
+            self._progresso = self._progresso_suavizado = None
             return
 
         # calcula o progresso do exercício
@@ -226,13 +1016,34 @@ class ContadorExercicios(ABC):
 
         # previne a contagem se o exercício não estiver sendo feito corretamente
         if not valido:
+            self._progresso = (progresso, valido)
+            self._progresso_suavizado = None
             return
 
+        # suaviza o progresso pelo tempo desde o último progresso suavizado, o que
+        # mantém a suavização igual quando frames são pulados ou descartados
+        if self._suavizacao_progresso and tempo is not None:
+            anterior = self._progresso_suavizado
+            if anterior is not None and tempo > anterior[1]:
+                import math
+                peso = 1 - math.exp((anterior[1] - tempo) / self._suavizacao_progresso)
+                progresso = anterior[0] + (progresso - anterior[0]) * peso
+            self._progresso_suavizado = (progresso, tempo)
+        self._progresso = (progresso, valido)
+
         # conta o exercício com base em seu progresso
         if not self._estado_exercicio:
             if progresso < self.LIMIAR_EXERCICIO_MIN:
                 self._estado_exercicio = True
-                self._contagem += 1
+                # NOTE: repetições iniciadas pouco tempo após a última repetição
+                #       contada são oscilações do progresso e não são contadas
+                ultima = self._repeticoes[-1] if self._repeticoes else None
+                if (tempo is None or ultima is None or
+                    tempo - ultima >= self._debounce_repeticao):
+                    self._contagem += 1
+                    if tempo is not None:
+                        self._repeticoes.append(tempo)
+                        self._tempos_repeticoes.append(tempo)
         elif progresso > self.LIMIAR_EXERCICIO_MAX:
             self._estado_exercicio = False
 
@@ -303,17 +1114,39 @@ class ContadorExercicios(ABC):
             # ajuste da posição para a próxima linha
             y += altura + self.ESPACAMENTO_LINHA
 
-    def _renderizar_janela(self, frame):
+    def _renderizar_janela(self, frame, estado=None):
         """
         Renderiza a janela utilizando o frame fornecido como base,
         adicionando a contagem de exercícios a ele
+
+        As contagens e os pontos do corpo mostrados podem ser fornecidos pelo parâmetro
+        "estado" como uma tupla (contagens, pontos), com as contagens retornadas pelo método
+        _contagens e os pontos no formato do mediapipe ou None, o que permite renderizar a
+        janela enquanto outra thread altera o estado do contador, caso contrário o estado
+        atual do contador é mostrado
         """
+        if estado is None:
+            estado = self._estado_janela()
+        contagens, pontos = estado
+
+        # NOTE: a contagem de cada exercício é mostrada quando o contador repassa os pontos
+        #       a outros contadores, sem acentuação, que não é suportada pelo opencv
+        if self._seguidores:
+            import unicodedata
+            texto_contagem = "\n".join(
+                unicodedata.normalize("NFKD", f"{contador.NOME_EXERCICIO}: {contagem}")
+                .encode("ascii", "ignore").decode("ascii").capitalize()
+                for contador, contagem in zip(self._contadores(), contagens)
+            )
+        else:
+            texto_contagem = f"Contagem: {contagens[0]}"
+
         # cópia para evitar que os filtros sejam aplicados ao texto
         frame = frame.copy()
 
         # renderização de textos
         h, w, *_ = frame.shape
-        self._renderizar_texto(frame, (20, 20), f"Contagem: {self._contagem}")
+        self._renderizar_texto(frame, (20, 20), texto_contagem)
         self._renderizar_texto(frame, (w - 20, 20), "h: ajuda", alinhamento=self.ALINHAR_ESQUERDA)
 
         # mostra cria e renderiza o texto de ajuda caso requisitado
@@ -321,6 +1154,7 @@ class ContadorExercicios(ABC):
             texto_esq = []
             texto_dir = [
                 "j: mostrar pontos",
+                "i: mostrar metricas",
                 "1: diminuir peso da nitidez  ",
                 "2: aumentar peso da nitidez  ",
                 "3: diminuir reducao de ruido  ",
@@ -358,11 +1192,17 @@ class ContadorExercicios(ABC):
             self._renderizar_texto(frame, (w - 20, h - 20),
                 '\n'.join(texto_dir), alinhamento=self.ALINHAR_SUPERIOR | self.ALINHAR_ESQUERDA)
 
+        # renderiza as medições de desempenho caso requisitado
+        if self._mostrar_metricas:
+            # NOTE: as medições ficam abaixo das linhas das contagens
+            posicao = (20, 50 + 25 * len(self._seguidores))
+            self._renderizar_texto(frame, posicao, self._instrumentacao.texto_overlay())
+
         # renderiza os pontos do corpo
-        if self._mostrar_pontos and self._pontos is not None:
+        if self._mostrar_pontos and pontos is not None:
             import mediapipe as mp
             mp.solutions.drawing_utils.draw_landmarks(
-                frame, self._pontos, mp.solutions.pose.POSE_CONNECTIONS
+                frame, pontos, mp.solutions.pose.POSE_CONNECTIONS
             )
 
         # renderização da janela
@@ -395,6 +1235,12 @@ class ContadorExercicios(ABC):
             self._mostrar_pontos = novo_estado
             print(f"visualizacao de pontos {'ativa' if novo_estado else 'inativa'}")
 
+        # ativa/desativa a visualização das medições de desempenho
+        elif tecla in (ord("i"), ord("I")):
+            novo_estado = not self._mostrar_metricas
+            self._mostrar_metricas = novo_estado
+            print(f"visualizacao de metricas {'ativa' if novo_estado else 'inativa'}")
+
         # ativa/desativa o filtro de melhoria contraste
         elif tecla in (ord("c"), ord("C")):
             novo_estado = not self._filtro_contraste
@@ -464,6 +1310,108 @@ class ContadorExercicios(ABC):
         """
         pass
 
+    @classmethod
+    def calcular_progresso_serie(cls, landmarks):
+        """
+        Calcula o progresso do exercício em todos os frames de uma série temporal de pontos
+        do corpo de uma vez, usando operações vetorizadas do numpy ao invés de um frame por vez.
+
+        Os pontos devem ser fornecidos como um array de dimensões (T, 33, 3) ou (T, 33, 4),
+        com as coordenadas x, y e z (e opcionalmente a visibilidade) de cada ponto no formato
+        fornecido pelo mediapipe, preenchido com NaN nos frames sem um corpo detectado.
+
+        Retorna dois arrays de T elementos, com o progresso e a validade de cada frame,
+        iguais aos valores retornados pelo método _calc_progresso_exercicio em cada frame.
+        Esse método pode ser implementado em subclasses, gerando um erro do tipo
+        NotImplementedError por padrão.
+        """
+        raise NotImplementedError(
+            f"o contador {cls.__qualname__} não implementa o cálculo vetorizado do progresso"
+        )
+
+    @staticmethod
+    def _posicoes_serie(landmarks):
+        """
+        Converte uma série temporal de pontos no formato do mediapipe para um array
+        de dimensões (T, 33, 3) com as posições dos pontos no mesmo formato retornado
+        pelo método _posicao_landmark (com o eixo y invertido), retornando também um
+        array de T elementos indicando os frames com um corpo detectado
+        """
+        import numpy as np
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if landmarks.ndim != 3 or landmarks.shape[1] != 33 or landmarks.shape[2] not in (3, 4):
+            raise ValueError(
+                "esperado um array de dimensões (T, 33, 3) ou (T, 33, 4) para 'landmarks', "
+                f"recebido um array de dimensões {landmarks.shape}"
+            )
+
+        posicoes = landmarks[..., :3].copy()
+        posicoes[..., 1] = 1 - posicoes[..., 1]
+        detectados = ~np.isnan(posicoes).any(axis=(1, 2))
+        return posicoes, detectados
+
+    @classmethod
+    def contar_serie(cls, progresso, valido, estado_inicial=False, tempos=None, debounce=0.0):
+        """
+        Conta os exercícios em uma série temporal de progressos e validades (ver o método
+        calcular_progresso_serie) de uma vez, reproduzindo a máquina de estados com
+        histerese do método _contar_exercicio de forma vetorizada.
+
+        Caso o tempo de cada frame (em segundos) seja fornecido pelo parâmetro "tempos",
+        as repetições iniciadas menos de "debounce" segundos após a última repetição
+        contada não são contadas, como no método _contar_exercicio.
+
+        Retorna a contagem total, um array com a contagem acumulada após cada frame e o
+        estado do exercício após o último frame (o valor do atributo _estado_exercicio
+        após a contagem dos mesmos frames pelo método _contar_exercicio).
+        """
+        import numpy as np
+        progresso = np.asarray(progresso)
+        valido    = np.asarray(valido, dtype=bool)
+        if progresso.shape != valido.shape or progresso.ndim != 1:
+            raise ValueError("'progresso' e 'valido' devem ser arrays de uma dimensão e mesmo tamanho")
+
+        # eventos de cada frame: +1 quando o progresso fica abaixo do limiar mínimo
+        # (início de uma repetição), -1 quando fica acima do limiar máximo e 0 caso contrário
+        eventos = np.zeros(len(progresso), dtype=np.int8)
+        eventos[valido & (progresso > cls.LIMIAR_EXERCICIO_MAX)] = -1
+        eventos[valido & (progresso < cls.LIMIAR_EXERCICIO_MIN)] = +1
+
+        # o estado antes de cada evento é dado pelo evento anterior, e uma repetição
+        # é contada apenas quando um evento +1 ocorre fora de uma repetição
+        indices = np.flatnonzero(eventos)
+        ocorridos = eventos[indices]
+        anteriores = np.concatenate(([1 if estado_inicial else -1], ocorridos[:-1]))
+        repeticoes = indices[(ocorridos == 1) & (anteriores == -1)]
+        estado_final = bool(ocorridos[-1] == 1) if len(ocorridos) else bool(estado_inicial)
+
+        # NOTE: o debounce depende da última repetição contada, então ele é aplicado
+        #       sequencialmente, mas apenas nos frames em que as repetições iniciam
+        if tempos is not None and debounce > 0 and len(repeticoes):
+            tempos = np.asarray(tempos, dtype=np.float64)
+            if tempos.shape != progresso.shape:
+                raise ValueError("'tempos' deve ter o mesmo tamanho que 'progresso'")
+            contadas = []
+            for indice in repeticoes:
+                if not contadas or tempos[indice] - tempos[contadas[-1]] >= debounce:
+                    contadas.append(indice)
+            repeticoes = np.array(contadas, dtype=np.intp)
+
+        contagens = np.zeros(len(progresso), dtype=np.int64)
+        contagens[repeticoes] = 1
+        np.cumsum(contagens, out=contagens)
+        return int(contagens[-1]) if len(contagens) else 0, contagens, estado_final
+
+    @classmethod
+    def contar_landmarks(cls, landmarks):
+        """
+        Conta os exercícios em uma série temporal de pontos do corpo de uma vez (ver
+        os métodos calcular_progresso_serie e contar_serie), retornando a contagem
+        total, um array com a contagem acumulada após cada frame e o estado final
+        """
+        progresso, valido = cls.calcular_progresso_serie(landmarks)
+        return cls.contar_serie(progresso, valido)
+
 def listar_contadores():
     """
     Retorna uma lista dos nomes de exercícios conhecidos que possuem uma classe contadora,
@@ -490,8 +1438,71 @@ def instanciar_contador(exercicio, *args, **kwargs):
 
     return classe(*args, **kwargs)
 
+class ContagemMultipla:
+    """
+    Contagem de vários exercícios ao mesmo tempo em um único vídeo, onde os pontos do
+    corpo são detectados uma única vez por frame e repassados aos contadores de todos os
+    exercícios, cada um mantendo a sua própria contagem e o seu estado do exercício, o que
+    faz com que o custo da detecção seja o mesmo da contagem de um único exercício
+    """
+
+    def __init__(self, video, exercicios=None, **kwargs):
+        """
+        Cria os contadores dos exercícios fornecidos pelo parâmetro "exercicios" (por padrão
+        todos os exercícios retornados pela função listar_contadores) para a contagem no vídeo
+        fornecido pelo parâmetro "video", os demais parâmetros são repassados a todos os
+        contadores (ver ContadorExercicios)
+
+        O primeiro contador lê o vídeo, detecta os pontos do corpo e mostra a janela com as
+        contagens de todos os exercícios, repassando os pontos detectados em cada frame aos
+        demais contadores, que compartilham o detector de poses e o array de pontos dele
+        """
+        if exercicios is None:
+            exercicios = listar_contadores()
+        elif isinstance(exercicios, str):
+            exercicios = [exercicios]
+        exercicios = list(exercicios)
+        if not exercicios:
+            raise ValueError("'exercicios' deve conter ao menos um exercício")
+        if len(set(exercicios)) != len(exercicios):
+            raise ValueError("'exercicios' não pode conter exercícios repetidos")
+
+        if kwargs.get("pose") is None:
+            kwargs["pose"] = ContadorExercicios.criar_pose()
+        contadores = [instanciar_contador(exercicio, video, **kwargs) for exercicio in exercicios]
+
+        # NOTE: o array de pontos do primeiro contador é preenchido uma única vez
+        #       por frame, e os demais contadores leem os pontos diretamente dele
+        principal = contadores[0]
+        principal._seguidores = contadores[1:]
+        for seguidor in principal._seguidores:
+            seguidor._landmarks = principal._landmarks
+        self._contadores = contadores
+
+    @property
+    def contadores(self):
+        """
+        Dicionário com o contador de cada exercício, indexado pelo nome do exercício
+        """
+        return {contador.NOME_EXERCICIO: contador for contador in self._contadores}
+
+    @property
+    def contagens(self):
+        """
+        Dicionário com a contagem atual de cada exercício, indexado pelo nome do exercício
+        """
+        return {contador.NOME_EXERCICIO: contador._contagem for contador in self._contadores}
+
+    def contar(self, exibir=True, arquivo_metricas=None):
+        """
+        Faz a contagem de todos os exercícios no vídeo (ver ContadorExercicios.contar),
+        retornando um dicionário com a contagem de cada exercício, indexado pelo nome dele
+        """
+        self._contadores[0].contar(exibir, arquivo_metricas)
+        return self.contagens
+
 # funções de registro acessíveis via "from module import *"
-__all__ = ["ContadorExercicios"]
+__all__ = ["ContadorExercicios", "ContagemMultipla"]
 
 # import dos exercícios
 # NOTE: não mova os imports pra antes da declaração da classe acima,
@@ -74,3 +74,55 @@ class ContadorFlexoes(ContadorExercicios):
                 return h_flexao, True
 
         return 0, False
+
+    @classmethod
+    def calcular_progresso_serie(cls, landmarks):
+        """
+        Calcula o progresso da flexão em todos os frames de uma série temporal
+        de pontos do corpo de uma vez, ver ContadorExercicios.calcular_progresso_serie
+        """
+        import numpy as np
+
+        # índices dos landmarks
+        import mediapipe as mp
+        landmark = mp.solutions.pose.PoseLandmark
+
+        # posições do centro dos pés, da cintura e dos ombros (base do pescoço)
+        posicoes, detectados = cls._posicoes_serie(landmarks)
+        pos_ombro_dir     = posicoes[:, landmark.RIGHT_SHOULDER]
+        pos_ombro_esq     = posicoes[:, landmark.LEFT_SHOULDER]
+        pos_cintura_dir   = posicoes[:, landmark.RIGHT_HIP]
+        pos_cintura_esq   = posicoes[:, landmark.LEFT_HIP]
+        pos_pe_dir        = posicoes[:, landmark.RIGHT_HEEL]
+        pos_pe_esq        = posicoes[:, landmark.LEFT_HEEL]
+        pos_pulso_dir     = posicoes[:, landmark.RIGHT_WRIST]
+        pos_pulso_esq     = posicoes[:, landmark.LEFT_WRIST]
+        pos_pescoco       = ( pos_ombro_dir   + pos_ombro_esq   ) / 2
+        pos_cintura       = ( pos_cintura_dir + pos_cintura_esq ) / 2
+        pos_centro_pes    = ( pos_pe_dir      + pos_pe_esq      ) / 2
+        pos_centro_pulsos = ( pos_pulso_dir   + pos_pulso_esq   ) / 2
+
+        # NOTE: frames com pontos degenerados geram divisões por zero
+        #       que apenas invalidam os frames, como no cálculo por frame
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # verificação se as pernas estão retas e o corpo está na horizontal
+            vet_pes_pescoco = pos_pescoco - pos_centro_pes
+            vet_pes_cintura = pos_cintura - pos_centro_pes
+            dis_pes_pescoco = np.linalg.norm(vet_pes_pescoco, axis=-1)
+            dis_pes_cintura = np.linalg.norm(vet_pes_cintura, axis=-1)
+            prod_vet = np.einsum("ij,ij->i", vet_pes_pescoco, vet_pes_cintura) / (dis_pes_pescoco * dis_pes_cintura)
+            angulo   = np.degrees(np.fabs(np.arctan2(vet_pes_pescoco[:, 0], vet_pes_pescoco[:, 1])))
+            valido   = (prod_vet > 0.9) & (60 < angulo) & (angulo < 120)
+
+            # verificação se a distância entre as mãos e os pés é próxima
+            # da distância entre os pés e a base do pescoço
+            vet_pes_pulsos = pos_centro_pulsos - pos_centro_pes
+            dis_pes_pulsos = np.linalg.norm(vet_pes_pulsos, axis=-1)
+            valido &= np.fabs(dis_pes_pulsos - dis_pes_pescoco) < (dis_pes_pulsos + dis_pes_pescoco) / 2
+
+            # aproximação da altura da flexão normalizada em relação a altura aproximada da pessoa
+            h_flexao = (np.linalg.norm(pos_centro_pulsos - pos_pescoco, axis=-1) /
+                np.linalg.norm(pos_pescoco - pos_centro_pes, axis=-1))
+
+        valido &= detectados
+        return np.where(valido, h_flexao, 0), valido
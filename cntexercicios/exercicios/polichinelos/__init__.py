@@ -113,3 +113,89 @@ class ContadorPolichinelos(ContadorExercicios):
 
         # mapeamento de [-1,1] para [0,1]
         return (z + 1) / 2, True
+
+    @classmethod
+    def calcular_progresso_serie(cls, landmarks):
+        """
+        Calcula o progresso do polichinelo em todos os frames de uma série temporal
+        de pontos do corpo de uma vez, ver ContadorExercicios.calcular_progresso_serie
+        """
+        import numpy as np
+
+        # índices dos landmarks
+        import mediapipe as mp
+        landmark = mp.solutions.pose.PoseLandmark
+
+        def normalizar(vetores):
+            return vetores / np.linalg.norm(vetores, axis=-1)[:, None]
+
+        def produto_escalar(a, b):
+            return np.einsum("ij,ij->i", a, b)
+
+        # posições dos pés, da cintura e dos ombros (base do pescoço)
+        posicoes, detectados = cls._posicoes_serie(landmarks)
+        pos_ombro_dir   = posicoes[:, landmark.RIGHT_SHOULDER]
+        pos_ombro_esq   = posicoes[:, landmark.LEFT_SHOULDER]
+        pos_cintura_dir = posicoes[:, landmark.RIGHT_HIP]
+        pos_cintura_esq = posicoes[:, landmark.LEFT_HIP]
+        pos_pe_dir      = posicoes[:, landmark.RIGHT_HEEL]
+        pos_pe_esq      = posicoes[:, landmark.LEFT_HEEL]
+        pos_pulso_dir   = posicoes[:, landmark.RIGHT_WRIST]
+        pos_pulso_esq   = posicoes[:, landmark.LEFT_WRIST]
+        pos_pescoco     = ( pos_ombro_dir   + pos_ombro_esq   ) / 2
+        pos_cintura     = ( pos_cintura_dir + pos_cintura_esq ) / 2
+
+        # NOTE: frames com pontos degenerados geram divisões por zero
+        #       que apenas invalidam os frames, como no cálculo por frame
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # verificação se as pernas estão abaixo da cintura e o corpo está na vertical
+            vet_cintura_pe_dir    = pos_cintura_dir - pos_pe_dir
+            vet_cintura_pe_esq    = pos_cintura_esq - pos_pe_esq
+            vet_cintura_ombro_dir = pos_cintura_dir - pos_ombro_dir
+            vet_cintura_ombro_esq = pos_cintura_esq - pos_ombro_esq
+            vet_cintura_pescoco   = pos_pescoco - pos_cintura
+            angulo = np.degrees(np.fabs(np.arctan2(vet_cintura_pescoco[:, 0], vet_cintura_pescoco[:, 1])))
+            valido = ~(
+                (produto_escalar(vet_cintura_pe_esq, vet_cintura_ombro_esq) > 0) |
+                (produto_escalar(vet_cintura_pe_dir, vet_cintura_ombro_dir) > 0) |
+                (np.abs(angulo) > 15)
+            )
+
+            # cálculo da normal do torso
+            vet_cintura_esq_dir_norm   = normalizar(pos_cintura_dir - pos_cintura_esq)
+            vet_ombro_dir_esq_norm     = normalizar(pos_ombro_esq - pos_ombro_dir)
+            vet_cintura_ombro_dir_norm = normalizar(vet_cintura_ombro_dir)
+            vet_ombro_cintura_esq_norm = normalizar(-vet_cintura_ombro_esq)
+            norm_torso = normalizar((
+                np.cross(vet_cintura_esq_dir_norm, vet_cintura_ombro_dir_norm) +
+                np.cross(vet_ombro_dir_esq_norm, vet_ombro_cintura_esq_norm)
+            ) / 2)
+
+            # vetores normalizados das pernas e dos braços
+            vet_cintura_pe_dir_norm  = normalizar(vet_cintura_pe_dir)
+            vet_cintura_pe_esq_norm  = normalizar(vet_cintura_pe_esq)
+            vet_ombro_pulso_dir_norm = normalizar(pos_pulso_dir - pos_ombro_dir)
+            vet_ombro_pulso_esq_norm = normalizar(pos_pulso_esq - pos_ombro_esq)
+
+            # verificação se as pernas e os braços estão no plano correto
+            sin30 = np.sin(np.pi / 3)
+            epsilon = np.finfo(np.float64).eps
+            def fora_do_plano(vetores):
+                return sin30 - np.abs(np.linalg.norm(np.cross(norm_torso, vetores), axis=-1) - 1) < epsilon
+            valido &= ~(fora_do_plano(vet_cintura_pe_esq_norm) & fora_do_plano(vet_cintura_pe_dir_norm))
+            valido &= ~(fora_do_plano(vet_ombro_pulso_esq_norm) & fora_do_plano(vet_ombro_pulso_dir_norm))
+
+            # cálculo da angulo de abertura dos braços e entre as pernas
+            angulo_pernas    = np.arccos(produto_escalar(vet_cintura_pe_dir_norm, vet_cintura_pe_esq_norm))
+            angulo_braco_dir = np.arccos(+produto_escalar(vet_ombro_pulso_dir_norm, vet_cintura_ombro_dir_norm))
+            angulo_braco_esq = np.arccos(-produto_escalar(vet_ombro_pulso_esq_norm, vet_ombro_cintura_esq_norm))
+
+            # normalização e combinação dos fatores para um intervalo entre -1 e 1
+            z = 2 * (np.clip(6 * angulo_pernas / np.pi, -1, 1) + (angulo_braco_dir + angulo_braco_esq) / np.pi) / 3 - 1
+
+            # 'smooth-step' normalizado do resultado
+            z = np.arctan(z) / np.arctan(1)
+
+        # mapeamento de [-1,1] para [0,1]
+        valido &= detectados
+        return np.where(valido, (z + 1) / 2, 0), valido
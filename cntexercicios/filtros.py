@@ -7,6 +7,10 @@ sejam arrays da biblioteca numpy (numpy.ndarray), ou listas ou tuplas convertív
 para esses arrays
 """
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 def espelhamento_vertical(imagem):
@@ -25,7 +29,68 @@ def espelhamento_horizontal(imagem):
 	"""
 	return imagem[..., ::-1]
 
-def melhorar_contraste(imagem):
+class EspacoTrabalho:
+	"""
+	Conjunto de arrays de trabalho reutilizáveis entre chamadas dos filtros, identificados
+	por nome, dimensões e tipo, que podem ser fornecidos pelo parâmetro 'espaco' das funções
+	e classes desse módulo para que os arrays intermediários sejam alocados apenas na primeira
+	chamada, e não em todos os frames de um vídeo. Como os arrays de cada resolução são
+	mantidos até que o método limpar seja chamado, ele deve ser chamado quando a resolução
+	das imagens muda, ou um espaço de trabalho diferente deve ser usado em cada resolução
+	(como nos contadores, que mantêm os espaços das últimas resoluções usadas).
+
+	Os arrays retornados pelos filtros que usam um espaço de trabalho podem pertencer a
+	ele, sendo sobrescritos na próxima chamada que use o mesmo espaço de trabalho.
+	"""
+
+	def __init__(self):
+		self._arrays = {}
+
+	def array(self, nome, dimensoes, dtype, zerar=False):
+		"""
+		Retorna o array de trabalho com o nome, as dimensões e o tipo fornecidos, criando
+		um novo array caso ele não exista, e preenchendo ele com zeros caso um valor
+		verdadeiro seja passado ao parâmetro 'zerar'
+		"""
+		dtype = np.dtype(dtype)
+		chave = (nome, tuple(dimensoes), dtype)
+		array = self._arrays.get(chave)
+		if array is None:
+			array = self._arrays[chave] = np.empty(dimensoes, dtype=dtype)
+		if zerar:
+			array.fill(0)
+		return array
+
+	def limpar(self):
+		"""
+		Descarta todos os arrays de trabalho
+		"""
+		self._arrays.clear()
+
+	@property
+	def tamanho(self):
+		"""
+		Quantidade de bytes ocupada pelos arrays de trabalho
+		"""
+		return sum(array.nbytes for array in self._arrays.values())
+
+def _array_trabalho(espaco, nome, dimensoes, dtype, zerar=False):
+	"""
+	Retorna um array de trabalho do espaço de trabalho fornecido,
+	ou um novo array caso nenhum espaço de trabalho seja fornecido
+	"""
+	if espaco is None:
+		return (np.zeros if zerar else np.empty)(dimensoes, dtype=dtype)
+	return espaco.array(nome, dimensoes, dtype, zerar)
+
+# constantes da luminância (Kr, Kg e Kb) em ponto fixo usadas pela função melhorar_contraste
+ESCALA_PONTO_FIXO = 1000
+KR_PONTO_FIXO = 299
+KG_PONTO_FIXO = 587
+KB_PONTO_FIXO = 114
+_CONSTANTES_LUMINANCIA = np.array([KB_PONTO_FIXO, KG_PONTO_FIXO, KR_PONTO_FIXO], dtype=np.float32)
+
+def melhorar_contraste(imagem, saida=None, espaco=None, lote=False):
 	"""
 	Melhora o contraste de uma imagem BGR, normalizando a luminosidade dela
 	no espaço de cores YPrPb e usando a diferença de luminosidade resultante
@@ -36,8 +101,16 @@ def melhorar_contraste(imagem):
 	como um array numpy (numpy.ndarray) de três dimensões, com a terceira dimensão
 	sendo usada para armazenar os canais, ou uma lista ou tupla que seja convertível
 	para um array desse tipo
+
+	O resultado é escrito no array do tipo uint8 fornecido pelo parâmetro 'saida'
+	caso exista, que deve ter as mesmas dimensões da imagem, e retornado, os arrays
+	intermediários podem ser reutilizados entre chamadas pelo parâmetro 'espaco'
+	(ver a classe EspacoTrabalho)
+
+	Caso um valor verdadeiro seja passado ao parâmetro 'lote', a imagem deve ser um
+	lote de frames de dimensões (N, altura, largura, 3), e o contraste de cada frame
+	é melhorado separadamente
 	"""
-	kr, kg, kb = (0.299, 0.587, 0.114)
 	"""
 	conversão RGB/BGR -> YPrPb
 	Y  = Kr * R + Kg * G + Kb * B
@@ -68,29 +141,250 @@ def melhorar_contraste(imagem):
 	os valores iniciais dos canais Y, R e B, e Yf, Rf e Bf são os valores
 	finais dos canais Y, R e B.
 	"""
-	# NOTE: como as constantes foram escolhidas para gerar valores
-	#       no intervalo de 0 a 255, é seguro usar o truncamento
-	Yi = np.dot(imagem, (kb, kg, kr)).astype(np.uint8)
+	if lote:
+		return _contraste_lote(melhorar_contraste, imagem, saida, espaco)
+	imagem, saida = _preparar_contraste(imagem, saida, espaco)
 
-	# correção na luminância
-	ymin, ymax = Yi.min(), Yi.max()
-	Yf = ((255 * (Yi - ymin).astype(int)) / (ymax - ymin)).astype(np.uint8)
-
-	# cálculo da mudança dos níveis dos canais
-	dR = dB = dY = np.subtract(Yf, Yi, dtype=np.int16)
-	dG = dY * (1 - kr - kb) / kg
-	np.clip(dG, -255, 255, out=dG)
-	dG = dG.astype(np.int16)
+	# cálculo da luminância e da correção na luminância
+	Yi = _luminancia(imagem, espaco)
+	tabela = _tabela_contraste(int(Yi.min()), int(Yi.max()))
 
 	# aplicação das mudanças na imagem
-	resultado = imagem.astype(np.int16)
-	np.add(dB, resultado[..., 0], out=resultado[..., 0])
-	np.add(dG, resultado[..., 1], out=resultado[..., 1])
-	np.add(dR, resultado[..., 2], out=resultado[..., 2])
+	return _aplicar_tabela_contraste(imagem, Yi, tabela, saida, espaco)
+
+def _luminancia(imagem, espaco=None):
+	"""
+	Calcula a luminância de uma imagem BGR do tipo uint8 (ou de um lote dessas imagens)
+	em ponto fixo, com as constantes multiplicadas por 1000, retornando um array de
+	índices (do tipo int32) que pode ser usado diretamente para consultar tabelas
+	"""
+	dimensoes = imagem.shape[:-1]
+	Yi   = _array_trabalho(espaco, "luminancia", dimensoes, np.int32)
+	temp = _array_trabalho(espaco, "luminancia_temp", dimensoes, np.int32)
+
+	# NOTE: como as constantes somam 1000, o resultado está no intervalo de 0 a 255, e
+	#       a soma intermediária (até 255000) cabe em inteiros de 32 bits, que ocupam
+	#       metade da memória do numpy.intp e são mais rápidos em imagens grandes
+	np.multiply(imagem[..., 0], KB_PONTO_FIXO, out=Yi, dtype=np.int32)
+	np.multiply(imagem[..., 1], KG_PONTO_FIXO, out=temp, dtype=np.int32)
+	Yi += temp
+	np.multiply(imagem[..., 2], KR_PONTO_FIXO, out=temp, dtype=np.int32)
+	Yi += temp
+	Yi //= ESCALA_PONTO_FIXO
+	return Yi
+
+def converter_luminancia(imagem, saida=None, espaco=None, lote=False):
+	"""
+	Converte uma imagem BGR para uma imagem de um único canal com a luminância dela
+	(tons de cinza), usando as mesmas constantes da função melhorar_contraste, o que
+	permite aplicar kernels que operam apenas na luminância (como o kernel gerado pela
+	função kernel_deteccao_borda) em um único canal ao invés de três.
+
+	O resultado é escrito no array do tipo uint8 fornecido pelo parâmetro 'saida'
+	caso exista, que deve ter as dimensões da imagem sem o eixo dos canais, e
+	retornado. Lotes de imagens são aceitos caso 'lote' seja verdadeiro (ver a
+	função convolucao desse módulo)
+	"""
+	imagem = np.asarray(imagem)
+	if imagem.ndim != 3 + bool(lote) or imagem.shape[-1] != 3:
+		raise ValueError(f"imagem inválida, esperado uma imagem com três canais, recebido dimensões {imagem.shape}")
+	if imagem.dtype != np.uint8:
+		imagem = np.clip(imagem, 0, 255).astype(np.uint8)
+
+	dimensoes = imagem.shape[:-1]
+	if saida is None:
+		saida = _array_trabalho(espaco, "saida_luminancia", dimensoes, np.uint8)
+	elif saida.shape != dimensoes or saida.dtype != np.uint8:
+		raise ValueError(
+			f"esperado um array do tipo uint8 de dimensões {dimensoes} para 'saida', "
+			f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+		)
+
+	# NOTE: o produto dos canais pelas constantes em floats de 32 bits é bem mais rápido
+	#       que a soma dos canais multiplicados separadamente e é exato, já que todos os
+	#       valores são inteiros menores que 2^24, e a divisão por 1000 não arredonda
+	#       nenhum valor para o próximo inteiro, então o resultado é o mesmo da luminância
+	#       em ponto fixo usada pela função melhorar_contraste
+	canais = _array_trabalho(espaco, "luminancia_canais", imagem.shape, np.float32)
+	Y      = _array_trabalho(espaco, "luminancia_float", dimensoes, np.float32)
+	np.copyto(canais, imagem)
+	np.matmul(canais, _CONSTANTES_LUMINANCIA, out=Y)
+	np.divide(Y, ESCALA_PONTO_FIXO, out=Y)
+	np.copyto(saida, Y, casting="unsafe")
+	return saida
+
+def _tabela_contraste(ymin, ymax):
+	"""
+	Calcula a tabela de mudança dos níveis dos canais B, G e R para cada nível de
+	luminância, de forma que a luminância entre 'ymin' e 'ymax' seja esticada para
+	o intervalo de 0 a 255, retornando um array do tipo int16 de dimensões (256, 3)
+	"""
+	# correção na luminância, calculada para cada nível de luminância
+	# NOTE: imagens com uma luminância constante não são alteradas
+	niveis = np.arange(256, dtype=np.int16)
+	if ymax > ymin:
+		Yf = (255 * (niveis.astype(np.int32) - ymin)) // (ymax - ymin)
+		np.clip(Yf, 0, 255, out=Yf)
+	else:
+		Yf = niveis
+
+	# NOTE: como (1 - Kr - Kb) / Kg = 1, todos os canais mudam pelo mesmo valor
+	dY = (Yf - niveis).astype(np.int16)
+	return np.repeat(dY[:, None], 3, axis=1)
+
+def _aplicar_tabela_contraste(imagem, Yi, tabela, saida, espaco=None):
+	"""
+	Aplica a tabela de mudança dos níveis dos canais na imagem fornecida,
+	usando a luminância 'Yi' já calculada dela, escrevendo o resultado em 'saida'
+	"""
+	# NOTE: o modo "clip" evita uma cópia intermediária do resultado,
+	#       a luminância sempre contém índices válidos da tabela
+	# NOTE: cada linha da tabela é tratada como um único elemento de 6 bytes, o que
+	#       permite consultar as mudanças dos três canais de uma vez sem cópias
+	resultado = _array_trabalho(espaco, "contraste", imagem.shape, np.int16)
+	linhas = np.ascontiguousarray(tabela).view(f"V{tabela.shape[1] * tabela.itemsize}")[:, 0]
+	np.take(linhas, Yi, out=resultado.view(linhas.dtype)[..., 0], mode="clip")
+	resultado += imagem
 	np.clip(resultado, 0, 255, out=resultado)
-	return resultado.astype(np.uint8)
+	np.copyto(saida, resultado, casting="unsafe")
+	return saida
+
+def _preparar_contraste(imagem, saida, espaco=None):
+	"""
+	Verifica os parâmetros dos filtros de contraste, retornando a imagem
+	convertida para um array do tipo uint8 e o array de saída
+	"""
+	imagem = np.asarray(imagem)
+	if imagem.ndim != 3 or imagem.shape[2] != 3:
+		raise ValueError(f"imagem inválida, esperado uma imagem com três canais, recebido dimensões {imagem.shape}")
+	if imagem.dtype != np.uint8:
+		imagem = np.clip(imagem, 0, 255).astype(np.uint8)
+
+	if saida is None:
+		saida = _array_trabalho(espaco, "saida_contraste", imagem.shape, np.uint8)
+	elif saida.shape != imagem.shape or saida.dtype != np.uint8:
+		raise ValueError(
+			f"esperado um array do tipo uint8 de dimensões {imagem.shape} para 'saida', "
+			f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+		)
+	return imagem, saida
 
-def estender_com_zeros(imagem, tamanho=None):
+def _contraste_lote(filtro, imagem, saida, espaco=None):
+	"""
+	Aplica o filtro de contraste fornecido em cada frame de um lote de dimensões
+	(N, altura, largura, 3), na ordem dos frames, escrevendo os resultados em 'saida'
+	"""
+	imagem = np.asarray(imagem)
+	if imagem.ndim != 4 or imagem.shape[3] != 3:
+		raise ValueError(
+			f"lote de imagens inválido, esperado um lote de imagens com três canais, "
+			f"recebido dimensões {imagem.shape}"
+		)
+
+	if saida is None:
+		saida = _array_trabalho(espaco, "saida_contraste_lote", imagem.shape, np.uint8)
+	elif saida.shape != imagem.shape or saida.dtype != np.uint8:
+		raise ValueError(
+			f"esperado um array do tipo uint8 de dimensões {imagem.shape} para 'saida', "
+			f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+		)
+
+	# NOTE: os limites da luminância dependem de cada frame, então a correção
+	#       é calculada e aplicada um frame de cada vez
+	for indice in range(imagem.shape[0]):
+		filtro(imagem[indice], saida=saida[indice], espaco=espaco)
+	return saida
+
+class ContrasteTemporal:
+	"""
+	Filtro de melhoria de contraste com estado para sequências de frames de um vídeo,
+	que aplica a mesma correção da função melhorar_contraste, mas estima os limites da
+	luminância apenas a cada 'intervalo' frames, pelos percentis do histograma de uma
+	grade de pixels com espaçamento 'passo', e suaviza os limites entre atualizações
+	por uma média móvel exponencial com peso 'suavizacao' para os novos limites.
+
+	Isso evita o cálculo dos limites da luminância na imagem inteira em todos os
+	frames e evita que poucos pixels muito claros ou escuros (ou a variação entre
+	frames) alterem bruscamente o contraste, reutilizando a tabela de correção
+	enquanto os limites arredondados não mudam. Os limites são descartados quando
+	a resolução dos frames muda, já que pertencem a outra sequência de frames.
+	"""
+
+	def __init__(self, intervalo=5, suavizacao=0.25, passo=4, percentis=(0.5, 99.5)):
+		# checagem de parâmetros
+		if not isinstance(intervalo, int) or intervalo < 1:
+			raise ValueError("'intervalo' deve ser um número inteiro positivo")
+		if not isinstance(passo, int) or passo < 1:
+			raise ValueError("'passo' deve ser um número inteiro positivo")
+		if not 0 < suavizacao <= 1:
+			raise ValueError("'suavizacao' deve estar no intervalo (0, 1]")
+		if len(percentis) != 2 or not 0 <= percentis[0] < percentis[1] <= 100:
+			raise ValueError("'percentis' deve conter dois percentis crescentes entre 0 e 100")
+
+		self.intervalo  = intervalo
+		self.suavizacao = suavizacao
+		self.passo      = passo
+		self.percentis  = tuple(percentis)
+		self.reiniciar()
+
+	def reiniciar(self):
+		"""
+		Descarta os limites estimados, que são estimados novamente no próximo frame
+		"""
+		self.limites  = None
+		self._frames  = 0
+		self._tabela  = None
+		self._limites_tabela = None
+		self._dimensoes = None
+
+	def _estimar_limites(self, imagem):
+		"""
+		Estima os limites da luminância pelos percentis do histograma
+		da luminância de uma grade de pixels da imagem
+		"""
+		amostra = _luminancia(imagem[::self.passo, ::self.passo])
+		acumulado = np.cumsum(np.bincount(amostra.ravel(), minlength=256))
+		total = acumulado[-1]
+		ymin = int(np.searchsorted(acumulado, total * self.percentis[0] / 100, side="right"))
+		ymax = int(np.searchsorted(acumulado, total * self.percentis[1] / 100, side="left"))
+		return ymin, min(ymax, 255)
+
+	def __call__(self, imagem, saida=None, espaco=None, lote=False):
+		"""
+		Aplica a melhoria de contraste na imagem BGR fornecida, que deve ser o próximo
+		frame do vídeo, escrevendo o resultado no array fornecido pelo parâmetro 'saida'
+		caso exista, e retornando o resultado (ver a função melhorar_contraste), ou em
+		cada frame em ordem caso a imagem seja um lote de frames e 'lote' seja verdadeiro
+		"""
+		if lote:
+			return _contraste_lote(self, imagem, saida, espaco)
+		imagem, saida = _preparar_contraste(imagem, saida, espaco)
+		if imagem.shape != self._dimensoes:
+			self.reiniciar()
+			self._dimensoes = imagem.shape
+
+		# atualiza os limites da luminância a cada 'intervalo' frames
+		if self._frames % self.intervalo == 0:
+			novos = self._estimar_limites(imagem)
+			if self.limites is None:
+				self.limites = novos
+			else:
+				peso = self.suavizacao
+				self.limites = tuple(
+					(1 - peso) * atual + peso * novo for atual, novo in zip(self.limites, novos)
+				)
+		self._frames += 1
+
+		# recalcula a tabela de correção apenas quando os limites arredondados mudam
+		limites = (round(self.limites[0]), round(self.limites[1]))
+		if limites != self._limites_tabela:
+			self._tabela = _tabela_contraste(*limites)
+			self._limites_tabela = limites
+
+		Yi = _luminancia(imagem, espaco)
+		return _aplicar_tabela_contraste(imagem, Yi, self._tabela, saida, espaco)
+
+def estender_com_zeros(imagem, tamanho=None, saida=None):
 	"""
 	Estende a imagem bidimensional fornecida com zeros nas bordas,
 	independente do número de canais.
@@ -99,6 +393,9 @@ def estender_com_zeros(imagem, tamanho=None):
 	mas pode ser configurado pelo parâmetro 'tamanho' para adicionar
 	outros comprimentos de bordas. Se fornecido, o tamanho deve ser uma
 	lista ou tupla com dois inteiros não negativos.
+
+	A imagem estendida é escrita no array fornecido pelo parâmetro 'saida'
+	caso exista, que deve ter as dimensões e o tipo da imagem estendida.
 	"""
 	# checagem de parâmetros
 	if imagem.ndim < 2:
@@ -121,19 +418,578 @@ def estender_com_zeros(imagem, tamanho=None):
 		dx, dy = tamanho
 
 	w, h, *k = imagem.shape
-	# cria uma imagem não inicializada e preenche as bordas com zero
-	estendida = np.empty((w+(2*dx), h+(2*dy), *k), dtype=imagem.dtype)
-	# gera os índices das bordas
-	indices_x = [*range(dx), *range(-dx,0)]
-	indices_y = [*range(dy), *range(-dy,0)]
-	estendida[indices_x, ::] = 0
-	estendida[::, indices_y] = 0
+	dimensoes = (w+(2*dx), h+(2*dy), *k)
+	if saida is None:
+		# cria uma imagem não inicializada
+		estendida = np.empty(dimensoes, dtype=imagem.dtype)
+	elif saida.shape != dimensoes or saida.dtype != imagem.dtype:
+		raise ValueError(
+			f"esperado um array do tipo {imagem.dtype} de dimensões {dimensoes} para 'saida', "
+			f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+		)
+	else:
+		estendida = saida
+
+	# preenche as bordas com zero
+	estendida[:dx] = 0
+	estendida[(w+dx):] = 0
+	estendida[:, :dy] = 0
+	estendida[:, (h+dy):] = 0
 
 	# copia a imagem para o centro da nova imagem e retorna
-	estendida[dx:-dx, dy:-dy] = imagem
+	estendida[dx:(w+dx), dy:(h+dy)] = imagem
 	return estendida
 
-def convolucao(imagem, kernel, reduzir=False):
+# estratégias de convolução aceitas pela função convolucao e pela classe PlanoConvolucao
+ESTRATEGIA_AUTOMATICA = "auto"
+ESTRATEGIA_DIRETA     = "direta"
+ESTRATEGIA_SEPARAVEL  = "separavel"
+ESTRATEGIA_FFT        = "fft"
+
+ESTRATEGIAS = (ESTRATEGIA_AUTOMATICA, ESTRATEGIA_DIRETA, ESTRATEGIA_SEPARAVEL, ESTRATEGIA_FFT)
+
+# custo estimado da convolução pela transformada de Fourier, medido em passagens
+# de multiplicação e soma pela imagem inteira (a convolução direta custa uma
+# passagem por elemento do kernel e a separável uma por linha e por coluna)
+CUSTO_FFT = 22
+
+# custo fixo estimado de cada convolução, independente do kernel, causado pela
+# extensão da imagem com zeros, pelo truncamento e pela conversão do resultado
+CUSTO_FIXO_CONVOLUCAO = 4
+
+# tolerância relativa entre o segundo e o primeiro valor singular
+# de um kernel de floats para que ele seja considerado separável
+TOLERANCIA_SEPARAVEL = 1e-10
+
+# maior valor absoluto calculado na convolução com kernels de floats com valores inteiros
+# para que o acumulador use floats de 32 bits, que representam inteiros exatamente até 2^24
+LIMITE_FLOAT32 = 1 << 24
+
+# maior valor absoluto calculado na convolução de imagens de inteiros com kernels de floats
+# diádicos (valores inteiros divididos por uma potência de dois, o denominador do kernel),
+# multiplicado pelo denominador, para que as estratégias separável e pela transformada de
+# Fourier tenham o mesmo resultado da convolução direta: abaixo desse limite as somas em
+# floats de 64 bits são exatas em qualquer ordem, e o arredondamento do resultado da
+# transformada para múltiplos do inverso do denominador corrige os erros dela
+LIMITE_DIADICO = 1 << 40
+
+# quantidade de bits da parte fracionária dos pesos da distribuição normal em uma dimensão
+# dos kernels gerados pela função kernel_gauss, que são diádicos com denominador 2^(2*BITS)
+BITS_KERNEL_GAUSS = 12
+
+# quantidade de bytes dos frames de um lote convoluídos de uma vez, para que os arrays
+# intermediários de cada bloco de frames caibam no cache do processador
+BYTES_BLOCO_LOTE = 96 * 1024
+
+# valor do parâmetro 'threads' da convolução que usa uma thread por núcleo do processador
+THREADS_AUTOMATICO = 0
+
+# quantidade mínima de linhas de cada faixa na convolução em várias threads,
+# evitando que imagens pequenas sejam divididas em faixas muito finas
+LINHAS_MINIMAS_FAIXA = 32
+
+# pool de threads persistente usado pela convolução em várias threads, criado sob
+# demanda e recriado apenas quando uma quantidade maior de threads é requisitada
+_pool_convolucao = None
+_tamanho_pool    = 0
+_trava_pool      = threading.Lock()
+
+def _resolver_threads(threads):
+	"""
+	Verifica o parâmetro 'threads' da convolução, retornando a quantidade de threads
+	"""
+	if threads is None:
+		return 1
+	if not isinstance(threads, int) or isinstance(threads, bool):
+		raise TypeError(f"esperado int ou None para 'threads', recebido tipo {type(threads).__qualname__}")
+	if threads < 0:
+		raise ValueError("'threads' não pode ser um número negativo")
+	if threads == THREADS_AUTOMATICO:
+		return os.cpu_count() or 1
+	return threads
+
+def _obter_pool(threads):
+	"""
+	Retorna o pool de threads da convolução, com ao menos a quantidade de threads fornecida
+	"""
+	global _pool_convolucao, _tamanho_pool
+	with _trava_pool:
+		if _pool_convolucao is None or _tamanho_pool < threads:
+			if _pool_convolucao is not None:
+				_pool_convolucao.shutdown(wait=False)
+			_pool_convolucao = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="convolucao")
+			_tamanho_pool    = threads
+		return _pool_convolucao
+
+class PlanoConvolucao:
+	"""
+	Plano de convolução de um kernel, que analisa o kernel uma única vez para escolher
+	a forma mais rápida de aplicá-lo em imagens, podendo ser reutilizado em vários frames.
+
+	As estratégias disponíveis são a convolução direta (ESTRATEGIA_DIRETA), que multiplica
+	e soma a imagem deslocada uma vez por elemento do kernel, a convolução separável
+	(ESTRATEGIA_SEPARAVEL), que aplica kernels de posto 1 (como os gerados pela função
+	kernel_gauss) em duas passagens unidimensionais, e a convolução pela transformada
+	rápida de Fourier (ESTRATEGIA_FFT), com custo independente do tamanho do kernel.
+
+	Todas as estratégias estendem a imagem com zeros da mesma forma e truncam o resultado
+	para canais de 8 bits. Kernels de números inteiros e kernels de floats diádicos (como
+	os gerados pela função kernel_gauss, ver LIMITE_DIADICO) produzem resultados idênticos
+	em todas as estratégias em imagens de inteiros, já os demais kernels de floats podem
+	ter diferenças de arredondamento de no máximo uma unidade entre elas, então a escolha
+	automática só usa estratégias com o mesmo resultado da convolução direta (ver a função
+	_escolher_estrategia). O acumulador usa o menor tipo que comporta os valores calculados
+	(ver a função _tipo_acumulador).
+	"""
+
+	def __init__(self, kernel, estrategia=None):
+		"""
+		Cria um plano de convolução para o kernel fornecido, que deve ter duas dimensões
+		não nulas e ser composto de valores dos tipos float ou int.
+
+		A estratégia usada é escolhida automaticamente com base no tamanho do kernel e se
+		ele é separável, mas pode ser forçada pelo parâmetro 'estrategia', que se fornecido
+		deve ser uma das constantes ESTRATEGIA_* desse módulo. Forçar a estratégia separável
+		em um kernel que não é separável gera um erro do tipo ValueError, e forçar outra
+		estratégia que não a direta em um kernel de floats pode alterar o resultado.
+		"""
+		kernel = np.asarray(kernel)
+		if kernel.ndim != 2:
+			raise ValueError(f"kernel de imagem inválido, número de dimensões não suportado: {kernel.ndim}")
+		if kernel.shape[0] == 0 or kernel.shape[1] == 0:
+			raise ValueError("kernel de imagem inválido, dimensão de comprimento nulo encontrado")
+		if not (np.issubdtype(kernel.dtype, np.floating) or np.issubdtype(kernel.dtype, np.integer)):
+			raise ValueError(f"kernel de imagem inválido, tipo não suportado: {kernel.dtype}")
+
+		if estrategia is None:
+			estrategia = ESTRATEGIA_AUTOMATICA
+		elif estrategia not in ESTRATEGIAS:
+			raise ValueError(f"estratégia de convolução desconhecida: {estrategia!r}")
+
+		self.kernel      = kernel
+		self.denominador = _denominador_kernel(kernel)
+		self.vetores     = _decompor_kernel(kernel, self.denominador)
+		self._automatica = estrategia == ESTRATEGIA_AUTOMATICA
+		if estrategia == ESTRATEGIA_AUTOMATICA:
+			estrategia = _escolher_estrategia(kernel, self.vetores, self.denominador)
+		elif estrategia == ESTRATEGIA_SEPARAVEL and self.vetores is None:
+			raise ValueError("o kernel fornecido não é separável")
+		self.estrategia = estrategia
+		self.custo      = _custo_estrategias(kernel, self.vetores)[estrategia]
+
+		# tipo do acumulador, estratégia e denominador usado no arredondamento da
+		# transformada de Fourier para cada tipo de imagem, calculados na primeira convolução
+		self._acumuladores = {}
+
+	def _acumulador(self, imagem):
+		"""
+		Retorna o tipo do acumulador, a estratégia usada e o denominador do kernel usado
+		para arredondar o resultado da transformada de Fourier (ou None) para o tipo da
+		imagem fornecida, usando a convolução direta na escolha automática quando as
+		outras estratégias não são exatas com esse tipo de imagem
+		"""
+		acumulador = self._acumuladores.get(imagem.dtype)
+		if acumulador is None:
+			tipo = _tipo_acumulador(imagem, self.kernel)
+			# NOTE: acumuladores de inteiros são sempre exatos, e os de floats apenas
+			#       com imagens de inteiros e kernels diádicos abaixo de LIMITE_DIADICO
+			denominador = None
+			if not np.issubdtype(tipo, np.integer) and self.denominador is not None \
+			   and np.issubdtype(imagem.dtype, np.integer):
+				info = np.iinfo(imagem.dtype)
+				limite = np.abs(self.kernel).astype(float).sum() * max(-int(info.min), int(info.max))
+				if limite * self.denominador <= LIMITE_DIADICO:
+					denominador = self.denominador
+			estrategia = self.estrategia
+			if self._automatica and denominador is None and not np.issubdtype(tipo, np.integer):
+				estrategia = ESTRATEGIA_DIRETA
+			acumulador = self._acumuladores[imagem.dtype] = (tipo, estrategia, denominador)
+		return acumulador
+
+	def __call__(self, imagem, reduzir=False, threads=None, saida=None, espaco=None, lote=False):
+		"""
+		Aplica a convolução na imagem fornecida, ver a função convolucao desse módulo
+		"""
+		if lote:
+			return self._convoluir_lote(imagem, reduzir, threads, saida, espaco)
+		if imagem.ndim > 3 or imagem.ndim < 2:
+			raise ValueError(f"imagem inválida, número de dimensões não suportado: {imagem.ndim}")
+		return self._convoluir(imagem, reduzir, _resolver_threads(threads), saida, espaco)
+
+	def _convoluir_lote(self, imagem, reduzir, threads, saida, espaco=None):
+		"""
+		Aplica a convolução em um lote de imagens de dimensões (N, altura, largura)
+		ou (N, altura, largura, canais), escrevendo o resultado em 'saida'
+		"""
+		if imagem.ndim > 4 or imagem.ndim < 3:
+			raise ValueError(f"lote de imagens inválido, número de dimensões não suportado: {imagem.ndim}")
+
+		n, f_w, f_h, *dim_extras = imagem.shape
+		if reduzir:
+			k_w, k_h = self.kernel.shape
+			f_w -= (k_w - 1) // 2
+			f_h -= (k_h - 1) // 2
+		dims_saida = (n, f_w, f_h, *dim_extras)
+		if saida is None:
+			saida = _array_trabalho(espaco, "resultado_lote", dims_saida, np.uint8)
+		elif saida.shape != dims_saida or saida.dtype != np.uint8:
+			raise ValueError(
+				f"esperado um array do tipo uint8 de dimensões {dims_saida} para 'saida', "
+				f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+			)
+
+		# divide o lote em blocos de frames pequenos o suficiente para que os arrays
+		# intermediários de cada bloco caibam no cache do processador
+		threads = _resolver_threads(threads)
+		bloco = max(1, BYTES_BLOCO_LOTE // max(1, imagem[0].nbytes))
+		espaco = _EspacoLote(espaco)
+		for inicio in range(0, n, bloco):
+			fim = min(inicio + bloco, n)
+			# NOTE: o eixo dos frames é movido para depois dos eixos das linhas e colunas
+			#       (sem copiar os frames), sendo tratado como um eixo de canais, de forma
+			#       que cada elemento do kernel é aplicado em todos os frames do bloco de
+			#       uma vez, enquanto os arrays de trabalho mantêm os frames em sequência
+			#       na memória, como no lote
+			self._convoluir(
+				np.moveaxis(imagem[inicio:fim], 0, 2), reduzir, threads,
+				np.moveaxis(saida[inicio:fim], 0, 2), espaco
+			)
+		return saida
+
+	def _convoluir(self, imagem, reduzir, threads, saida, espaco=None):
+		"""
+		Aplica a convolução na imagem fornecida, com eixos adicionais
+		tratados como canais, e retorna o resultado
+		"""
+		# estende a imagem com zeros para aplicar o kernel,
+		# a menos que a convolução deva reduzi-la
+		kernel = self.kernel
+		k_w, k_h = kernel.shape
+		f_w, f_h, *dim_extras = imagem.shape
+		espacamento_x = (k_w - 1) // 2
+		espacamento_y = (k_h - 1) // 2
+		if not reduzir:
+			# NOTE: kernels de tamanho par precisam de uma borda a mais no fim de cada eixo,
+			#       que é obtida estendendo a imagem por k//2 e ignorando a borda excedente
+			borda = (k_w // 2, k_h // 2)
+			estendida = None
+			if espaco is not None:
+				dims_estendida = (f_w + 2 * borda[0], f_h + 2 * borda[1], *dim_extras)
+				estendida = espaco.array("estendida", dims_estendida, imagem.dtype)
+			imagem = estender_com_zeros(imagem, borda, saida=estendida)
+			imagem = imagem[(k_w // 2 - espacamento_x):, (k_h // 2 - espacamento_y):]
+			dims_saida = (f_w, f_h, *dim_extras)
+		else:
+			dims_saida = (f_w - espacamento_x, f_h - espacamento_y, *dim_extras)
+
+		# NOTE: o acumulador é zerado por cada faixa
+		tipo, estrategia, denominador = self._acumulador(imagem)
+		acumulador = _array_trabalho(espaco, "acumulador", dims_saida, tipo)
+		if saida is None:
+			resultado = _array_trabalho(espaco, "resultado", dims_saida, np.uint8)
+		elif saida.shape != dims_saida or saida.dtype != np.uint8:
+			raise ValueError(
+				f"esperado um array do tipo uint8 de dimensões {dims_saida} para 'saida', "
+				f"recebido um array do tipo {saida.dtype} de dimensões {saida.shape}"
+			)
+		else:
+			resultado = saida
+
+		# divide as linhas da saída em faixas, que são processadas em paralelo caso
+		# mais de uma thread seja usada, já que o numpy libera o GIL nas operações
+		faixas = max(1, min(threads, dims_saida[0] // LINHAS_MINIMAS_FAIXA))
+		limites = [dims_saida[0] * i // faixas for i in range(faixas + 1)]
+		argumentos = (estrategia, denominador, reduzir, espaco)
+		if faixas == 1:
+			self._convoluir_faixa(imagem, acumulador, resultado, 0, dims_saida[0], *argumentos)
+		else:
+			pool = _obter_pool(threads)
+			tarefas = [
+				pool.submit(
+					self._convoluir_faixa, imagem, acumulador, resultado, inicio, fim, *argumentos
+				)
+				for inicio, fim in zip(limites[:-1], limites[1:])
+			]
+			for tarefa in tarefas:
+				tarefa.result()
+		return resultado
+
+	def _convoluir_faixa(self, imagem, saida, resultado, inicio, fim, estrategia, denominador, reduzir,
+	                     espaco=None):
+		"""
+		Aplica a convolução nas linhas de 'inicio' a 'fim' da saída com a estratégia
+		fornecida, usando as linhas correspondentes da imagem (já estendida) e as linhas
+		vizinhas necessárias para o kernel, escrevendo o resultado truncado nas mesmas
+		linhas de 'resultado'
+		"""
+		kernel = self.kernel
+		imagem = imagem[inicio:(fim + kernel.shape[0] - 1)]
+		saida  = saida[inicio:fim]
+		saida.fill(0)
+
+		# aplica o kernel usando a estratégia fornecida, a redução da imagem
+		# é suportada apenas pela convolução direta
+		# NOTE: os arrays de trabalho de cada faixa são identificados pela linha inicial,
+		#       evitando que faixas processadas em paralelo compartilhem arrays
+		if estrategia == ESTRATEGIA_SEPARAVEL and not reduzir:
+			_correlacao_separavel(imagem, *self.vetores, saida, espaco, inicio)
+		elif estrategia == ESTRATEGIA_FFT and not reduzir:
+			_correlacao_fft(imagem, kernel, saida, denominador)
+		else:
+			_correlacao_direta(imagem, kernel, saida, espaco, inicio)
+
+		# trunca o resultado
+		np.clip(saida, 0, 255, out=saida)
+		resultado[inicio:fim] = saida
+
+class _EspacoLote:
+	"""
+	Espaço de trabalho usado na convolução de lotes, onde o eixo dos frames é o
+	terceiro eixo das imagens, que cria os arrays de trabalho com os frames no eixo
+	mais externo da memória (como no lote) e retorna eles com os eixos na mesma ordem
+	das imagens, usando o espaço de trabalho fornecido caso exista
+	"""
+
+	def __init__(self, espaco=None):
+		self._espaco = espaco
+
+	def array(self, nome, dimensoes, dtype, zerar=False):
+		dimensoes = (dimensoes[2], *dimensoes[:2], *dimensoes[3:])
+		return np.moveaxis(_array_trabalho(self._espaco, nome, dimensoes, dtype, zerar), 0, 2)
+
+def _tipo_acumulador(imagem, kernel):
+	"""
+	Calcula o tipo mais estreito que pode ser usado no buffer intermediário da
+	convolução sem risco de overflow, usando números inteiros com kernels de inteiros
+	e floats de 32 bits com kernels de floats com valores inteiros quando os valores
+	calculados são pequenos o suficiente para que eles sejam exatos, os demais kernels
+	de floats usam floats de 64 bits, como na convolução sem a escolha do acumulador
+
+	NOTE: o maior valor absoluto de qualquer soma parcial da convolução (e dos valores
+	      intermediários da convolução separável, já que a soma dos valores absolutos de
+	      um kernel separável é o produto das somas dos valores absolutos dos vetores)
+	      é a soma dos valores absolutos do kernel multiplicada pelo maior valor absoluto
+	      da imagem, usado como limite na escolha do tipo
+	"""
+	if np.issubdtype(imagem.dtype, np.floating):
+		return np.float64
+
+	info = np.iinfo(imagem.dtype)
+	limite = np.abs(kernel).astype(float).sum() * max(-int(info.min), int(info.max))
+
+	if np.issubdtype(kernel.dtype, np.floating):
+		# NOTE: floats de 32 bits só calculam exatamente somas de produtos inteiros,
+		#       pesos fracionários (como os do kernel_gauss) teriam erros de arredondamento
+		if limite <= LIMITE_FLOAT32 and np.array_equal(kernel, np.trunc(kernel)):
+			return np.float32
+		return np.float64
+
+	# checagem de sinal, usando tipos sem sinal quando nenhum valor pode ser negativo
+	if kernel.min() >= 0 and info.min >= 0:
+		tipos = (np.uint16, np.uint32, np.uint64)
+	else:
+		tipos = (np.int16, np.int32, np.int64)
+	for tipo in tipos:
+		if limite <= np.iinfo(tipo).max:
+			# sem risco de overflow, use o menor tipo inteiro para acelerar as contas
+			return tipo
+
+	# overflow provável, use floats no cálculo pra prevenir erros
+	return np.float64
+
+def _denominador_kernel(kernel):
+	"""
+	Retorna a menor potência de dois que multiplicada pelo kernel resulta em valores
+	inteiros (1 em kernels de inteiros), ou None caso ela não exista ou caso a soma
+	dos valores absolutos do kernel multiplicada por ela ultrapasse LIMITE_DIADICO,
+	já que a convolução com o kernel não poderia ser exata
+	"""
+	if np.issubdtype(kernel.dtype, np.integer):
+		return 1
+	kernel = kernel.astype(float)
+	if not np.all(np.isfinite(kernel)):
+		return None
+	soma = np.abs(kernel).sum()
+	denominador = 1
+	while soma * denominador <= LIMITE_DIADICO:
+		escalado = kernel * denominador
+		if np.array_equal(escalado, np.trunc(escalado)):
+			return denominador
+		denominador *= 2
+	return None
+
+def _decompor_inteiro(kernel):
+	"""
+	Tenta decompor o kernel de inteiros no produto externo de dois vetores de
+	inteiros, retornando None caso o kernel não seja separável
+	"""
+	# usa a primeira linha não nula como base, dividida pelo seu máximo
+	# divisor comum, e calcula a coluna que multiplica ela
+	nao_nulos = np.argwhere(kernel)
+	if len(nao_nulos) == 0:
+		return None
+	p, q = nao_nulos[0]
+	v = kernel[p] // np.gcd.reduce(kernel[p])
+	if v[q] < 0:
+		v = -v
+	if np.any(kernel[:, q] % v[q]):
+		return None
+	u = kernel[:, q] // v[q]
+	if not np.array_equal(np.outer(u, v), kernel):
+		return None
+	return u, v
+
+def _decompor_kernel(kernel, denominador=None):
+	"""
+	Tenta decompor o kernel no produto externo de dois vetores (u, v), de forma que
+	kernel == numpy.outer(u, v), retornando None caso o kernel não seja separável
+	ou caso a separação não reduza o custo da convolução (kernels de uma linha
+	ou coluna). Kernels de inteiros só são separados em vetores de inteiros, e
+	kernels de floats com o denominador fornecido (ver a função _denominador_kernel)
+	só são separados em vetores de inteiros divididos por potências de dois, para
+	que a convolução separável seja exata
+	"""
+	k_w, k_h = kernel.shape
+	if k_w == 1 or k_h == 1:
+		return None
+
+	if np.issubdtype(kernel.dtype, np.integer):
+		return _decompor_inteiro(kernel)
+
+	if denominador is not None:
+		vetores = _decompor_inteiro((kernel * denominador).astype(np.int64))
+		if vetores is None:
+			return None
+		u, v = vetores
+		return u.astype(float), v / denominador
+
+	# kernels de floats não diádicos são separados pela decomposição em valores singulares,
+	# sendo separáveis quando apenas o primeiro valor singular é significativo
+	U, s, Vt = np.linalg.svd(kernel.astype(float))
+	if s[0] == 0 or s[1] > s[0] * TOLERANCIA_SEPARAVEL:
+		return None
+	u = U[:, 0] * np.sqrt(s[0])
+	v = Vt[0] * np.sqrt(s[0])
+	# mantém os vetores positivos para kernels positivos (ex: kernel_gauss)
+	if u.sum() < 0:
+		u, v = -u, -v
+	return u, v
+
+def _custo_estrategias(kernel, vetores):
+	"""
+	Estima o custo de cada estratégia de convolução para o kernel fornecido,
+	em passagens de multiplicação e soma pela imagem inteira
+	"""
+	k_w, k_h = kernel.shape
+	custos = {
+		ESTRATEGIA_DIRETA: k_w * k_h,
+		ESTRATEGIA_FFT:    CUSTO_FFT
+	}
+	if vetores is not None:
+		custos[ESTRATEGIA_SEPARAVEL] = k_w + k_h
+	return custos
+
+def _escolher_estrategia(kernel, vetores, denominador):
+	"""
+	Escolhe a estratégia de convolução com o menor custo estimado para o kernel entre as
+	estratégias com o mesmo resultado da convolução direta, o que exclui as estratégias
+	separável e pela transformada de Fourier em kernels de floats que não são diádicos
+	(sem denominador), já que os erros de arredondamento delas podem alterar o resultado
+	truncado para 8 bits
+	"""
+	if denominador is None:
+		return ESTRATEGIA_DIRETA
+	custos = _custo_estrategias(kernel, vetores)
+	return min(custos, key=custos.get)
+
+def _correlacao_direta(imagem, kernel, saida, espaco=None, faixa=0):
+	"""
+	Acumula em 'saida' os MxN vizinhos de cada píxel da imagem (já estendida)
+	multiplicados pelo kernel MxN, uma multiplicação por elemento do kernel
+	"""
+	k_w, k_h = kernel.shape
+	f_w, f_h = saida.shape[:2]
+	dtype = saida.dtype
+	# NOTE: a conversão do kernel evita erros de conversão de tipos
+	#       do numpy ao multiplicar inteiros com sinal e sem sinal
+	kernel = kernel.astype(dtype)
+	buffer = _array_trabalho(espaco, ("direta", faixa), saida.shape, dtype)
+	for j in range(k_h):
+		for i in range(k_w):
+			# multiplicação sem alocação de um novo array
+			np.multiply(kernel[i,j], imagem[i:(f_w+i), j:(f_h+j)], out=buffer, dtype=dtype)
+			# adiciona o resultado parcial à saída
+			saida += buffer
+
+def _correlacao_separavel(imagem, u, v, saida, espaco=None, faixa=0):
+	"""
+	Acumula em 'saida' a convolução da imagem (já estendida) com o kernel
+	numpy.outer(u, v) em duas passagens, a primeira ao longo das linhas
+	usando o vetor 'u' e a segunda ao longo das colunas usando o vetor 'v'
+	"""
+	f_w, f_h = saida.shape[:2]
+	dtype = saida.dtype
+	u = u.astype(dtype)
+	v = v.astype(dtype)
+
+	# primeira passagem, mantendo as colunas da borda para a segunda passagem
+	intermediario = _array_trabalho(espaco, ("separavel", faixa), (f_w, *imagem.shape[1:]), dtype, zerar=True)
+	buffer = _array_trabalho(espaco, ("separavel_temp", faixa), intermediario.shape, dtype)
+	for i in range(len(u)):
+		np.multiply(u[i], imagem[i:(f_w+i)], out=buffer, dtype=dtype)
+		intermediario += buffer
+
+	# segunda passagem
+	buffer = _array_trabalho(espaco, ("separavel_temp", faixa), saida.shape, dtype)
+	for j in range(len(v)):
+		np.multiply(v[j], intermediario[:, j:(f_h+j)], out=buffer, dtype=dtype)
+		saida += buffer
+
+def _tamanho_fft(n):
+	"""
+	Retorna o menor número maior ou igual a 'n' que não possui fatores primos
+	maiores que 5, tamanhos para os quais a transformada de Fourier é mais rápida
+	"""
+	while True:
+		m = n
+		for p in (2, 3, 5):
+			while m % p == 0:
+				m //= p
+		if m == 1:
+			return n
+		n += 1
+
+def _correlacao_fft(imagem, kernel, saida, denominador=None):
+	"""
+	Calcula em 'saida' a convolução da imagem (já estendida) com o kernel pela
+	transformada rápida de Fourier, arredondando o resultado caso o kernel e
+	a imagem sejam de números inteiros, ou para múltiplos do inverso do denominador
+	fornecido caso o kernel seja diádico, para que ele seja exato
+	"""
+	k_w, k_h = kernel.shape
+	f_w, f_h = saida.shape[:2]
+
+	# NOTE: a convolução circular só sobrepõe as primeiras k_w-1 linhas e k_h-1 colunas,
+	#       que são descartadas, desde que a transformada tenha ao menos o tamanho da imagem
+	tamanho = (_tamanho_fft(imagem.shape[0]), _tamanho_fft(imagem.shape[1]))
+	# inverte o kernel para que a convolução seja equivalente a da convolução direta
+	espectro_kernel = np.fft.rfft2(kernel[::-1, ::-1], s=tamanho)
+	espectro_kernel = espectro_kernel.reshape(espectro_kernel.shape + (1,) * (imagem.ndim - 2))
+	espectro = np.fft.rfft2(imagem, s=tamanho, axes=(0, 1))
+	espectro *= espectro_kernel
+	resultado = np.fft.irfft2(espectro, s=tamanho, axes=(0, 1))
+	resultado = resultado[(k_w-1):(k_w-1+f_w), (k_h-1):(k_h-1+f_h)]
+
+	if np.issubdtype(saida.dtype, np.integer):
+		np.rint(resultado, out=resultado)
+	elif denominador is not None:
+		resultado *= denominador
+		np.rint(resultado, out=resultado)
+		resultado /= denominador
+	saida[...] = resultado
+
+def convolucao(imagem, kernel, reduzir=False, estrategia=None, threads=None, saida=None, espaco=None,
+               lote=False):
 	"""
 	Aplica uma filtragem na imagem fornecida por meio da convolução dela com um kernel,
 	que ocorre isoladamente em cada canal produzindo uma imagem resultante com as mesmas
@@ -144,6 +1000,8 @@ def convolucao(imagem, kernel, reduzir=False):
 	O kernel fornecido deve ter duas dimensões não nulas e ser composto de valores dos
 	tipos float ou int, caso um kernel com números inteiros for fornecido, essa função
 	utilizará números inteiros nas contas a menos que isso cause erros de overflow.
+	Também pode ser fornecido um objeto PlanoConvolucao já criado para o kernel, o que
+	evita que o kernel seja analisado novamente em cada chamada.
 
 	A convolução é feita primeiro achando o centro do kernel (que é a célula na diagonal
 	superior esquerda mais próxima ao centro), estendendo a imagem com zeros caso necessário
@@ -151,66 +1009,42 @@ def convolucao(imagem, kernel, reduzir=False):
 	em todos os pixels. Em seguida os NxM vizinhos de cada píxel são multiplicados pelo
 	kernel de dimensões MxN, gerando MxN imagens que são sendo somadas a um acumulador,
 	que é truncado, convertido para armazenar canais de 8 bits e retornado como resultado.
-	"""
-	if imagem.ndim > 3 or imagem.ndim < 2:
-		raise ValueError(f"imagem inválida, número de dimensões não suportado: {imagem.ndim}")
-	if kernel.ndim != 2:
-		raise ValueError(f"kernel de imagem inválido, número de dimensões não suportado: {kernel.ndim}")
-	if kernel.shape[0] == 0 or kernel.shape[1] == 0:
-		raise ValueError("kernel de imagem inválido, dimensão de comprimento nulo encontrado")
-
-	# estende a imagem com zeros para aplicar o kernel,
-	# a menos que a convolução deva reduzi-la
-	k_w, k_h = kernel.shape
-	f_w, f_h, *dim_extras = imagem.shape
-	espacamento_x = (k_w - 1) // 2
-	espacamento_y = (k_h - 1) // 2
-	if not reduzir:
-		imagem = estender_com_zeros(imagem, (espacamento_x, espacamento_y))
-		dims_saida = (f_w, f_h, *dim_extras)
-	else:
-		dims_saida = (f_w - espacamento_x, f_h - espacamento_y, *dim_extras)
 
-	# calcula o tipo apropriado para utilizar no buffer intermediário
-	if np.issubdtype(kernel.dtype, np.floating) or np.issubdtype(imagem.dtype, np.floating):
-		dtype = float
+	Kernels de números inteiros ou de floats diádicos (como os gerados pela função
+	kernel_gauss) separáveis são aplicados em duas passagens unidimensionais e os grandes
+	pela transformada de Fourier, com o mesmo resultado da convolução direta, a estratégia
+	é escolhida automaticamente mas pode ser forçada pelo parâmetro 'estrategia', ver a
+	classe PlanoConvolucao desse módulo.
 
-	elif np.issubdtype(kernel.dtype, np.integer):
-		vmax_a = np.sum(255 * np.clip(kernel, 0, np.inf).astype(float))
-		vmax_b = -np.sum(255 * np.clip(kernel, -np.inf, 0).astype(float))
-		vmax = max(vmax_a, vmax_b)
-		# checagem de sinal
-		if kernel.min() >= 0:
-			if vmax > ((1 << 64) - 1):
-				# overflow provável, use floats no cálculo pra prevenir erros
-				dtype = float
-			else:
-				# sem risco de overflow, use unsigned ints para acelerar as contas
-				dtype = np.uint64
+	A convolução pode ser feita em várias threads pelo parâmetro 'threads', que divide
+	a imagem em faixas horizontais processadas em paralelo por um pool de threads
+	persistente, o valor THREADS_AUTOMATICO usa uma thread por núcleo do processador
+	e o valor padrão (None) faz a convolução na thread atual.
 
-		elif vmax > ((1 << 63) - 1):
-			# overflow provável, use floats no cálculo pra prevenir erros
-			dtype = float
-		else:
-			# sem risco de overflow, use ints para acelerar as contas
-			dtype = np.int64
-	else:
-		raise ValueError(f"kernel de imagem inválido, tipo não suportado: {kernel.dtype}")
+	O resultado é escrito no array do tipo uint8 fornecido pelo parâmetro 'saida' caso
+	exista, e os arrays intermediários podem ser reutilizados entre chamadas pelo parâmetro
+	'espaco' (ver a classe EspacoTrabalho), nesse caso o resultado pertence ao espaço de
+	trabalho caso 'saida' não seja fornecido.
 
-	# aplica o kernel
-	# NOTE: isso pode provavelmente ser otimizado operando o kernel inteiro de uma vez,
-	#       talvez com uma view ou o método numpy.broadcast
-	saida  = np.zeros(dims_saida, dtype=dtype)
-	buffer = np.zeros(dims_saida, dtype=dtype)
-	for j in range(k_h):
-		for i in range(k_w):
-			# multiplicação sem alocação de um novo array
-			np.multiply(kernel[i,j], imagem[i:(f_w+i), j:(f_h+j)], out=buffer, dtype=dtype)
-			# adiciona o resultado parcial à saída
-			saida += buffer
+	Caso um valor verdadeiro seja passado ao parâmetro 'lote', a imagem deve ser um lote
+	de frames de dimensões (N, altura, largura) ou (N, altura, largura, canais), como os
+	gerados pela função cntexercicios.video.extrair_lotes, e cada elemento do kernel é
+	aplicado em todos os frames do lote de uma vez, o que reduz o custo por frame em
+	relação a convoluir um frame de cada vez. O resultado tem o mesmo formato do lote.
+	"""
+	if lote:
+		if imagem.ndim > 4 or imagem.ndim < 3:
+			raise ValueError(f"lote de imagens inválido, número de dimensões não suportado: {imagem.ndim}")
+	elif imagem.ndim > 3 or imagem.ndim < 2:
+		raise ValueError(f"imagem inválida, número de dimensões não suportado: {imagem.ndim}")
 
-	# trunca o resultado e retorna
-	return np.clip(saida, 0, 255).astype(np.uint8)
+	if isinstance(kernel, PlanoConvolucao):
+		if estrategia is not None and estrategia != kernel.estrategia:
+			raise ValueError("'estrategia' não pode ser alterada em um PlanoConvolucao já criado")
+		plano = kernel
+	else:
+		plano = PlanoConvolucao(kernel, estrategia)
+	return plano(imagem, reduzir, threads, saida, espaco, lote)
 
 def kernel_nitidez(peso=1):
 	"""
@@ -267,6 +1101,11 @@ def kernel_gauss(tamanho=None, sigma=1):
 
 	NOTA: os kernels gerados respeitam a regra da distribuição normal,
 	      onde a soma de todos os pontos deve ser sempre igual a 1
+
+	Os pesos da distribuição em uma dimensão são arredondados para múltiplos de
+	1/2^BITS_KERNEL_GAUSS, de forma que o kernel seja diádico e separável em vetores
+	diádicos, o que permite aplicá-lo em duas passagens ou pela transformada de Fourier
+	com o mesmo resultado da convolução direta (ver a classe PlanoConvolucao)
 	"""
 	import sys
 	import math
@@ -288,15 +1127,158 @@ def kernel_gauss(tamanho=None, sigma=1):
 
 	# distribuição normal em uma dimensão
 	if sigma < sys.float_info.epsilon:
-		x = np.array([0, 1, 0], dtype=np.float)
+		x = np.array([0, 1, 0], dtype=float)
 	else:
 		x = np.linspace(-(tamanho // 2), tamanho // 2, tamanho)
 		x = (1 / (np.sqrt(2 * np.pi) * sigma)) * np.e ** (-np.power(x / sigma, 2) / 2)
 
-	# extensão da distribuição fazendo o produto externo
-	kernel = np.outer(x.T, x.T)
+	# arredonda os pesos para inteiros com soma 2^BITS_KERNEL_GAUSS, corrigindo o
+	# peso central para que a soma dos valores seja 1 (evitando que a imagem escureça)
+	escala = 1 << BITS_KERNEL_GAUSS
+	pesos = np.rint(x * (escala / x.sum())).astype(np.int64)
+	pesos[len(pesos) // 2] += escala - pesos.sum()
 
-	# corrige kernel para que a soma dos valores seja 1
-	# (evitando que a imagem escureça) e retorna o resultado
-	kernel /= kernel.sum()
+	# extensão da distribuição fazendo o produto externo, com valores exatos
+	kernel = np.outer(pesos, pesos) / float(escala * escala)
 	return kernel
+
+def combinar_kernels(kernel_a, kernel_b):
+	"""
+	Combina dois kernels em um único kernel equivalente a aplicar o kernel 'kernel_a'
+	e em seguida o kernel 'kernel_b' em uma imagem, sem truncar o resultado intermediário.
+
+	A equivalência vale apenas no interior da imagem: aplicar os kernels em sequência
+	estende o resultado intermediário com zeros, enquanto o kernel combinado aplica o
+	segundo kernel sobre valores do primeiro calculados fora da imagem, então os pixels
+	a menos de metade do tamanho do segundo kernel das bordas também podem mudar.
+
+	O kernel resultante tem dimensões (M1+M2-1)x(N1+N2-1), e só pode ser calculado quando
+	o seu centro coincide com a combinação dos centros dos dois kernels, o que não ocorre
+	quando os dois kernels tem tamanho par no mesmo eixo, nesse caso um erro do tipo
+	ValueError é gerado.
+	"""
+	kernel_a = np.asarray(kernel_a)
+	kernel_b = np.asarray(kernel_b)
+	if kernel_a.ndim != 2 or kernel_b.ndim != 2:
+		raise ValueError("kernels de imagem inválidos, esperado kernels de duas dimensões")
+
+	a_w, a_h = kernel_a.shape
+	b_w, b_h = kernel_b.shape
+	if (a_w % 2 == 0 and b_w % 2 == 0) or (a_h % 2 == 0 and b_h % 2 == 0):
+		raise ValueError("kernels de tamanho par no mesmo eixo não podem ser combinados")
+
+	# NOTE: como a convolução desse módulo não inverte o kernel, a combinação
+	#       é a soma das cópias do segundo kernel deslocadas e multiplicadas
+	#       por cada elemento do primeiro kernel
+	dtype = np.result_type(kernel_a, kernel_b)
+	combinado = np.zeros((a_w + b_w - 1, a_h + b_h - 1), dtype=dtype)
+	for i in range(a_w):
+		for j in range(a_h):
+			combinado[i:(i+b_w), j:(j+b_h)] += kernel_a[i,j] * kernel_b
+	return combinado
+
+class PipelineFiltros:
+	"""
+	Sequência de filtros compilada uma única vez para ser aplicada em vários frames,
+	composta pelo filtro opcional de melhoria de contraste seguido de uma sequência
+	de kernels aplicados por convolução, opcionalmente apenas na luminância.
+
+	Durante a compilação cada kernel é convertido para um PlanoConvolucao, e caso a
+	combinação seja ativada, kernels consecutivos são combinados em um único kernel pela
+	função combinar_kernels sempre que isso reduzir o custo estimado da sequência. Como a
+	combinação não trunca os resultados intermediários para 8 bits e não estende eles com
+	zeros nas bordas, o resultado combinado pode ser diferente de aplicar os kernels um de
+	cada vez, tanto no interior da imagem quanto nos pixels próximos das bordas.
+	"""
+
+	def __init__(self, kernels=(), contraste=False, combinar=False, threads=None, luminancia=False):
+		"""
+		Compila a sequência de kernels fornecida pelo parâmetro 'kernels', que serão
+		aplicados na ordem fornecida, após o filtro de melhoria de contraste caso um
+		valor verdadeiro seja passado ao parâmetro 'contraste', que também pode ser um
+		filtro de contraste com estado (como ContrasteTemporal) a ser usado ao invés da
+		função melhorar_contraste. Por padrão o resultado é truncado após cada kernel,
+		como na aplicação dos kernels um de cada vez, e a combinação de kernels (que
+		pode alterar o resultado, ver a função combinar_kernels) pode ser ativada
+		passando um valor verdadeiro ao parâmetro 'combinar'. Os kernels são aplicados
+		com a quantidade de threads fornecida pelo parâmetro 'threads' (ver a função
+		convolucao desse módulo).
+
+		Caso um valor verdadeiro seja passado ao parâmetro 'luminancia', a imagem é
+		convertida para um único canal com a luminância dela após o filtro de contraste
+		(ver a função converter_luminancia), e os kernels são aplicados apenas nesse
+		canal, reduzindo o custo da convolução em imagens BGR a um terço, nesse caso
+		o resultado é uma imagem de um único canal (tons de cinza).
+		"""
+		self.contraste  = bool(contraste)
+		self.combinar   = bool(combinar)
+		self.luminancia = bool(luminancia)
+		self._filtro_contraste = contraste if callable(contraste) else melhorar_contraste
+		self.threads   = _resolver_threads(threads)
+		self.planos    = self._compilar([np.asarray(kernel) for kernel in kernels])
+
+	def _compilar(self, kernels):
+		"""
+		Converte os kernels em planos de convolução, escolhendo quais sequências de
+		kernels consecutivos devem ser combinadas para minimizar o custo estimado
+		"""
+		n = len(kernels)
+		if not self.combinar:
+			return [PlanoConvolucao(kernel) for kernel in kernels]
+
+		# melhor sequência de planos (e seu custo) para os primeiros i kernels,
+		# calculada pela combinação de cada sequência kernels[j:i] em um único plano
+		melhores = [(0, [])] + [None] * n
+		for i in range(1, n + 1):
+			combinado = None
+			for j in range(i - 1, -1, -1):
+				try:
+					if combinado is None:
+						combinado = kernels[j]
+					else:
+						combinado = combinar_kernels(kernels[j], combinado)
+				except ValueError:
+					break
+
+				plano = PlanoConvolucao(combinado)
+				custo = melhores[j][0] + plano.custo + CUSTO_FIXO_CONVOLUCAO
+				if melhores[i] is None or custo < melhores[i][0]:
+					melhores[i] = (custo, melhores[j][1] + [plano])
+
+		return melhores[n][1]
+
+	@property
+	def custo(self):
+		"""
+		Custo estimado de aplicação dos kernels do pipeline, em passagens de
+		multiplicação e soma pela imagem inteira
+		"""
+		return sum(plano.custo + CUSTO_FIXO_CONVOLUCAO for plano in self.planos)
+
+	def __call__(self, imagem, espaco=None, lote=False):
+		"""
+		Aplica os filtros compilados na imagem fornecida, retornando a imagem
+		filtrada ou a própria imagem caso o pipeline não possua filtros
+
+		Os arrays intermediários e o resultado podem ser reutilizados entre chamadas
+		pelo parâmetro 'espaco' (ver a classe EspacoTrabalho), nesse caso a imagem
+		filtrada é sobrescrita na próxima chamada com o mesmo espaço de trabalho
+
+		Caso um valor verdadeiro seja passado ao parâmetro 'lote', a imagem deve ser
+		um lote de frames consecutivos (ver a função convolucao desse módulo)
+		"""
+		# aplica o filtro de contraste primeiro
+		if self.contraste:
+			imagem = self._filtro_contraste(imagem, espaco=espaco, lote=lote)
+		# converte a imagem para um único canal antes dos kernels
+		if self.luminancia:
+			imagem = converter_luminancia(imagem, espaco=espaco, lote=lote)
+
+		# aplica os kernels em sequência, alternando o resultado entre dois
+		# arrays do espaço de trabalho para não sobrescrever a entrada de cada kernel
+		for indice, plano in enumerate(self.planos):
+			saida = None
+			if espaco is not None:
+				saida = espaco.array(("pipeline", indice % 2), imagem.shape, np.uint8)
+			imagem = plano(imagem, threads=self.threads, saida=saida, espaco=espaco, lote=lote)
+		return imagem
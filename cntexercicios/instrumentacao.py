@@ -0,0 +1,251 @@
+"""
+Módulo com classes para medição do tempo gasto em cada estágio do processamento
+dos frames pelos contadores de exercícios, usando histogramas de baixo custo
+para calcular percentis de latência sem armazenar todas as medições
+"""
+
+import json
+import threading
+from time import perf_counter_ns
+
+# estágios do processamento de um frame medidos pelos contadores
+ESTAGIO_DECODIFICACAO = "decodificacao"
+ESTAGIO_FILTRAGEM     = "filtragem"
+ESTAGIO_INFERENCIA    = "inferencia"
+ESTAGIO_CONTAGEM      = "contagem"
+ESTAGIO_RENDERIZACAO  = "renderizacao"
+ESTAGIO_FRAME         = "frame"
+
+ESTAGIOS = (
+    ESTAGIO_DECODIFICACAO, ESTAGIO_FILTRAGEM, ESTAGIO_INFERENCIA,
+    ESTAGIO_CONTAGEM, ESTAGIO_RENDERIZACAO, ESTAGIO_FRAME
+)
+
+class HistogramaTempos:
+    """
+    Histograma de durações em nanossegundos com intervalos logarítmicos, cada potência
+    de dois é dividida em SUBDIVISOES intervalos, o que limita o erro relativo dos
+    percentis calculados a 1/SUBDIVISOES com custo constante por medição
+    """
+
+    # quantidade de intervalos por potência de dois (deve ser uma potência de dois)
+    SUBDIVISOES = 8
+    _BITS_SUBDIVISAO = SUBDIVISOES.bit_length() - 1
+
+    def __init__(self):
+        self.contagens  = []
+        self.quantidade = 0
+        self.total      = 0
+        self.maximo     = 0
+
+    def registrar(self, duracao):
+        """
+        Registra uma duração em nanossegundos no histograma
+        """
+        if duracao < 0:
+            duracao = 0
+
+        # índice do intervalo: expoente da potência de dois e os bits seguintes ao mais
+        # significativo, durações menores que SUBDIVISOES ficam nos primeiros intervalos
+        expoente = duracao.bit_length() - 1
+        if expoente < self._BITS_SUBDIVISAO:
+            indice = duracao
+        else:
+            deslocamento = expoente - self._BITS_SUBDIVISAO
+            indice = (deslocamento + 1) * self.SUBDIVISOES + ((duracao >> deslocamento) - self.SUBDIVISOES)
+
+        contagens = self.contagens
+        if indice >= len(contagens):
+            contagens.extend([0] * (indice + 1 - len(contagens)))
+        contagens[indice] += 1
+
+        self.quantidade += 1
+        self.total      += duracao
+        if duracao > self.maximo:
+            self.maximo = duracao
+
+    def _limite_intervalo(self, indice):
+        """
+        Retorna o limite superior (exclusivo) do intervalo com o índice fornecido
+        """
+        if indice < self.SUBDIVISOES:
+            return indice + 1
+        deslocamento = indice // self.SUBDIVISOES - 1
+        return (self.SUBDIVISOES + indice % self.SUBDIVISOES + 1) << deslocamento
+
+    def percentil(self, p):
+        """
+        Retorna uma estimativa do percentil 'p' (entre 0 e 100) das durações registradas,
+        em nanossegundos, ou None caso nenhuma duração tenha sido registrada
+        """
+        if self.quantidade == 0:
+            return None
+
+        alvo = p / 100 * self.quantidade
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                return min(self._limite_intervalo(indice), self.maximo)
+        return self.maximo
+
+    def media(self):
+        """
+        Retorna a média das durações registradas em nanossegundos, ou None
+        caso nenhuma duração tenha sido registrada
+        """
+        if self.quantidade == 0:
+            return None
+        return self.total / self.quantidade
+
+class Instrumentacao:
+    """
+    Coleta as durações de cada estágio do processamento dos frames em histogramas,
+    assim como a taxa de frames processados por segundo, a quantidade de frames
+    descartados e a quantidade de inferências puladas (frames que reutilizaram os
+    pontos do corpo do frame anterior), gerando resumos com os percentis 50, 95 e 99
+    de cada estágio
+
+    Os registros e os resumos são protegidos por uma trava, então as medições podem
+    ser registradas por várias threads ao mesmo tempo (como na contagem em estágios)
+    enquanto outra thread gera os resumos
+    """
+
+    # fator de suavização da média móvel exponencial da taxa de frames
+    SUAVIZACAO_FPS = 0.1
+
+    def __init__(self):
+        self.histogramas  = {}
+        self.frames       = 0
+        self.descartados  = 0
+        self.inferencias  = 0
+        self.puladas      = 0
+        self.fps          = 0.0
+        self.ultimas      = {}
+        self._inicio      = perf_counter_ns()
+        self._ultimo_frame = None
+        self._trava       = threading.Lock()
+
+    def registrar(self, estagio, duracao):
+        """
+        Registra a duração (em nanossegundos) de uma execução do estágio fornecido
+        """
+        with self._trava:
+            self._registrar(estagio, duracao)
+
+    def _registrar(self, estagio, duracao):
+        """
+        Registra a duração de uma execução do estágio fornecido, com a trava já adquirida
+        """
+        histograma = self.histogramas.get(estagio)
+        if histograma is None:
+            histograma = self.histogramas[estagio] = HistogramaTempos()
+        histograma.registrar(duracao)
+        self.ultimas[estagio] = duracao
+
+    def registrar_inferencia(self, pulada=False):
+        """
+        Registra a detecção dos pontos do corpo em um frame, ou o reaproveitamento
+        dos pontos do frame anterior caso um valor verdadeiro seja passado a 'pulada'
+        """
+        with self._trava:
+            self.inferencias += 1
+            if pulada:
+                self.puladas += 1
+
+    @property
+    def taxa_puladas(self):
+        """
+        Fração das inferências registradas que foram puladas
+        """
+        return self.puladas / self.inferencias if self.inferencias else 0.0
+
+    def registrar_frame(self):
+        """
+        Registra o fim do processamento de um frame, atualizando a taxa de frames
+        e a duração total do frame (tempo desde o fim do frame anterior)
+        """
+        with self._trava:
+            agora = perf_counter_ns()
+            if self._ultimo_frame is not None:
+                duracao = agora - self._ultimo_frame
+                self._registrar(ESTAGIO_FRAME, duracao)
+                if duracao > 0:
+                    fps = 1e9 / duracao
+                    self.fps += (fps - self.fps) * self.SUAVIZACAO_FPS if self.fps else fps
+            self._ultimo_frame = agora
+            self.frames += 1
+
+    def resumo(self):
+        """
+        Retorna um dicionário com o resumo das medições, contendo a quantidade de frames,
+        a taxa média de frames, os frames descartados, as inferências puladas e a fração
+        delas, e os percentis 50, 95 e 99, a média e o máximo de cada estágio em milissegundos
+        """
+        with self._trava:
+            duracao = (perf_counter_ns() - self._inicio) / 1e9
+            estagios = {}
+            for estagio, histograma in self.histogramas.items():
+                estagios[estagio] = {
+                    "amostras": histograma.quantidade,
+                    "p50_ms":   histograma.percentil(50) / 1e6,
+                    "p95_ms":   histograma.percentil(95) / 1e6,
+                    "p99_ms":   histograma.percentil(99) / 1e6,
+                    "media_ms": histograma.media() / 1e6,
+                    "max_ms":   histograma.maximo / 1e6
+                }
+
+            return {
+                "frames":      self.frames,
+                "descartados": self.descartados,
+                "puladas":     self.puladas,
+                "taxa_puladas": self.taxa_puladas,
+                "duracao_s":   duracao,
+                "fps":         self.frames / duracao if duracao > 0 else 0.0,
+                "estagios":    estagios
+            }
+
+    def texto_resumo(self):
+        """
+        Retorna o resumo das medições formatado como uma tabela de texto
+        """
+        resumo = self.resumo()
+        linhas = [
+            f"frames: {resumo['frames']}  descartados: {resumo['descartados']}  "
+            f"fps medio: {resumo['fps']:.1f}" +
+            (f"  inferencias puladas: {resumo['puladas']} ({resumo['taxa_puladas']:.0%})"
+             if resumo["puladas"] else ""),
+            f"{'estagio':<15}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}"
+        ]
+        for estagio in ESTAGIOS:
+            valores = resumo["estagios"].get(estagio)
+            if valores is not None:
+                linhas.append(
+                    f"{estagio:<15}{valores['p50_ms']:>10.2f}{valores['p95_ms']:>10.2f}"
+                    f"{valores['p99_ms']:>10.2f}{valores['max_ms']:>10.2f}"
+                )
+        return "\n".join(linhas)
+
+    def texto_overlay(self):
+        """
+        Retorna um texto curto com a taxa de frames atual e a última duração
+        de cada estágio, usado para exibir as medições sobre o vídeo
+        """
+        with self._trava:
+            linhas = [f"fps: {self.fps:.1f}"]
+            for estagio in ESTAGIOS:
+                duracao = self.ultimas.get(estagio)
+                if duracao is not None:
+                    linhas.append(f"{estagio}: {duracao / 1e6:.1f} ms")
+            if self.descartados:
+                linhas.append(f"descartados: {self.descartados}")
+            if self.puladas:
+                linhas.append(f"puladas: {self.taxa_puladas:.0%}")
+            return "\n".join(linhas)
+
+    def salvar(self, arquivo):
+        """
+        Salva o resumo das medições no formato JSON no caminho de arquivo fornecido
+        """
+        with open(arquivo, "w", encoding="utf-8") as saida:
+            json.dump(self.resumo(), saida, indent=4, ensure_ascii=False)
@@ -0,0 +1,44 @@
+"""
+Módulo com funções para converter os pontos do corpo (landmarks) detectados pelo mediapipe
+entre o formato de mensagem do protobuf (NormalizedLandmarkList) e arrays do numpy de
+dimensões (33, 4), com os valores x, y, z e visibilidade de cada ponto nessa ordem
+"""
+
+import numpy as np
+
+__all__ = ["QTD_LANDMARKS", "VALORES_LANDMARK", "landmarks_para_array", "array_para_landmarks"]
+
+# quantidade de pontos do corpo detectados pelo mediapipe e de valores por ponto
+# (x, y, z e visibilidade, nessa ordem e como fornecidos pelo mediapipe)
+QTD_LANDMARKS = 33
+VALORES_LANDMARK = 4
+
+def landmarks_para_array(pontos, saida=None):
+    """
+    Converte os pontos fornecidos no formato do mediapipe (NormalizedLandmarkList)
+    para um array de dimensões (33, 4), escrevendo os valores no array fornecido
+    pelo parâmetro "saida" caso exista, e retornando o array com os valores
+    """
+    if saida is None:
+        saida = np.empty((QTD_LANDMARKS, VALORES_LANDMARK), dtype=np.float64)
+    elif saida.shape != (QTD_LANDMARKS, VALORES_LANDMARK):
+        raise ValueError(
+            f"esperado um array de dimensões {(QTD_LANDMARKS, VALORES_LANDMARK)} "
+            f"para 'saida', recebido um array de dimensões {saida.shape}"
+        )
+
+    # NOTE: os valores de todos os pontos são lidos pelos atributos deles em
+    #       um único loop e escritos de uma vez no array fornecido
+    saida[:] = [(ponto.x, ponto.y, ponto.z, ponto.visibility) for ponto in pontos.landmark]
+    return saida
+
+def array_para_landmarks(array):
+    """
+    Converte um array de dimensões (33, 4) com os valores dos pontos
+    para o formato do mediapipe (NormalizedLandmarkList)
+    """
+    from mediapipe.framework.formats import landmark_pb2
+    pontos = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibilidade in np.asarray(array, dtype=np.float64).tolist():
+        pontos.landmark.add(x=x, y=y, z=z, visibility=visibilidade)
+    return pontos
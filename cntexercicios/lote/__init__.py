@@ -0,0 +1,146 @@
+"""
+Módulo para a contagem de exercícios em lote, sem interface gráfica, em vários
+arquivos de vídeo ao mesmo tempo utilizando um processo por núcleo do processador
+
+Cada processo cria um único detector de poses do mediapipe que é reutilizado em todos
+os vídeos contados por ele, e os resultados são retornados conforme cada vídeo termina
+de ser contado, podendo ser salvos no formato JSON Lines (um objeto JSON por linha)
+
+Também pode ser executado pela linha de comando, ver o módulo cntexercicios.lote.__main__
+"""
+
+import os
+import time
+import json
+
+__all__ = ["listar_videos", "contar_lote", "salvar_resultados"]
+
+# extensões de arquivos considerados vídeos ao listar os vídeos de uma pasta
+EXTENSOES_VIDEO = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg", ".wmv")
+
+# detector de poses do processo, criado pela função _inicializar_processo
+_pose_processo = None
+
+def listar_videos(caminhos):
+    """
+    Retorna uma lista com os caminhos dos arquivos de vídeo fornecidos pelo parâmetro
+    'caminhos', que deve ser uma sequência de caminhos de arquivos ou pastas, sendo que
+    as pastas são substituídas pelos arquivos com extensões de vídeo presentes nelas
+    (ver EXTENSOES_VIDEO), sem incluir as subpastas
+
+    Um erro do tipo FileNotFoundError é gerado caso algum caminho não exista
+    """
+    if isinstance(caminhos, str):
+        caminhos = [caminhos]
+
+    videos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for nome in sorted(os.listdir(caminho)):
+                arquivo = os.path.join(caminho, nome)
+                if os.path.isfile(arquivo) and nome.lower().endswith(EXTENSOES_VIDEO):
+                    videos.append(arquivo)
+        elif os.path.isfile(caminho):
+            videos.append(caminho)
+        else:
+            raise FileNotFoundError(f"'{caminho}' não pode ser encontrado")
+
+    return videos
+
+def _inicializar_processo():
+    """
+    Inicializa um processo de contagem, criando o detector de poses usado por ele
+    """
+    global _pose_processo
+    from cntexercicios.exercicios import ContadorExercicios
+    _pose_processo = ContadorExercicios.criar_pose()
+
+def _contar_video(exercicio, video, cache_landmarks=None):
+    """
+    Conta o exercício no vídeo fornecido usando o detector de poses do processo,
+    retornando um dicionário com o resultado da contagem e o tempo gasto
+    """
+    from cntexercicios.exercicios import instanciar_contador
+
+    # NOTE: o estado de rastreamento do detector é reiniciado para que
+    #       os pontos do vídeo anterior não sejam usados no novo vídeo
+    reiniciar = getattr(_pose_processo, "reset", None)
+    if callable(reiniciar):
+        reiniciar()
+
+    resultado = {"video": video, "exercicio": exercicio}
+    inicio = time.perf_counter()
+    try:
+        contador = instanciar_contador(
+            exercicio, video, pose=_pose_processo, cache_landmarks=cache_landmarks
+        )
+        resultado["contagem"] = contador.contar(exibir=False)
+        resultado["frames"]   = contador._frames_lidos
+        resultado["repeticoes"] = contador.tempos_repeticoes
+    except Exception as erro:
+        resultado["erro"] = f"{type(erro).__qualname__}: {erro}"
+    resultado["tempo"] = time.perf_counter() - inicio
+    return resultado
+
+def contar_lote(exercicio, videos, processos=None, cache_landmarks=None):
+    """
+    Conta o exercício fornecido pelo parâmetro 'exercicio' (um dos nomes retornados pela
+    função cntexercicios.exercicios.listar_contadores) em todos os vídeos fornecidos
+    pelo parâmetro 'videos', usando 'processos' processos (por padrão um por núcleo)
+
+    Retorna um generator que gera um dicionário por vídeo assim que a contagem dele
+    termina, com as chaves "video", "exercicio", "contagem", "frames", "repeticoes" (o tempo
+    de cada repetição contada no vídeo, em segundos) e "tempo" (em segundos), ou com a chave
+    "erro" no lugar da contagem, dos frames e das repetições caso a contagem do vídeo falhe,
+    os resultados não seguem necessariamente a ordem dos vídeos
+
+    O parâmetro 'cache_landmarks' pode ser True ou o caminho de uma pasta para armazenar
+    os pontos do corpo detectados em cada vídeo, ver a classe ContadorExercicios
+
+    Os parâmetros são verificados na chamada da função, antes que o generator seja usado
+    """
+    from cntexercicios.exercicios import listar_contadores
+
+    if exercicio not in listar_contadores():
+        raise ValueError(f"contador para o tipo de exercício '{exercicio}' não encontrado")
+    if processos is not None:
+        if not isinstance(processos, int) or isinstance(processos, bool):
+            raise TypeError(f"esperado int ou None para 'processos', recebido tipo {type(processos).__qualname__}")
+        elif processos < 1:
+            raise ValueError("'processos' deve ser um número inteiro positivo")
+
+    videos = list(videos)
+    return _gerar_resultados(exercicio, videos, processos, cache_landmarks)
+
+def _gerar_resultados(exercicio, videos, processos, cache_landmarks):
+    """
+    Generator retornado pela função contar_lote, que conta o exercício nos
+    vídeos fornecidos e gera os resultados conforme as contagens terminam
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    if not videos:
+        return
+
+    # NOTE: não é útil criar mais processos que vídeos, já que cada
+    #       processo carrega o modelo de detecção de poses
+    processos = min(processos or os.cpu_count() or 1, len(videos))
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo) as executor:
+        futuros = [
+            executor.submit(_contar_video, exercicio, video, cache_landmarks)
+            for video in videos
+        ]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+def salvar_resultados(resultados, arquivo):
+    """
+    Escreve os resultados fornecidos (dicionários gerados pela função contar_lote)
+    no arquivo de texto já aberto 'arquivo', um objeto JSON por linha, conforme
+    eles são gerados, retornando a quantidade de resultados escritos
+    """
+    quantidade = 0
+    for resultado in resultados:
+        arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        arquivo.flush()
+        quantidade += 1
+    return quantidade
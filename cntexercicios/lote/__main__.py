@@ -0,0 +1,63 @@
+"""
+Módulo para a contagem de exercícios em lote pela linha de comando, sem interface gráfica,
+aceita arquivos de vídeo e pastas contendo arquivos de vídeo como parâmetros, escrevendo
+o resultado de cada vídeo no formato JSON Lines (um objeto JSON por linha) na saída padrão
+ou no arquivo fornecido pela opção "--saida"
+
+exemplo de usagem:
+```
+user@localhost: python -m cntexercicios.lote -e polichinelos -o resultados.jsonl "Vídeos/Treinos"
+```
+"""
+
+if __name__ != "__main__":
+    raise ImportError("esse módulo não deve ser importado diretamente")
+
+# biblioteca padrão
+import sys
+
+# biblioteca do programa
+from cntexercicios.exercicios import listar_contadores
+from cntexercicios.lote import listar_videos, contar_lote, salvar_resultados
+
+# definição das opções de linha de comando
+from optparse import OptionParser
+parser = OptionParser(usage="python -m cntexercicios.lote [opções] (arquivos ou pastas de vídeo)")
+parser.add_option("-e", "--exercicio", action="store", type="string",
+    help=f"exercício a ser contado, um dos seguintes: {', '.join(listar_contadores())}")
+parser.add_option("-p", "--processos", action="store", type="int",
+    help="quantidade de processos usados na contagem (padrão: um por núcleo)")
+parser.add_option("-o", "--saida", action="store", type="string",
+    help="arquivo onde os resultados são escritos (padrão: saída padrão)")
+parser.add_option("-c", "--cache", action="store", type="string",
+    help="pasta do cache de pontos do corpo, que evita detectar os pontos novamente "
+         "em vídeos já contados")
+
+# processamento das opções da linha de comando
+opcoes, argumentos = parser.parse_args()
+if not argumentos or opcoes.exercicio is None:
+    parser.print_help()
+    exit(1)
+
+if opcoes.exercicio not in listar_contadores():
+    print(f"erro: exercício desconhecido '{opcoes.exercicio}'", file=sys.stderr)
+    exit(1)
+if opcoes.processos is not None and opcoes.processos < 1:
+    print("erro: a quantidade de processos deve ser positiva", file=sys.stderr)
+    exit(1)
+
+try:
+    videos = listar_videos(argumentos)
+except FileNotFoundError as erro:
+    print(f"erro: {erro}", file=sys.stderr)
+    exit(1)
+
+# contagem dos exercícios, escrevendo os resultados conforme são gerados
+resultados = contar_lote(
+    opcoes.exercicio, videos, processos=opcoes.processos, cache_landmarks=opcoes.cache
+)
+if opcoes.saida is None:
+    salvar_resultados(resultados, sys.stdout)
+else:
+    with open(opcoes.saida, "w", encoding="utf-8") as arquivo:
+        salvar_resultados(resultados, arquivo)
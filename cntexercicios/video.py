@@ -2,7 +2,44 @@
 Módulo com funções e classes para auxiliar a entrada de vídeo e o processamento de seus frames
 """
 
+import time
+import queue
+import threading
+
 import cv2
+import numpy as np
+
+# leitores de frames com threads associados a cada captura de vídeo (pelo id da captura),
+# que devem ser encerrados pelo ContextoVideoCapture antes de fechar a captura
+_leitores_ativos = {}
+_trava_leitores  = threading.Lock()
+
+def _registrar_leitor(video_capture, leitor):
+    """
+    Associa um leitor com thread à captura de vídeo lida por ele
+    """
+    with _trava_leitores:
+        _leitores_ativos.setdefault(id(video_capture), []).append(leitor)
+
+def _remover_leitor(video_capture, leitor):
+    """
+    Remove a associação entre o leitor e a captura de vídeo, se existir
+    """
+    with _trava_leitores:
+        leitores = _leitores_ativos.get(id(video_capture), [])
+        if leitor in leitores:
+            leitores.remove(leitor)
+        if not leitores:
+            _leitores_ativos.pop(id(video_capture), None)
+
+def _encerrar_leitores(video_capture):
+    """
+    Encerra as threads de todos os leitores associados a captura de vídeo
+    """
+    with _trava_leitores:
+        leitores = list(_leitores_ativos.get(id(video_capture), []))
+    for leitor in leitores:
+        leitor.fechar()
 
 class ContextoVideoCapture:
     """
@@ -54,8 +91,12 @@ class ContextoVideoCapture:
         aberta durante a entrada do contexto e propaga qualquer exceção gerada dentro
         do contexto.
         """
-        # fecha a captura de vídeo se ela ainda estiver aberta
+        # encerra os leitores com threads antes de fechar a captura,
+        # evitando que eles leiam de uma captura já fechada
         captura = self._captura
+        _encerrar_leitores(captura)
+
+        # fecha a captura de vídeo se ela ainda estiver aberta
         if captura.isOpened():
             captura.release()
 
@@ -70,13 +111,491 @@ def abrir_video(parametro):
     """
     return ContextoVideoCapture(parametro)
 
-def extrair_frames(video_capture, preprocessamento=None):
+def _preprocessar_frame(frame, preprocessamento):
+    """
+    Aplica a função de preprocessamento no frame caso ela seja fornecida,
+    encapsulando os erros gerados por ela em exceções do tipo RuntimeError
+    """
+    # aplica o preprocessamento se requisitado
+    if callable(preprocessamento):
+        try:
+            frame = preprocessamento(frame)
+        except Exception as erro:
+            # encapsula o erro em uma exceção RuntimeError
+            raise RuntimeError("falha ao preprocessar frame") from erro
+        if frame is None:
+            raise RuntimeError("frame não retornado pela função de preprocessamento")
+
+    return frame
+
+def _relogio_captura(video_capture):
+    """
+    Retorna uma função que fornece o tempo (em segundos) do último frame lido da captura
+    de vídeo, a posição dele no vídeo (CAP_PROP_POS_MSEC) em arquivos de vídeo ou o relógio
+    monotônico do sistema em dispositivos de captura, que não informam a quantidade de frames
+    """
+    if video_capture.get(cv2.CAP_PROP_FRAME_COUNT) > 0:
+        return lambda: video_capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+    return time.monotonic
+
+class DetectorMovimento:
+    """
+    Detector de movimento simples entre frames, que compara uma grade de pixels de cada
+    frame com a mesma grade de um frame de referência, considerando que houve movimento
+    quando ao menos a fração 'fracao' dos pixels da grade mudou mais que 'limiar' níveis
+    em algum dos canais. A comparação custa uma fração pequena do processamento de um
+    frame, já que apenas um pixel a cada 'passo' linhas e colunas é comparado.
+
+    O frame de referência só é alterado pelo método atualizar, o que faz com que
+    mudanças lentas se acumulem até serem detectadas como movimento
+    """
+
+    def __init__(self, passo=8, limiar=25, fracao=0.002):
+        # checagem de parâmetros
+        if not isinstance(passo, int) or isinstance(passo, bool) or passo < 1:
+            raise ValueError("'passo' deve ser um número inteiro positivo")
+        if not 0 <= limiar < 255:
+            raise ValueError("'limiar' deve estar no intervalo [0, 255)")
+        if not 0 <= fracao < 1:
+            raise ValueError("'fracao' deve estar no intervalo [0, 1)")
+
+        self.passo  = passo
+        self.limiar = limiar
+        self.fracao = fracao
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Descarta o frame de referência, fazendo com que o próximo frame tenha movimento
+        """
+        self._referencia = None
+
+    def _amostra(self, frame):
+        return frame[::self.passo, ::self.passo].astype(np.int16)
+
+    def atualizar(self, frame):
+        """
+        Usa o frame fornecido como o frame de referência das próximas comparações
+        """
+        self._referencia = self._amostra(frame)
+
+    def movimento(self, frame):
+        """
+        Retorna se houve movimento entre o frame de referência e o frame fornecido,
+        sempre retornando True caso não exista um frame de referência com as
+        mesmas dimensões do frame fornecido
+        """
+        referencia = self._referencia
+        amostra = self._amostra(frame)
+        if referencia is None or referencia.shape != amostra.shape:
+            return True
+
+        diferenca = np.abs(amostra - referencia, out=amostra)
+        if diferenca.ndim == 3:
+            diferenca = diferenca.max(axis=2)
+        mudancas = np.count_nonzero(diferenca > self.limiar)
+        return mudancas >= self.fracao * diferenca.size
+
+class LeitorFrames:
+    """
+    Iterador que lê os frames de uma captura de vídeo sem threads, usado pela função
+    extrair_frames, que permite pular frames sem decodificá-los pelo método pular.
+
+    A quantidade de frames já consumidos da captura (retornados ou pulados) fica
+    disponível no atributo 'posicao', e caso um valor verdadeiro seja passado ao
+    parâmetro 'com_tempo', o iterador retorna tuplas (tempo, frame) com o tempo
+    de cada frame em segundos (ver a função extrair_frames)
+    """
+
+    def __init__(self, video_capture, preprocessamento=None, com_tempo=False):
+        self._captura          = video_capture
+        self._preprocessamento = preprocessamento
+        self._relogio          = _relogio_captura(video_capture) if com_tempo else None
+        self._terminado        = False
+        self.posicao           = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Lê e retorna o próximo frame da captura de vídeo
+        """
+        if self._terminado:
+            raise StopIteration
+
+        # lê o próximo frame
+        ret, frame = self._captura.read()
+        if not ret:
+            self._terminado = True
+            raise StopIteration
+        self.posicao += 1
+
+        # retorna o frame, junto com o tempo dele caso requisitado
+        frame = _preprocessar_frame(frame, self._preprocessamento)
+        if self._relogio is not None:
+            return self._relogio(), frame
+        return frame
+
+    def pular(self, quantidade):
+        """
+        Pula a quantidade fornecida de frames pelo método VideoCapture.grab, que não
+        decodifica os frames, retornando a quantidade de frames pulados, que é menor
+        que a quantidade fornecida caso o vídeo termine
+        """
+        pulados = 0
+        while pulados < quantidade and not self._terminado:
+            if not self._captura.grab():
+                self._terminado = True
+                break
+            pulados += 1
+        self.posicao += pulados
+        return pulados
+
+def _gerar_lotes(video_capture, tamanho, preprocessamento):
+    """
+    Generator interno da função extrair_lotes, lê os frames em um array reutilizado
+    """
+    lote = None
+    quantidade = 0
+    while True:
+        # lê o próximo frame, diretamente no array do lote quando possível
+        if lote is not None and preprocessamento is None:
+            ret, frame = video_capture.read(lote[quantidade])
+        else:
+            ret, frame = video_capture.read()
+        if not ret:
+            break
+        frame = _preprocessar_frame(frame, preprocessamento)
+
+        # cria o array do lote a partir do primeiro frame
+        if lote is None:
+            lote = np.empty((tamanho, *frame.shape), dtype=frame.dtype)
+        elif frame.shape != lote.shape[1:]:
+            raise RuntimeError(
+                f"frame de dimensões {frame.shape} diferentes dos frames anteriores {lote.shape[1:]}"
+            )
+        # NOTE: a cópia é evitada quando o frame foi lido diretamente no lote
+        if not np.shares_memory(frame, lote[quantidade]):
+            lote[quantidade] = frame
+        quantidade += 1
+
+        if quantidade == tamanho:
+            yield lote
+            quantidade = 0
+
+    # retorna os frames restantes em um lote menor
+    if quantidade:
+        yield lote[:quantidade]
+
+class _LeitorThread:
+    """
+    Classe base dos leitores de frames que leem a captura de vídeo em uma thread,
+    registrando o leitor para que ele seja encerrado pelo ContextoVideoCapture
+    """
+
+    def __init__(self, video_capture, preprocessamento=None, com_tempo=False):
+        self._captura          = video_capture
+        self._preprocessamento = preprocessamento
+        self._com_tempo        = bool(com_tempo)
+        self._parar            = threading.Event()
+        self._terminado        = False
+
+        # inicia a thread de leitura
+        _registrar_leitor(video_capture, self)
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def _executar(self):
+        """
+        Função executada na thread de leitura, deve ser implementada pelas subclasses
+        """
+        raise NotImplementedError
+
+    def _descartar(self):
+        """
+        Descarta os frames lidos e ainda não retornados após o encerramento da thread
+        """
+        pass
+
+    def __iter__(self):
+        return self
+
+    def fechar(self):
+        """
+        Encerra a thread de leitura, descartando os frames ainda não retornados
+        """
+        self._terminado = True
+        self._parar.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        _remover_leitor(self._captura, self)
+        self._descartar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *ignorado):
+        self.fechar()
+
+class LeitorFramesAntecipado(_LeitorThread):
+    """
+    Iterador que lê os frames de uma captura de vídeo antecipadamente em uma thread,
+    decodificando e preprocessando os próximos frames enquanto os frames anteriores
+    são processados, armazenando-os em uma fila de tamanho limitado.
+
+    Os erros de leitura e preprocessamento são gerados pelo iterador na mesma ordem e
+    com os mesmos tipos gerados pela função extrair_frames. A thread é encerrada quando
+    o vídeo termina, quando o método fechar é chamado ou quando o ContextoVideoCapture
+    que abriu a captura é fechado.
+
+    Frames podem ser pulados pelo método pular, descartando os frames já lidos e
+    fazendo com que a thread pule os demais sem decodificá-los, e a quantidade de
+    frames já consumidos da captura até o último frame retornado fica disponível no
+    atributo 'posicao', como na classe LeitorFrames, assim como as tuplas (tempo, frame)
+    retornadas caso um valor verdadeiro seja passado ao parâmetro 'com_tempo'
+    """
+
+    # marcador do fim do vídeo na fila de frames
+    _FIM = object()
+
+    def __init__(self, video_capture, preprocessamento=None, profundidade=4, com_tempo=False):
+        """
+        Inicia a leitura antecipada dos frames da captura de vídeo fornecida pelo parâmetro
+        'video_capture', armazenando até 'profundidade' frames já lidos, opcionalmente
+        processando eles pela função fornecida pelo parâmetro 'preprocessamento' e
+        retornando o tempo de cada frame pelo parâmetro 'com_tempo' (ver a função
+        extrair_frames desse módulo)
+
+        Aviso: a captura de vídeo não deve ser lida por outras funções enquanto o leitor
+        estiver ativo, já que a leitura ocorre em outra thread
+        """
+        if not isinstance(profundidade, int) or isinstance(profundidade, bool):
+            raise TypeError(
+                f"esperado int para 'profundidade', recebido tipo {type(profundidade).__qualname__}"
+            )
+        if profundidade < 1:
+            raise ValueError("'profundidade' deve ser um número inteiro positivo")
+
+        self._fila = queue.Queue(maxsize=profundidade)
+        # NOTE: os frames são colocados na fila junto com os seus índices no vídeo,
+        #       e a thread pula sem decodificar os frames de índice menor que o alvo,
+        #       o que permite pular frames sem sincronizar as duas threads
+        self._alvo  = 0
+        self.posicao = 0
+        super().__init__(video_capture, preprocessamento, com_tempo)
+
+    def _colocar(self, item):
+        """
+        Coloca um item na fila, desistindo caso o leitor seja fechado
+        enquanto a fila estiver cheia, retorna se o item foi colocado
+        """
+        while not self._parar.is_set():
+            try:
+                self._fila.put(item, timeout=0.05)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _executar(self):
+        """
+        Função executada na thread de leitura, lê e preprocessa os frames
+        colocando eles na fila, seguidos pelo marcador de fim do vídeo ou
+        pelo erro gerado durante a leitura
+        """
+        indice = 0
+        # NOTE: o tempo do frame é lido logo após a leitura dele, já que a
+        #       posição da captura avança com a leitura dos frames seguintes
+        relogio = _relogio_captura(self._captura) if self._com_tempo else None
+        try:
+            while not self._parar.is_set():
+                # pula os frames requisitados pelo método pular
+                if indice < self._alvo:
+                    if not self._captura.grab():
+                        break
+                    indice += 1
+                    continue
+
+                ret, frame = self._captura.read()
+                if not ret:
+                    break
+
+                frame = _preprocessar_frame(frame, self._preprocessamento)
+                if relogio is not None:
+                    frame = relogio(), frame
+                if not self._colocar((indice, frame)):
+                    return
+                indice += 1
+        except Exception as erro:
+            self._colocar(erro)
+        else:
+            self._colocar(self._FIM)
+
+    def __next__(self):
+        """
+        Retorna o próximo frame lido, esperando a thread de leitura caso necessário
+        """
+        if self._terminado:
+            raise StopIteration
+
+        while True:
+            # NOTE: a espera é interrompida caso o leitor seja fechado por outra thread
+            #       (como pelo ContextoVideoCapture), que descarta os frames da fila
+            try:
+                item = self._fila.get(timeout=0.05)
+            except queue.Empty:
+                if self._parar.is_set():
+                    raise StopIteration
+                continue
+            if item is self._FIM:
+                self.fechar()
+                raise StopIteration
+            if isinstance(item, BaseException):
+                self.fechar()
+                raise item
+
+            # descarta os frames lidos antes de serem pulados
+            indice, frame = item
+            if indice >= self._alvo:
+                self._alvo = self.posicao = indice + 1
+                return frame
+
+    def pular(self, quantidade):
+        """
+        Pula a quantidade fornecida de frames após o último frame retornado, que são
+        descartados caso já tenham sido lidos ou pulados pela thread sem decodificá-los,
+        retornando a quantidade fornecida (o fim do vídeo é indicado apenas pelo
+        iterador, e o atributo 'posicao' é atualizado no próximo frame retornado)
+        """
+        self._alvo += quantidade
+        return quantidade
+
+    def _descartar(self):
+        while True:
+            try:
+                self._fila.get_nowait()
+            except queue.Empty:
+                break
+
+class LeitorFramesRecentes(_LeitorThread):
+    """
+    Iterador de baixa latência para dispositivos de captura (ex: webcams), onde uma thread
+    captura os frames continuamente com o método VideoCapture.grab e o iterador sempre
+    retorna o frame mais recente, descartando os frames capturados enquanto os frames
+    anteriores eram processados, ao invés de acumulá-los no buffer do dispositivo.
+
+    Apenas os frames retornados são decodificados, o que também ocorre na thread de captura,
+    já a função de preprocessamento é executada na thread que lê o iterador. A quantidade
+    de frames descartados fica disponível no atributo 'descartados', e caso um valor
+    verdadeiro seja passado ao parâmetro 'com_tempo', o iterador retorna tuplas
+    (tempo, frame) com o instante da captura de cada frame pelo relógio monotônico
+    do sistema (time.monotonic), em segundos.
+
+    Aviso: não deve ser usado em arquivos de vídeo, já que eles seriam lidos na velocidade
+    máxima de decodificação, descartando a maioria dos frames
+    """
+
+    def __init__(self, video_capture, preprocessamento=None, com_tempo=False):
+        """
+        Inicia a captura contínua dos frames da captura de vídeo fornecida pelo parâmetro
+        'video_capture', opcionalmente processando os frames retornados pela função
+        fornecida pelo parâmetro 'preprocessamento' (ver a função extrair_frames)
+        """
+        self.descartados = 0
+        self._condicao   = threading.Condition()
+        self._pedido     = threading.Event()
+        self._recente    = None
+        self._tempo      = None
+        self._fim        = False
+        self._erro       = None
+        super().__init__(video_capture, preprocessamento, com_tempo)
+
+    def _executar(self):
+        """
+        Função executada na thread de captura, captura os frames continuamente
+        e decodifica apenas os frames requisitados pelo iterador
+        """
+        captura = self._captura
+        try:
+            while not self._parar.is_set():
+                if not captura.grab():
+                    break
+                tempo = time.monotonic()
+
+                # NOTE: o frame é decodificado apenas se o iterador estiver esperando
+                #       por um frame, os demais são contados como descartados
+                if self._pedido.is_set():
+                    ret, frame = captura.retrieve()
+                    if not ret:
+                        break
+                    with self._condicao:
+                        self._recente = frame
+                        self._tempo   = tempo
+                        self._pedido.clear()
+                        self._condicao.notify_all()
+                else:
+                    self.descartados += 1
+        except Exception as erro:
+            self._erro = erro
+        finally:
+            with self._condicao:
+                self._fim = True
+                self._condicao.notify_all()
+
+    def __next__(self):
+        """
+        Retorna o próximo frame capturado após a chamada, esperando no
+        máximo o intervalo entre dois frames do dispositivo de captura
+        """
+        if self._terminado:
+            raise StopIteration
+
+        with self._condicao:
+            if self._recente is None:
+                self._pedido.set()
+            while self._recente is None and not self._fim and not self._parar.is_set():
+                self._condicao.wait(0.1)
+            frame, self._recente = self._recente, None
+            tempo = self._tempo
+
+        # fim da captura ou erro na thread de captura
+        if frame is None:
+            self.fechar()
+            if self._erro is not None:
+                raise self._erro
+            raise StopIteration
+
+        frame = _preprocessar_frame(frame, self._preprocessamento)
+        if self._com_tempo:
+            return tempo, frame
+        return frame
+
+    def _descartar(self):
+        self._recente = None
+
+def extrair_frames(video_capture, preprocessamento=None, antecipar=0, com_tempo=False):
     """
     Lê e retorna os frames do vídeo dado pelo parâmetro "video_capture"
-    em forma de generator, opcionalmente processando cada um deles usando
+    em forma de iterador, opcionalmente processando cada um deles usando
     uma função, se fornecida, pelo parâmetro "preprocessamento", que deve
     aceitar um frame e retornar o frame processado.
 
+    Caso um número positivo seja fornecido pelo parâmetro "antecipar", os frames
+    são lidos e preprocessados antecipadamente em uma thread, que armazena até essa
+    quantidade de frames, retornando um iterador do tipo LeitorFramesAntecipado.
+    Isso permite que a decodificação do vídeo ocorra ao mesmo tempo que o
+    processamento dos frames já lidos. Caso contrário um iterador do tipo LeitorFrames
+    é retornado. Ambos permitem pular frames sem decodificá-los pelo método pular.
+
+    Caso um valor verdadeiro seja passado ao parâmetro "com_tempo", o iterador retorna
+    tuplas (tempo, frame) com o tempo de cada frame em segundos, que em arquivos de vídeo
+    é a posição do frame no vídeo (CAP_PROP_POS_MSEC) e em dispositivos de captura é
+    o instante da leitura pelo relógio monotônico do sistema (time.monotonic). Isso permite
+    que o processamento dos frames dependa do tempo entre eles e não da quantidade de
+    frames, que muda quando frames são pulados ou descartados ou quando a taxa de
+    frames do vídeo varia
+
     Aviso: tanto o frame retornado quanto o frame passado para a função de
     preprocessamento NÃO DEVEM SER MODIFICADOS, essa restrição está descrita
     na documentação da função VideoCapture.read do pyopencv e opencv-python
@@ -85,22 +604,47 @@ def extrair_frames(video_capture, preprocessamento=None):
     Aviso: não fecha automaticamente o vídeo fornecido,
     isso deve ser feito após a função caso for necessário
     """
-    while True:
-        # lê o próximo frame
-        ret, frame = video_capture.read()
-        if not ret:
-            break
+    if antecipar:
+        return LeitorFramesAntecipado(
+            video_capture, preprocessamento, profundidade=antecipar, com_tempo=com_tempo
+        )
+    return LeitorFrames(video_capture, preprocessamento, com_tempo=com_tempo)
 
-        # aplica o preprocessamento se requisitado
-        if callable(preprocessamento):
-            try:
-                frame = preprocessamento(frame)
-            except Exception as erro:
-                # encapsula o erro em uma exceção RuntimeError
-                raise RuntimeError("falha ao preprocessar frame") from erro
-            if frame is None:
-                raise RuntimeError("frame não retornado pela função de preprocessamento")
+def extrair_lotes(video_capture, tamanho=16, preprocessamento=None):
+    """
+    Lê e retorna os frames do vídeo dado pelo parâmetro "video_capture" em lotes
+    de até "tamanho" frames consecutivos em forma de generator, cada lote sendo um
+    array de dimensões (N, altura, largura, canais), que pode ser filtrado de uma vez
+    pelas funções do módulo cntexercicios.filtros com o parâmetro "lote". Todos os
+    lotes tem "tamanho" frames, exceto o último lote, que pode ter menos frames.
+
+    O parâmetro "preprocessamento" tem o mesmo comportamento que na função
+    extrair_frames, mas todos os frames preprocessados devem ter as mesmas dimensões,
+    caso contrário um erro do tipo RuntimeError é gerado.
 
-        # retorna o frame
-        yield frame
+    Os frames são escritos diretamente em um único array reutilizado por todos os lotes,
+    evitando alocações por frame, então cada lote é sobrescrito pelo lote seguinte e
+    deve ser copiado caso precise ser mantido. Diferentemente dos frames retornados pela
+    função extrair_frames, os lotes podem ser modificados.
 
+    Aviso: não fecha automaticamente o vídeo fornecido,
+    isso deve ser feito após a função caso for necessário
+    """
+    if not isinstance(tamanho, int) or isinstance(tamanho, bool):
+        raise TypeError(f"esperado int para 'tamanho', recebido tipo {type(tamanho).__qualname__}")
+    if tamanho < 1:
+        raise ValueError("'tamanho' deve ser um número inteiro positivo")
+    return _gerar_lotes(video_capture, tamanho, preprocessamento)
+
+def extrair_frames_recentes(video_capture, preprocessamento=None, com_tempo=False):
+    """
+    Retorna um iterador do tipo LeitorFramesRecentes que sempre retorna o frame mais
+    recente do dispositivo de captura fornecido pelo parâmetro "video_capture",
+    descartando os frames capturados enquanto os frames anteriores são processados,
+    o que mantém o atraso entre a captura e o processamento limitado mesmo que
+    o processamento seja mais lento que a taxa de quadros do dispositivo.
+
+    Os parâmetros "preprocessamento" e "com_tempo" têm o mesmo comportamento que na
+    função extrair_frames, e os mesmos avisos se aplicam aos frames retornados.
+    """
+    return LeitorFramesRecentes(video_capture, preprocessamento, com_tempo=com_tempo)
@@ -16,7 +16,9 @@ setup(
         "cntexercicios",
         "cntexercicios.exercicios",
         "cntexercicios.exercicios.flexoes",
-        "cntexercicios.exercicios.polichinelos"
+        "cntexercicios.exercicios.polichinelos",
+        "cntexercicios.lote",
+        "cntexercicios.cameras"
     ]
 )
 
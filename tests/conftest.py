@@ -0,0 +1,31 @@
+"""
+Fixtures compartilhadas pelos testes que contam o vídeo de exemplo
+"""
+
+import os
+
+import pytest
+
+VIDEO_POLICHINELOS = os.path.join(os.path.dirname(__file__), "..", "videos", "polichinelos.mp4")
+
+@pytest.fixture(scope="session")
+def video_polichinelos():
+    """
+    Caminho do vídeo de exemplo, pulando o teste caso ele ou o mediapipe não estejam disponíveis
+    """
+    pytest.importorskip("mediapipe")
+    if not os.path.isfile(VIDEO_POLICHINELOS):
+        pytest.skip("vídeo de exemplo não encontrado")
+    return VIDEO_POLICHINELOS
+
+@pytest.fixture(scope="session")
+def cache_todos_frames(video_polichinelos, tmp_path_factory):
+    """
+    Conta o vídeo de exemplo detectando os pontos do corpo em todos os frames, retornando
+    a contagem e a pasta do cache com os pontos detectados, usada para contar o vídeo com
+    outros limiares sem detectar os pontos novamente
+    """
+    from cntexercicios.exercicios import instanciar_contador
+    pasta = str(tmp_path_factory.mktemp("cache"))
+    contador = instanciar_contador("polichinelos", video_polichinelos, cache_landmarks=pasta)
+    return contador.contar(exibir=False), pasta
@@ -0,0 +1,160 @@
+"""
+Testes do agendamento da detecção dos pontos do corpo do módulo cntexercicios.agendamento
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from cntexercicios.agendamento import ConfigAgendamento, AgendadorInferencia
+from cntexercicios.configuracao import ConfigFiltros
+
+VIDEO_POLICHINELOS = os.path.join(os.path.dirname(__file__), "..", "videos", "polichinelos.mp4")
+
+def test_heuristicas_desativadas_por_padrao():
+    config = ConfigAgendamento()
+    assert not (config.controle_movimento or config.amostragem_adaptativa or config.roi_inferencia)
+    assert config.configuracao() == {"movimento": None, "amostragem": None, "roi": None}
+
+def test_agendador_desativado_detecta_todos_os_frames():
+    agendador = AgendadorInferencia()
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    for indice in range(10):
+        agendador.atualizar_tempo(indice + 1, indice / 30)
+        assert not agendador.pular(frame, lambda: [(0.5, 0.5)])
+        assert agendador.intervalo(indice + 1, [(0.5, 0.5)], [[0.0, 1.0, 2.0, 3.0]], indice / 30) == 1
+    assert agendador.recortar(frame) is frame
+    assert agendador.roi_frame is None
+
+def test_controle_movimento_perto_dos_limiares():
+    agendador = AgendadorInferencia(ConfigAgendamento(controle_movimento=True))
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    # o primeiro frame não tem referência, e frames iguais só são pulados longe dos limiares
+    assert not agendador.pular(frame, lambda: [(0.5, 0.5)])
+    assert agendador.pular(frame, lambda: [(0.5, 0.5)])
+    assert not agendador.pular(frame, lambda: [(0.3, 0.05)])
+    assert not agendador.pular(frame, lambda: [None])
+    # contadores com progresso inválido são ignorados quando outro contador tem progresso válido
+    assert agendador.pular(frame, lambda: [None, (0.5, 0.5)])
+    assert not agendador.pular(frame, lambda: [(0.3, 0.05), (0.5, 0.5)])
+
+def _agendador_amostragem(frames=31, fps=30):
+    """
+    Cria um agendador com a amostragem adaptativa e o tempo médio entre os frames estimado
+    """
+    agendador = AgendadorInferencia(ConfigAgendamento(amostragem_adaptativa=True))
+    for indice in range(frames):
+        agendador.atualizar_tempo(indice + 1, indice / fps)
+    return agendador
+
+def test_amostragem_pelo_periodo_das_repeticoes():
+    agendador = _agendador_amostragem()
+    repeticoes = [[0.0, 0.4, 0.8]]
+    # sem a variação do progresso medida todos os frames são detectados
+    assert agendador.intervalo(31, [(0.80, 0.55)], repeticoes, 1.0) == 1
+    # período de 12 frames, detectado AMOSTRAS_REPETICAO vezes por repetição
+    assert agendador.intervalo(32, [(0.79, 0.54)], repeticoes, 1.0) == 2
+    assert agendador.intervalo(33, [None], repeticoes, 1.0) == 1
+    # uma repetição atrasada volta a detectar os pontos em todos os frames
+    assert agendador.intervalo(34, [(0.79, 0.54)], repeticoes, 2.0) == 1
+
+def test_amostragem_limitada_pela_variacao_do_progresso():
+    agendador = _agendador_amostragem()
+    repeticoes = [[0.0, 1.0, 2.0]]
+    # período de 30 frames, mas com o progresso variando 0.05 por frame o limiar pode ser
+    # alcançado em 0.35 / 0.05 frames, e a margem exige o dobro da variação por frame
+    assert agendador.intervalo(31, [(0.65, 0.40)], repeticoes, 2.1) == 1
+    assert agendador.intervalo(32, [(0.60, 0.35)], repeticoes, 2.1) == 3
+    assert agendador.intervalo(33, [(0.56, 0.31)], repeticoes, 2.1) == 3
+    assert agendador.intervalo(34, [(0.30, 0.05)], repeticoes, 2.1) == 1
+    # o menor intervalo entre os contadores com progresso válido é usado
+    assert agendador.intervalo(35, [(0.30, 0.05), None], repeticoes * 2, 2.1) == 1
+
+def test_recorte_da_regiao_de_interesse():
+    agendador = AgendadorInferencia(ConfigAgendamento(roi_inferencia=True))
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    landmarks = np.zeros((33, 4))
+    landmarks[:, 0] = np.linspace(0.4, 0.6, 33)
+    landmarks[:, 1] = 1 - np.linspace(0.3, 0.7, 33)
+    landmarks[:, 3] = 1
+    agendador.atualizar_roi(landmarks, True, 200, 100)
+    recorte = agendador.recortar(frame, passo=2)
+    assert recorte.base is frame
+    assert recorte.shape[0] % 2 == 0 and recorte.shape[1] % 2 == 0
+    x, y, largura, altura = agendador.roi_frame
+    assert x < 0.4 and x + largura > 0.6 and y < 0.3 and y + altura > 0.7
+
+    # pontos pouco visíveis descartam a região
+    landmarks[:, 3] = 0.1
+    agendador.atualizar_roi(landmarks, True, 200, 100)
+    assert agendador.recortar(frame) is frame
+
+def test_agendador_suspenso_detecta_todos_os_frames():
+    agendador = AgendadorInferencia(ConfigAgendamento(True, True, True))
+    assert agendador.ativo
+    agendador.suspenso = True
+    assert not agendador.ativo
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    landmarks = np.full((33, 4), 0.5)
+    for indice in range(10):
+        agendador.atualizar_tempo(indice + 1, indice / 30)
+        assert not agendador.pular(frame, lambda: [(0.5, 0.5)])
+        assert agendador.intervalo(indice + 1, [(0.5, 0.5)], [[0.0, 0.1, 0.2]], indice / 30) == 1
+        agendador.atualizar_roi(landmarks, True, 64, 48)
+        assert agendador.recortar(frame) is frame
+
+def _contar_polichinelos(**kwargs):
+    """
+    Conta os polichinelos do vídeo de exemplo sem janela com os parâmetros fornecidos
+    """
+    from cntexercicios.exercicios import instanciar_contador
+    contador = instanciar_contador("polichinelos", VIDEO_POLICHINELOS, **kwargs)
+    return contador.contar(exibir=False)
+
+@pytest.mark.parametrize("parametros", [
+    {"agendamento": ConfigAgendamento(controle_movimento=True)},
+    {"agendamento": ConfigAgendamento(amostragem_adaptativa=True)},
+    {"agendamento": ConfigAgendamento(roi_inferencia=True)},
+    {"filtros": ConfigFiltros(resolucao_inferencia=640)},
+    {"agendamento": True, "filtros": ConfigFiltros(resolucao_inferencia=640)},
+], ids=["movimento", "amostragem", "roi", "resolucao", "todas"])
+def test_heuristicas_mantem_contagem_do_video(cache_todos_frames, parametros):
+    contagem, _ = cache_todos_frames
+    assert contagem == 20
+    assert _contar_polichinelos(**parametros) == contagem
+
+@pytest.mark.parametrize("limiares", [(0.15, 0.85), (0.2, 0.8)])
+def test_amostragem_mantem_contagem_com_outros_limiares(cache_todos_frames, limiares, monkeypatch):
+    from cntexercicios.exercicios import buscar_contador
+    classe = buscar_contador("polichinelos")
+    monkeypatch.setattr(classe, "LIMIAR_EXERCICIO_MIN", limiares[0])
+    monkeypatch.setattr(classe, "LIMIAR_EXERCICIO_MAX", limiares[1])
+    # a contagem com todos os frames é refeita pelos pontos armazenados no cache
+    _, pasta = cache_todos_frames
+    esperado = _contar_polichinelos(cache_landmarks=pasta)
+    assert _contar_polichinelos(agendamento=ConfigAgendamento(amostragem_adaptativa=True)) == esperado
+
+def test_cache_gravado_sem_heuristicas(cache_todos_frames, tmp_path, monkeypatch):
+    # os pontos são gravados no cache com o agendamento suspenso, então a contagem com
+    # outros limiares pelo cache é igual à contagem com todos os frames
+    pasta = str(tmp_path)
+    contagem, pasta_todos_frames = cache_todos_frames
+    assert _contar_polichinelos(agendamento=True, cache_landmarks=pasta) == contagem
+
+    from cntexercicios.exercicios import buscar_contador
+    classe = buscar_contador("polichinelos")
+    monkeypatch.setattr(classe, "LIMIAR_EXERCICIO_MIN", 0.15)
+    monkeypatch.setattr(classe, "LIMIAR_EXERCICIO_MAX", 0.85)
+    esperado = _contar_polichinelos(cache_landmarks=pasta_todos_frames)
+    assert _contar_polichinelos(agendamento=True, cache_landmarks=pasta) == esperado
+
+def test_chave_do_cache_com_agendamento_ativo():
+    pytest.importorskip("mediapipe")
+    from cntexercicios.exercicios import instanciar_contador
+    contador = instanciar_contador("polichinelos", "video.mp4", pose=object(), agendamento=True)
+    configuracao = contador._configuracao_deteccao()
+    assert configuracao["agendamento"] == contador._agendador.configuracao()
+    assert configuracao["limiares"] == [["polichinelos", contador.LIMIAR_EXERCICIO_MIN, contador.LIMIAR_EXERCICIO_MAX]]
+    contador._agendador.suspenso = True
+    assert "agendamento" not in contador._configuracao_deteccao()
@@ -0,0 +1,110 @@
+"""
+Testes da contagem em vários vídeos do módulo cntexercicios.cameras
+"""
+
+import time
+import threading
+
+from cntexercicios import estagios
+from cntexercicios.cameras import ContagemCameras, _Escalonador, _Fluxo
+
+class _ContadorFalso:
+    """
+    Contador falso que registra os frames processados, o detector de poses e a thread
+    usados em cada um deles e a maior quantidade de threads processando o vídeo ao mesmo tempo
+    """
+
+    def __init__(self, registro, duracao=0.0):
+        self._baixa_latencia = False
+        self.registro   = registro
+        self.duracao    = duracao
+        self.frames     = []
+        self.ativos     = 0
+        self.max_ativos = 0
+        self._trava     = threading.Lock()
+
+    def processar_frame(self, tempo, frame, pose=None, descartados=0):
+        with self._trava:
+            self.ativos += 1
+            self.max_ativos = max(self.max_ativos, self.ativos)
+        time.sleep(self.duracao)
+        self.frames.append(frame)
+        self.registro.append((self, frame, pose, threading.current_thread().name))
+        with self._trava:
+            self.ativos -= 1
+
+    def _estado_janela(self):
+        return None
+
+def _processar_fluxos(quantidades, trabalhadores, duracao=0.0):
+    """
+    Processa os frames de fluxos falsos com as quantidades de frames fornecidas, já colocados
+    nas filas, pelas threads de trabalho da contagem em vários vídeos, cada uma com o seu
+    próprio detector de poses, retornando os contadores, os detectores e o registro dos frames
+    """
+    parar = threading.Event()
+    fluxos, registro = [], []
+    escalonador = _Escalonador(fluxos, parar)
+    for quantidade in quantidades:
+        fluxo = _Fluxo(_ContadorFalso(registro, duracao), quantidade + 1, parar, escalonador)
+        for indice in range(quantidade):
+            fluxo.fila.colocar((indice / 30, indice))
+        fluxo.fila.colocar(estagios.FIM)
+        fluxos.append(fluxo)
+
+    poses = [object() for _ in range(trabalhadores)]
+    threads = [
+        threading.Thread(target=ContagemCameras._trabalhar, args=(escalonador, pose), name=f"trabalho-{indice}")
+        for indice, pose in enumerate(poses)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert escalonador.terminado()
+    assert all(fluxo.erro is None and fluxo.versao == quantidade for fluxo, quantidade in zip(fluxos, quantidades))
+    return [fluxo.contador for fluxo in fluxos], poses, registro
+
+def test_escalonador_em_ordem_circular():
+    contadores, poses, registro = _processar_fluxos([4, 2, 3], trabalhadores=1)
+    # após ter um frame processado, o vídeo só é atendido novamente depois dos outros
+    # vídeos com frames disponíveis, até que os vídeos terminem
+    ordem = [(contadores.index(contador), frame) for contador, frame, _, _ in registro]
+    assert ordem == [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (2, 2), (0, 3)]
+    assert all(pose is poses[0] for _, _, pose, _ in registro)
+
+def test_escalonador_uma_thread_por_video():
+    quantidades = [20, 15, 10]
+    contadores, poses, registro = _processar_fluxos(quantidades, trabalhadores=4, duracao=0.002)
+    for contador, quantidade in zip(contadores, quantidades):
+        # os frames de cada vídeo são processados em ordem, por no máximo uma thread por vez
+        assert contador.frames == list(range(quantidade))
+        assert contador.max_ativos == 1
+    # cada thread de trabalho usa o seu detector de poses em todos os vídeos
+    poses_threads = {}
+    for _, _, pose, nome in registro:
+        assert poses_threads.setdefault(nome, pose) is pose
+    assert len(set(map(id, poses_threads.values()))) == len(poses_threads) > 1
+    assert all(any(pose is outra for outra in poses) for pose in poses_threads.values())
+
+def test_detectores_compartilhados_entre_os_videos(monkeypatch):
+    criados = []
+
+    def criar_pose():
+        criados.append(object())
+        return criados[-1]
+
+    monkeypatch.setattr(ContagemCameras, "criar_pose_compartilhada", staticmethod(criar_pose))
+    cameras = ContagemCameras("polichinelos", ["a.mp4", "b.mp4", "c.mp4"], trabalhadores=2, compartilhar_poses=True)
+    # um detector por thread de trabalho, e os contadores não criam os seus próprios
+    assert cameras._poses == criados and len(criados) == 2
+    assert all(contador._pose is criados[0] for contador in cameras.contadores)
+
+def test_contagem_de_dois_videos_igual_contagem_individual(cache_todos_frames, video_polichinelos):
+    contagem, _ = cache_todos_frames
+    cameras = ContagemCameras("polichinelos", [video_polichinelos, video_polichinelos], trabalhadores=2)
+    assert cameras.contar(exibir=False) == [contagem, contagem]
+    resultados = cameras.resultados()
+    assert all("erro" not in resultado for resultado in resultados)
+    assert resultados[0]["frames"] == resultados[1]["frames"] > 0
@@ -0,0 +1,220 @@
+"""
+Testes da contagem dos exercícios pelos contadores do módulo cntexercicios.exercicios
+"""
+
+import io
+import contextlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cntexercicios.exercicios import buscar_contador
+
+Polichinelos = buscar_contador("polichinelos")
+
+def _contar_sequencial(classe, progresso, valido, tempos=None, debounce=0.0, estado=False):
+    """
+    Conta os exercícios frame a frame com a mesma máquina de estados do método
+    _contar_exercicio, retornando a contagem e o estado final
+    """
+    contagem, ultima = 0, None
+    for indice, (valor, ok) in enumerate(zip(progresso, valido)):
+        if not ok:
+            continue
+        if not estado and valor < classe.LIMIAR_EXERCICIO_MIN:
+            estado = True
+            tempo = None if tempos is None else tempos[indice]
+            if tempo is None or ultima is None or tempo - ultima >= debounce:
+                contagem += 1
+                ultima = tempo
+        elif estado and valor > classe.LIMIAR_EXERCICIO_MAX:
+            estado = False
+    return contagem, estado
+
+@pytest.mark.parametrize("semente", range(5))
+@pytest.mark.parametrize("estado_inicial", [False, True])
+@pytest.mark.parametrize("debounce", [0.0, 0.3])
+def test_contar_serie_igual_contagem_sequencial(semente, estado_inicial, debounce):
+    gerador = np.random.default_rng(semente)
+    progresso = gerador.random(500)
+    valido = gerador.random(500) > 0.1
+    tempos = np.cumsum(gerador.uniform(0.01, 0.1, 500))
+
+    contagem, acumulada, estado = Polichinelos.contar_serie(
+        progresso, valido, estado_inicial=estado_inicial, tempos=tempos, debounce=debounce
+    )
+    assert (contagem, estado) == _contar_sequencial(
+        Polichinelos, progresso, valido, tempos, debounce, estado_inicial
+    )
+    assert acumulada[-1] == contagem
+
+def test_contar_serie_sem_eventos_mantem_estado():
+    progresso = np.full(10, 0.5)
+    valido = np.ones(10, dtype=bool)
+    assert Polichinelos.contar_serie(progresso, valido, estado_inicial=True)[2] is True
+    assert Polichinelos.contar_serie(progresso, valido)[2] is False
+
+def test_espacos_de_trabalho_mantidos_por_resolucao():
+    contador = Polichinelos("video.mp4", pose=object())
+    inteiro = np.zeros((120, 160, 3), dtype=np.uint8)
+    contador._aplicar_filtros(inteiro)
+    espaco_inteiro = contador._espaco_filtros
+    contador._aplicar_filtros(inteiro[:60, :80])
+    assert contador._espaco_filtros is not espaco_inteiro
+    # voltar à resolução anterior reutiliza os arrays de trabalho dela
+    contador._aplicar_filtros(inteiro)
+    assert contador._espaco_filtros is espaco_inteiro
+    # apenas os espaços das últimas ESPACOS_FILTROS resoluções são mantidos
+    for largura in range(1, contador.ESPACOS_FILTROS + 1):
+        contador._aplicar_filtros(inteiro[:, :10 * largura])
+    espacos = list(contador._espacos_filtros.values())
+    assert len(espacos) == contador.ESPACOS_FILTROS and espaco_inteiro not in espacos
+
+def test_configuracoes_da_captura_e_dos_filtros():
+    from cntexercicios.configuracao import ConfigCaptura, ConfigFiltros
+    # as opções mantidas como None dependem do tipo do vídeo
+    arquivo = Polichinelos("video.mp4", pose=object())
+    camera = Polichinelos(0, pose=object())
+    assert (arquivo._antecipar, arquivo._baixa_latencia) == (ConfigCaptura.FRAMES_ANTECIPADOS, False)
+    assert (camera._antecipar, camera._baixa_latencia) == (0, True)
+    assert arquivo._detector_ocioso is None and camera._detector_ocioso is not None
+
+    contador = Polichinelos(
+        0, pose=object(), captura=ConfigCaptura(antecipar_frames=2, baixa_latencia=False, modo_ocioso=False),
+        filtros=ConfigFiltros(resolucao_inferencia=320, threads=2, bordas_luminancia=True)
+    )
+    assert (contador._antecipar, contador._baixa_latencia, contador._detector_ocioso) == (2, False, None)
+    assert (contador._resolucao_inferencia, contador._threads_filtros, contador._bordas_luminancia) == (320, 2, True)
+
+    with pytest.raises(TypeError):
+        ConfigCaptura(antecipar_frames=True)
+    with pytest.raises(ValueError):
+        ConfigFiltros(resolucao_inferencia=-1)
+    with pytest.raises(TypeError):
+        Polichinelos("video.mp4", pose=object(), filtros=ConfigCaptura())
+
+class _PoseFalsa:
+    """
+    Detector de poses que nunca encontra um corpo, contando os frames processados
+    """
+
+    def __init__(self):
+        self.frames = 0
+
+    def process(self, imagem):
+        self.frames += 1
+        return SimpleNamespace(pose_landmarks=None)
+
+def test_processamento_de_frames_fornecidos():
+    pose, outra_pose = _PoseFalsa(), _PoseFalsa()
+    contador = Polichinelos("video.mp4", pose=pose)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    contador.iniciar_contagem()
+    for indice in range(3):
+        contador.processar_frame(indice / 30, frame)
+    contador.processar_frame(0.1, frame, pose=outra_pose, descartados=2)
+    assert (pose.frames, outra_pose.frames) == (3, 1)
+    assert contador._frames_lidos == 4 and contador._contagem == 0
+    assert contador.instrumentacao.descartados == 2
+
+    # uma nova contagem reinicia as medições
+    contador.iniciar_contagem()
+    assert contador.instrumentacao.descartados == 0
+
+def test_preprocessamento_usa_copia_da_configuracao_dos_filtros():
+    contador = Polichinelos("video.mp4", pose=object())
+    frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    filtros = contador._estado_filtros()
+    # alterações feitas pela thread da janela não afetam a cópia enviada ao preprocessamento
+    contador._filtros_ativos[contador.FILTRO_GAUSS_IDX] = True
+    contador._mostrar_filtro = True
+    _, _, filtrado, _, _, _, configuracao = contador._preprocessar_frame(frame, 0.0, filtros)
+    assert configuracao == filtros[0] != contador._configuracao_filtros()
+    assert np.array_equal(filtrado, frame)
+
+def test_contagem_em_estagios_igual_contagem_sequencial(cache_todos_frames, video_polichinelos):
+    from cntexercicios.configuracao import ConfigCaptura
+    contagem, _ = cache_todos_frames
+    contador = Polichinelos(video_polichinelos, captura=ConfigCaptura(estagios=True))
+    assert contador.contar(exibir=False) == contagem
+    assert contador.instrumentacao.frames == contador._frames_lidos
+    assert contador.instrumentacao.resumo()["estagios"].keys() >= {"filtragem", "inferencia", "contagem"}
+
+def test_contagem_multipla_igual_contagens_individuais(cache_todos_frames, video_polichinelos):
+    from cntexercicios.exercicios import ContagemMultipla, instanciar_contador
+    contagem, _ = cache_todos_frames
+    # cada exercício contado com os pontos detectados uma única vez por frame tem a
+    # mesma contagem de um contador independente com o seu próprio detector de poses
+    esperado = {
+        "polichinelos": contagem,
+        "flexões": instanciar_contador("flexões", video_polichinelos).contar(exibir=False),
+    }
+    multipla = ContagemMultipla(video_polichinelos, ["polichinelos", "flexões"])
+    assert multipla.contar(exibir=False) == esperado
+    assert all(contador._frames_lidos == multipla.contadores["polichinelos"]._frames_lidos
+               for contador in multipla.contadores.values())
+
+@pytest.mark.parametrize("exercicio", ["polichinelos", "flexões"])
+def test_progresso_vetorizado_igual_progresso_por_frame(cache_todos_frames, video_polichinelos, exercicio):
+    from cntexercicios.cache_landmarks import CacheLandmarks
+    from cntexercicios.exercicios import instanciar_contador
+    _, pasta = cache_todos_frames
+    # os pontos foram gravados pelo contador de polichinelos, com a configuração dele
+    configuracao = Polichinelos(video_polichinelos, pose=object())._configuracao_deteccao()
+    registro = CacheLandmarks(pasta).carregar(CacheLandmarks.chave(video_polichinelos, configuracao))
+    assert registro is not None and len(registro) > 0
+
+    contador = instanciar_contador(exercicio, video_polichinelos, pose=object())
+    progresso, valido = contador.calcular_progresso_serie(registro.landmarks)
+    assert progresso.shape == valido.shape == (len(registro),)
+    for indice in range(len(registro)):
+        contador._carregar_landmarks(registro.landmarks[indice])
+        if not contador._detectado:
+            assert not valido[indice]
+            continue
+        # o progresso é o mesmo, exceto por erros de arredondamento da ordem das operações
+        progresso_frame, valido_frame = contador._calc_progresso_exercicio()
+        assert bool(valido_frame) == bool(valido[indice])
+        assert np.isclose(progresso_frame, progresso[indice], rtol=0, atol=1e-12, equal_nan=True)
+
+def test_frame_pausado_filtrado_apenas_quando_os_filtros_mudam(tmp_path, monkeypatch):
+    import cv2
+    caminho = str(tmp_path / "frames.avi")
+    escritor = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    if not escritor.isOpened():
+        pytest.skip("codificador MJPG indisponível")
+    for indice in range(12):
+        escritor.write(np.full((48, 64, 3), indice * 20, dtype=np.uint8))
+    escritor.release()
+
+    # teclas pressionadas após a renderização de cada iteração: o vídeo é pausado
+    # no quarto frame, o filtro gaussiano é ativado durante a pausa e o vídeo continua
+    teclas = iter([-1, -1, -1, ord("p"), -1, -1, ord("g"), -1, ord("p")])
+    renderizados = []
+    monkeypatch.setattr(cv2, "waitKey", lambda atraso: next(teclas, -1))
+    monkeypatch.setattr(cv2, "imshow", lambda titulo, frame: renderizados.append(frame.copy()))
+    monkeypatch.setattr(cv2, "getWindowProperty", lambda titulo, propriedade: 1)
+
+    pose = _PoseFalsa()
+    contador = Polichinelos(caminho, pose=pose)
+    filtrados = []
+    aplicar_filtros = contador._aplicar_filtros
+
+    def registrar_filtros(frame, *args, **kwargs):
+        filtrados.append((contador._id_frame, contador._configuracao_filtros()))
+        return aplicar_filtros(frame, *args, **kwargs)
+
+    contador._aplicar_filtros = registrar_filtros
+    contador.iniciar_contagem()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert contador._contar_frames(exibir=True)
+
+    # cada frame é filtrado uma vez, e o frame pausado é filtrado novamente
+    # (sem detectar os pontos de novo) apenas após a mudança dos filtros
+    assert contador._frames_lidos == 12 and pose.frames == 12
+    ids = [id_frame for id_frame, _ in filtrados]
+    assert ids[4] == ids[3] and ids[:4] + ids[5:] == list(range(ids[0], ids[0] + 12))
+    assert filtrados[3][1] != filtrados[4][1] == filtrados[5][1]
+    # a janela é renderizada novamente apenas ao pausar e ao mudar os filtros
+    assert len(renderizados) == 12 + 2
@@ -0,0 +1,332 @@
+"""
+Testes das funções de filtragem e convolução do módulo cntexercicios.filtros
+"""
+
+import numpy as np
+import pytest
+
+from cntexercicios import filtros
+
+def _imagem(dimensoes=(97, 131, 3), semente=0):
+    """
+    Gera uma imagem aleatória do tipo uint8 com as dimensões fornecidas
+    """
+    return np.random.default_rng(semente).integers(0, 256, dimensoes, dtype=np.uint8)
+
+KERNELS = {
+    "gauss_3":          filtros.kernel_gauss(3),
+    "gauss_9":          filtros.kernel_gauss(9, sigma=2),
+    "gauss_15":         filtros.kernel_gauss(15, sigma=3),
+    "nitidez":          filtros.kernel_nitidez(peso=0.5),
+    "bordas":           filtros.kernel_deteccao_borda(),
+    "inteiro_5x5":      np.random.default_rng(1).integers(-3, 4, (5, 5)),
+    "separavel_inteiro": np.outer([1, 4, 6, 4, 1, 2, 1], [-1, 2, 3, 2, 1, 1, 1])
+}
+
+@pytest.mark.parametrize("nome", KERNELS)
+@pytest.mark.parametrize("threads", [1, 3])
+def test_estrategia_automatica_igual_convolucao_direta(nome, threads):
+    kernel = KERNELS[nome]
+    imagem = _imagem()
+    plano  = filtros.PlanoConvolucao(kernel)
+    direta = filtros.convolucao(imagem, kernel, estrategia=filtros.ESTRATEGIA_DIRETA)
+    assert np.array_equal(plano(imagem, threads=threads), direta)
+
+def test_kernels_de_floats_nao_diadicos_usam_convolucao_direta():
+    for kernel in (filtros.kernel_nitidez(peso=0.3), np.full((9, 9), 0.1)):
+        plano = filtros.PlanoConvolucao(kernel)
+        assert plano.denominador is None
+        assert plano.estrategia == filtros.ESTRATEGIA_DIRETA
+
+def test_kernels_gauss_usam_estrategias_exatas():
+    assert filtros.PlanoConvolucao(KERNELS["gauss_3"]).estrategia == filtros.ESTRATEGIA_SEPARAVEL
+    assert filtros.PlanoConvolucao(KERNELS["gauss_15"]).estrategia == filtros.ESTRATEGIA_FFT
+    assert filtros.PlanoConvolucao(filtros.kernel_gauss(32, sigma=5)).estrategia == filtros.ESTRATEGIA_FFT
+    assert filtros.kernel_gauss(32, sigma=5).sum() == 1
+
+def _convolucao_original(imagem, kernel):
+    """
+    Convolução com um acumulador de floats de 64 bits aplicando um elemento do kernel
+    de cada vez, como na função convolucao antes da escolha de estratégias
+    """
+    k_w, k_h = kernel.shape
+    f_w, f_h = imagem.shape[:2]
+    imagem = filtros.estender_com_zeros(imagem, ((k_w - 1) // 2, (k_h - 1) // 2))
+    saida  = np.zeros((f_w, f_h, *imagem.shape[2:]), dtype=float)
+    buffer = np.zeros(saida.shape, dtype=float)
+    for j in range(k_h):
+        for i in range(k_w):
+            np.multiply(kernel[i, j], imagem[i:(f_w + i), j:(f_h + j)], out=buffer, dtype=float)
+            saida += buffer
+    return np.clip(saida, 0, 255).astype(np.uint8)
+
+@pytest.mark.parametrize("tamanho, sigma", [(3, 1), (5, 1), (9, 2), (15, 3), (31, 5)])
+@pytest.mark.parametrize("estrategia", list(filtros.ESTRATEGIAS))
+@pytest.mark.parametrize("dimensoes", [(61, 83), (61, 83, 3)])
+def test_kernel_gauss_igual_convolucao_original(tamanho, sigma, estrategia, dimensoes):
+    kernel = filtros.kernel_gauss(tamanho, sigma=sigma)
+    esperado = _convolucao_original(_imagem(dimensoes), kernel)
+    for threads in (1, 2):
+        resultado = filtros.convolucao(_imagem(dimensoes), kernel, estrategia=estrategia, threads=threads)
+        assert np.array_equal(resultado, esperado)
+
+def test_kernels_de_inteiros_usam_estrategias_exatas():
+    assert filtros.PlanoConvolucao(KERNELS["inteiro_5x5"]).estrategia == filtros.ESTRATEGIA_FFT
+    assert filtros.PlanoConvolucao(KERNELS["separavel_inteiro"]).estrategia == filtros.ESTRATEGIA_SEPARAVEL
+
+def test_pipeline_igual_kernels_em_sequencia():
+    imagem  = _imagem()
+    kernels = [filtros.kernel_nitidez(peso=0.5), filtros.kernel_gauss(3), filtros.kernel_deteccao_borda()]
+    esperado = imagem
+    for kernel in kernels:
+        esperado = filtros.convolucao(esperado, kernel)
+
+    espaco = filtros.EspacoTrabalho()
+    pipeline = filtros.PipelineFiltros(kernels)
+    assert len(pipeline.planos) == len(kernels)
+    for _ in range(2):
+        assert np.array_equal(pipeline(imagem, espaco=espaco), esperado)
+
+def _correlacao_referencia(imagem, kernel):
+    """
+    Calcula a convolução (sem truncar o resultado) da imagem com o kernel usando
+    inteiros de 64 bits, estendendo a imagem com zeros da mesma forma que o módulo
+    """
+    k_w, k_h = kernel.shape
+    f_w, f_h = imagem.shape[:2]
+    x, y = (k_w - 1) // 2, (k_h - 1) // 2
+    estendida = np.zeros((f_w + k_w - 1, f_h + k_h - 1, *imagem.shape[2:]), dtype=np.int64)
+    estendida[x:(x + f_w), y:(y + f_h)] = imagem
+    soma = np.zeros(imagem.shape, dtype=np.int64)
+    for i in range(k_w):
+        for j in range(k_h):
+            soma += int(kernel[i, j]) * estendida[i:(i + f_w), j:(j + f_h)]
+    return soma
+
+def _imagens_extremas(kernel):
+    """
+    Gera imagens que atingem a maior e a menor soma possível da convolução com o kernel,
+    com 255 nos pixels multiplicados pelos valores positivos (ou negativos) do kernel
+    """
+    k_w, k_h = kernel.shape
+    for sinal in (1, -1):
+        padrao = np.where(sinal * kernel > 0, 255, 0).astype(np.uint8)
+        imagem = np.zeros((3 * k_w + 8, 3 * k_h + 8), dtype=np.uint8)
+        imagem[k_w:(2 * k_w), k_h:(2 * k_h)] = padrao
+        yield imagem
+
+# kernels de inteiros nos limites dos tipos do acumulador, com o maior valor
+# absoluto da convolução (255 vezes a soma dos valores absolutos) logo abaixo
+# ou logo acima do maior valor de um tipo inteiro de 16 bits
+KERNELS_LIMITE = {
+    "uint16_cheio": np.array([[28, 28, 28], [28, 33, 28], [28, 28, 28]]),
+    "uint32":       np.array([[28, 28, 28], [28, 34, 28], [28, 28, 28]]),
+    "int16":        np.array([[-16, -16, -16], [-16, 128, -16], [-16, -16, -16]]) // 2,
+    "int32":        np.array([[-16, -16, -16], [-16, 128, -16], [-16, -16, -16]]),
+    "grande":       np.array([[1 << 40, -(1 << 40)], [-(1 << 40), 1 << 40]]),
+}
+
+@pytest.mark.parametrize("nome", KERNELS_LIMITE)
+@pytest.mark.parametrize("estrategia", [None, filtros.ESTRATEGIA_DIRETA, filtros.ESTRATEGIA_FFT])
+def test_acumulador_sem_overflow(nome, estrategia):
+    kernel = KERNELS_LIMITE[nome]
+    tipo = np.dtype(filtros._tipo_acumulador(np.zeros(1, dtype=np.uint8), kernel))
+    for imagem in _imagens_extremas(kernel):
+        referencia = _correlacao_referencia(imagem, kernel)
+        # o tipo escolhido comporta os valores extremos da convolução
+        if tipo.kind in "iu":
+            assert np.iinfo(tipo).min <= referencia.min() and referencia.max() <= np.iinfo(tipo).max
+        if estrategia == filtros.ESTRATEGIA_FFT and tipo.kind == "f":
+            continue
+        resultado = filtros.convolucao(imagem, kernel, estrategia=estrategia)
+        assert np.array_equal(resultado, np.clip(referencia, 0, 255))
+
+def test_acumulador_nos_limites_dos_tipos():
+    imagem = np.zeros(1, dtype=np.uint8)
+    assert filtros._tipo_acumulador(imagem, KERNELS_LIMITE["uint16_cheio"]) == np.uint16
+    assert filtros._tipo_acumulador(imagem, KERNELS_LIMITE["uint32"]) == np.uint32
+    assert filtros._tipo_acumulador(imagem, KERNELS_LIMITE["int16"]) == np.int16
+    assert filtros._tipo_acumulador(imagem, KERNELS_LIMITE["int32"]) == np.int32
+
+def test_acumulador_float32_apenas_com_kernels_de_valores_inteiros():
+    imagem = np.zeros(1, dtype=np.uint8)
+    assert filtros._tipo_acumulador(imagem, filtros.kernel_deteccao_borda().astype(float)) == np.float32
+    assert filtros._tipo_acumulador(imagem, filtros.kernel_gauss(3)) == np.float64
+    assert filtros._tipo_acumulador(imagem, filtros.kernel_nitidez(peso=0.5)) == np.float64
+    assert filtros._tipo_acumulador(imagem, np.full((3, 3), float(1 << 20))) == np.float64
+
+def _luminancia_original(imagem):
+    """
+    Luminância em floats truncada para uint8, como na função melhorar_contraste
+    antes do cálculo em ponto fixo
+    """
+    return np.dot(imagem, (0.114, 0.587, 0.299)).astype(np.uint8)
+
+def _contraste_original(imagem, Yi):
+    """
+    Melhoria de contraste em floats da função melhorar_contraste antes das tabelas de
+    correção, a partir da luminância 'Yi', com os valores fora do intervalo saturados
+    """
+    kr, kg, kb = (0.299, 0.587, 0.114)
+    ymin, ymax = Yi.min(), Yi.max()
+    Yf = ((255 * (Yi - ymin).astype(int)) / (ymax - ymin)).astype(np.uint8)
+    dR = dB = dY = np.subtract(Yf, Yi, dtype=np.int16)
+    dG = dY * (1 - kr - kb) / kg
+    np.clip(dG, -255, 255, out=dG)
+    dG = dG.astype(np.int16)
+    resultado = imagem.astype(np.int16)
+    np.add(dB, resultado[..., 0], out=resultado[..., 0])
+    np.add(dG, resultado[..., 1], out=resultado[..., 1])
+    np.add(dR, resultado[..., 2], out=resultado[..., 2])
+    return np.clip(resultado, 0, 255).astype(np.uint8)
+
+def test_luminancia_em_ponto_fixo_igual_luminancia_original():
+    # todas as cores BGR, em blocos para limitar a memória usada
+    niveis = np.arange(256, dtype=np.uint8)
+    diferentes = 0
+    for inicio in range(0, 256, 32):
+        cores = np.stack(np.meshgrid(niveis[inicio:inicio + 32], niveis, niveis, indexing="ij"), axis=-1)
+        Yi = filtros._luminancia(cores)
+        assert Yi.dtype == np.int32
+        diferenca = Yi - _luminancia_original(cores)
+        assert np.abs(diferenca).max() <= 1
+        diferentes += np.count_nonzero(diferenca)
+    # os floats só diferem do ponto fixo por erros de arredondamento
+    assert diferentes < 0.01 * 256 ** 3
+
+@pytest.mark.parametrize("intervalo", [(0, 256), (40, 200), (100, 120)])
+def test_contraste_igual_contraste_original(intervalo):
+    for semente in range(5):
+        imagem = np.random.default_rng(semente).integers(*intervalo, (61, 83, 3), dtype=np.uint8)
+        Yi = filtros._luminancia(imagem)
+        assert np.abs(Yi - _luminancia_original(imagem)).max() <= 1
+        # com a mesma luminância, as tabelas de correção são iguais ao cálculo em floats
+        esperado = _contraste_original(imagem, Yi.astype(np.uint8))
+        assert np.array_equal(filtros.melhorar_contraste(imagem), esperado)
+
+def _imagem_faixa(inferior, superior, dimensoes=(48, 64, 3), semente=0):
+    """
+    Gera uma imagem aleatória do tipo uint8 com os valores no intervalo fornecido
+    """
+    return np.random.default_rng(semente).integers(inferior, superior, dimensoes, dtype=np.uint8)
+
+def test_contraste_temporal_primeiro_frame_igual_melhorar_contraste():
+    # com todos os pixels e os percentis extremos, os limites do primeiro
+    # frame são a luminância mínima e máxima, como em melhorar_contraste
+    contraste = filtros.ContrasteTemporal(passo=1, percentis=(0, 100))
+    for semente in range(3):
+        imagem = _imagem_faixa(30, 220, semente=semente)
+        contraste.reiniciar()
+        Yi = filtros._luminancia(imagem)
+        assert np.array_equal(contraste(imagem), filtros.melhorar_contraste(imagem))
+        assert contraste.limites == (Yi.min(), Yi.max())
+
+def test_contraste_temporal_converge_em_sequencia_constante():
+    contraste = filtros.ContrasteTemporal(intervalo=2, suavizacao=0.25)
+    contraste(_imagem_faixa(0, 256))
+    inicial = contraste.limites
+    imagem = _imagem_faixa(80, 170, semente=1)
+    alvo = contraste._estimar_limites(imagem)
+    for atualizacao in range(1, 41):
+        for _ in range(contraste.intervalo):
+            resultado = contraste(imagem)
+        # a distância até os limites do frame diminui pelo peso dos limites antigos
+        fator = (1 - contraste.suavizacao) ** atualizacao
+        for limite, valor_alvo, valor_inicial in zip(contraste.limites, alvo, inicial):
+            assert abs(limite - valor_alvo) <= fator * abs(valor_inicial - valor_alvo) + 1e-9
+    # após convergir, a tabela é reutilizada e o resultado é o de um filtro novo
+    tabela = contraste._tabela
+    assert contraste._limites_tabela == alvo
+    assert np.array_equal(contraste(imagem), resultado)
+    assert contraste._tabela is tabela
+    assert np.array_equal(resultado, filtros.ContrasteTemporal()(imagem))
+
+def test_contraste_temporal_reiniciado_ao_mudar_resolucao():
+    contraste = filtros.ContrasteTemporal()
+    for semente in range(7):
+        contraste(_imagem_faixa(0, 256, semente=semente))
+    # os limites do frame com outra resolução não são suavizados com os anteriores
+    imagem = _imagem_faixa(80, 170, (36, 52, 3), semente=1)
+    assert np.array_equal(contraste(imagem), filtros.ContrasteTemporal()(imagem))
+    assert contraste.limites == contraste._estimar_limites(imagem)
+    assert contraste._frames == 1
+
+@pytest.mark.parametrize("nome", ["gauss_3", "gauss_15", "nitidez", "inteiro_5x5", "separavel_inteiro"])
+@pytest.mark.parametrize("dimensoes", [(7, 37, 45), (7, 37, 45, 3)])
+def test_convolucao_em_lote_igual_convolucao_por_frame(nome, dimensoes, monkeypatch):
+    # blocos de poucos frames, para que o lote seja dividido em vários blocos
+    monkeypatch.setattr(filtros, "BYTES_BLOCO_LOTE", 3 * 37 * 45)
+    kernel = KERNELS[nome]
+    lote = _imagem(dimensoes)
+    esperado = np.stack([filtros.convolucao(frame, kernel) for frame in lote])
+    espaco = filtros.EspacoTrabalho()
+    for threads in (1, 3):
+        resultado = filtros.convolucao(lote, kernel, threads=threads, espaco=espaco, lote=True)
+        assert np.array_equal(resultado, esperado)
+
+def test_espaco_de_trabalho_do_lote_com_frames_no_eixo_externo():
+    espaco = filtros.EspacoTrabalho()
+    array = filtros._EspacoLote(espaco).array("teste", (37, 45, 7, 3), np.int32)
+    # o array tem os eixos na ordem das imagens do bloco, mas os frames em sequência na memória
+    assert array.shape == (37, 45, 7, 3)
+    assert np.moveaxis(array, 2, 0).flags.c_contiguous
+    assert espaco.tamanho == array.nbytes
+
+def test_pipeline_em_lote_igual_pipeline_por_frame():
+    kernels = [filtros.kernel_nitidez(peso=0.5), filtros.kernel_gauss(3)]
+    lote = _imagem((6, 37, 45, 3))
+    # o filtro de contraste com estado recebe os frames do lote em ordem
+    por_frame = filtros.PipelineFiltros(kernels, contraste=filtros.ContrasteTemporal(intervalo=2))
+    esperado = np.stack([por_frame(frame).copy() for frame in lote])
+    pipeline = filtros.PipelineFiltros(kernels, contraste=filtros.ContrasteTemporal(intervalo=2))
+    assert np.array_equal(pipeline(lote, espaco=filtros.EspacoTrabalho(), lote=True), esperado)
+
+def test_conversao_para_luminancia_igual_luminancia_em_ponto_fixo():
+    imagem = _imagem()
+    assert np.array_equal(filtros.converter_luminancia(imagem), filtros._luminancia(imagem))
+    lote = _imagem((4, 37, 45, 3))
+    assert np.array_equal(filtros.converter_luminancia(lote, lote=True), filtros._luminancia(lote))
+
+@pytest.mark.parametrize("contraste", [False, True])
+@pytest.mark.parametrize("lote", [False, True])
+def test_pipeline_na_luminancia_igual_conversao_seguida_dos_kernels(contraste, lote):
+    kernels = [filtros.kernel_gauss(3), filtros.kernel_deteccao_borda()]
+    imagem = _imagem((4, 37, 45, 3) if lote else (97, 131, 3))
+    entrada = filtros.melhorar_contraste(imagem, lote=lote) if contraste else imagem
+    cinza = filtros.converter_luminancia(entrada, lote=lote)
+    esperado = filtros.PipelineFiltros(kernels)(cinza, lote=lote)
+    pipeline = filtros.PipelineFiltros(kernels, contraste=contraste, luminancia=True)
+    espaco = filtros.EspacoTrabalho()
+    for _ in range(2):
+        resultado = pipeline(imagem, espaco=espaco, lote=lote)
+        assert resultado.shape == imagem.shape[:-1]
+        assert np.array_equal(resultado, esperado)
+
+@pytest.mark.parametrize("nome", ["gauss_3", "inteiro_5x5", "nitidez", "separavel_inteiro"])
+def test_espaco_de_trabalho_reutilizado_entre_resolucoes_com_threads(nome):
+    # resoluções com quantidades diferentes de faixas, alternadas no mesmo espaço de trabalho
+    kernel = KERNELS[nome]
+    plano = filtros.PlanoConvolucao(kernel)
+    espaco = filtros.EspacoTrabalho()
+    dimensoes = [(97, 131, 3), (200, 64), (97, 131, 3), (64, 301, 3), (200, 64), (31, 40, 3)]
+    saidas = {}
+    for semente, dimensao in enumerate(dimensoes):
+        imagem = _imagem(dimensao, semente)
+        esperado = filtros.convolucao(imagem, kernel, threads=1)
+        resultado = plano(imagem, threads=3, espaco=espaco)
+        assert np.array_equal(resultado, esperado)
+        # o resultado de cada resolução é sempre escrito no mesmo array do espaço de trabalho
+        assert saidas.setdefault(dimensao, resultado) is resultado
+    tamanho = espaco.tamanho
+    for dimensao in dimensoes:
+        plano(_imagem(dimensao), threads=3, espaco=espaco)
+    assert espaco.tamanho == tamanho
+
+def test_pipeline_com_threads_reutiliza_espaco_entre_resolucoes():
+    kernels = [filtros.kernel_nitidez(peso=0.5), filtros.kernel_gauss(3), filtros.kernel_deteccao_borda()]
+    pipeline = filtros.PipelineFiltros(kernels, contraste=True, threads=3)
+    sequencial = filtros.PipelineFiltros(kernels, contraste=True, threads=1)
+    espaco = filtros.EspacoTrabalho()
+    for semente, dimensao in enumerate([(97, 131, 3), (150, 70, 3), (97, 131, 3)]):
+        imagem = _imagem(dimensao, semente)
+        assert np.array_equal(pipeline(imagem, espaco=espaco), sequencial(imagem))
@@ -0,0 +1,112 @@
+"""
+Testes dos histogramas e do resumo das medições do módulo cntexercicios.instrumentacao
+"""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from cntexercicios.instrumentacao import (
+    ESTAGIO_FILTRAGEM, ESTAGIO_INFERENCIA, HistogramaTempos, Instrumentacao
+)
+
+def _intervalo(duracao):
+    """
+    Retorna o índice do intervalo do histograma em que a duração fornecida é registrada
+    """
+    histograma = HistogramaTempos()
+    histograma.registrar(duracao)
+    return histograma.contagens.index(1)
+
+def test_duracoes_pequenas_em_intervalos_exatos():
+    # durações menores que 2 * SUBDIVISOES têm um intervalo por nanossegundo
+    for duracao in range(2 * HistogramaTempos.SUBDIVISOES):
+        assert _intervalo(duracao) == duracao
+        histograma = HistogramaTempos()
+        histograma.registrar(duracao)
+        assert histograma.percentil(50) == histograma.percentil(100) == duracao
+    # durações negativas são registradas como zero
+    assert _intervalo(-5) == 0
+
+def test_intervalos_nas_potencias_de_dois():
+    histograma = HistogramaTempos()
+    subdivisoes = HistogramaTempos.SUBDIVISOES
+    for expoente in range(3, 48):
+        potencia = 1 << expoente
+        largura  = potencia // subdivisoes
+        indice   = _intervalo(potencia)
+        # cada potência de dois começa um novo grupo de SUBDIVISOES intervalos
+        assert indice == (expoente - 2) * subdivisoes
+        assert _intervalo(potencia - 1) == indice - 1
+        assert _intervalo(potencia + largura - 1) == indice
+        assert _intervalo(potencia + largura) == indice + 1
+        assert histograma._limite_intervalo(indice) == potencia + largura
+        assert histograma._limite_intervalo(indice - 1) == potencia
+
+@pytest.mark.parametrize("semente", range(5))
+def test_percentil_limitado_pelo_intervalo(semente):
+    gerador = np.random.default_rng(semente)
+    duracoes = [int(valor) for valor in gerador.lognormal(14, 2, 2000)] + [0, 3, 8, 1 << 20]
+    histograma = HistogramaTempos()
+    for duracao in duracoes:
+        histograma.registrar(duracao)
+    assert histograma.quantidade == len(duracoes)
+    assert histograma.total == sum(duracoes)
+    assert histograma.maximo == max(duracoes)
+    assert histograma.media() == sum(duracoes) / len(duracoes)
+
+    ordenadas = sorted(duracoes)
+    for p in (0, 1, 50, 90, 95, 99, 99.9, 100):
+        # percentil pelo posto mais próximo, que está no intervalo do percentil estimado
+        exato = ordenadas[max(1, math.ceil(p / 100 * len(ordenadas))) - 1]
+        estimado = histograma.percentil(p)
+        # o limite superior do intervalo não excede a duração em mais que a largura
+        # do intervalo, de 1/SUBDIVISOES da duração (ou de 1 ns nas menores durações)
+        largura = max(1, exato // HistogramaTempos.SUBDIVISOES)
+        assert exato <= estimado <= min(exato + largura, histograma.maximo)
+
+def test_histograma_vazio():
+    histograma = HistogramaTempos()
+    assert histograma.percentil(50) is None
+    assert histograma.media() is None
+
+def test_resumo_salvo_em_json(tmp_path):
+    medicoes = Instrumentacao()
+    for duracao in range(1, 101):
+        medicoes.registrar(ESTAGIO_FILTRAGEM, duracao * 1000)
+    medicoes.registrar(ESTAGIO_INFERENCIA, 20_000_000)
+    for pulada in (False, True, True, False):
+        medicoes.registrar_inferencia(pulada)
+    medicoes.descartados = 3
+
+    arquivo = tmp_path / "metricas.json"
+    medicoes.salvar(str(arquivo))
+    with open(arquivo, encoding="utf-8") as entrada:
+        salvo = json.load(entrada)
+
+    # a duração e a taxa de frames dependem do tempo decorrido até o resumo
+    assert salvo.keys() == {
+        "frames", "descartados", "puladas", "taxa_puladas", "duracao_s", "fps", "estagios"
+    }
+    assert salvo["duracao_s"] > 0
+    assert (salvo["frames"], salvo["descartados"], salvo["puladas"], salvo["taxa_puladas"]) == (0, 3, 2, 0.5)
+
+    histograma = medicoes.histogramas[ESTAGIO_FILTRAGEM]
+    assert salvo["estagios"][ESTAGIO_FILTRAGEM] == {
+        "amostras": 100,
+        "p50_ms":   histograma.percentil(50) / 1e6,
+        "p95_ms":   histograma.percentil(95) / 1e6,
+        "p99_ms":   histograma.percentil(99) / 1e6,
+        "media_ms": 50.5 * 1000 / 1e6,
+        "max_ms":   0.1
+    }
+    assert 0.050 <= salvo["estagios"][ESTAGIO_FILTRAGEM]["p50_ms"] <= 0.050 * 9 / 8
+    inferencia = salvo["estagios"][ESTAGIO_INFERENCIA]
+    assert inferencia["p50_ms"] == inferencia["p99_ms"] == inferencia["max_ms"] == 20.0
+    # o resumo salvo é o mesmo retornado pelo método resumo, exceto pelos valores dependentes do tempo
+    resumo = medicoes.resumo()
+    for chave in ("duracao_s", "fps"):
+        del resumo[chave], salvo[chave]
+    assert salvo == resumo
@@ -0,0 +1,27 @@
+"""
+Testes da conversão dos pontos do corpo do módulo cntexercicios.landmarks
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from cntexercicios.landmarks import (
+    QTD_LANDMARKS, VALORES_LANDMARK, landmarks_para_array, array_para_landmarks
+)
+
+def test_conversao_ida_e_volta():
+    valores = np.random.default_rng(0).random((QTD_LANDMARKS, VALORES_LANDMARK)).astype(np.float32)
+    pontos = array_para_landmarks(valores)
+    assert len(pontos.landmark) == QTD_LANDMARKS
+    assert pontos.landmark[5].visibility == valores[5, 3]
+
+    saida = np.empty((QTD_LANDMARKS, VALORES_LANDMARK))
+    assert landmarks_para_array(pontos, saida) is saida
+    assert np.array_equal(saida, valores)
+
+def test_saida_com_dimensoes_invalidas():
+    pontos = array_para_landmarks(np.zeros((QTD_LANDMARKS, VALORES_LANDMARK)))
+    with pytest.raises(ValueError):
+        landmarks_para_array(pontos, np.empty((QTD_LANDMARKS, 3)))
@@ -0,0 +1,18 @@
+"""
+Testes da contagem em lote do módulo cntexercicios.lote
+"""
+
+import pytest
+
+from cntexercicios.lote import contar_lote
+
+def test_parametros_verificados_na_chamada():
+    with pytest.raises(ValueError):
+        contar_lote("exercicio_desconhecido", [])
+    with pytest.raises(ValueError):
+        contar_lote("polichinelos", [], processos=0)
+    with pytest.raises(TypeError):
+        contar_lote("polichinelos", [], processos="2")
+
+def test_sem_videos():
+    assert list(contar_lote("polichinelos", [])) == []
@@ -0,0 +1,170 @@
+"""
+Testes dos leitores de frames do módulo cntexercicios.video
+"""
+
+import time
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from cntexercicios import video
+from cntexercicios.video import (
+    LeitorFrames, LeitorFramesAntecipado, LeitorFramesRecentes, abrir_video, extrair_frames
+)
+
+QTD_FRAMES = 40
+
+@pytest.fixture(scope="module")
+def arquivo_video(tmp_path_factory):
+    """
+    Cria um vídeo curto com o brilho de cada frame dependente do índice dele
+    """
+    caminho = str(tmp_path_factory.mktemp("video") / "frames.avi")
+    escritor = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    if not escritor.isOpened():
+        pytest.skip("codificador MJPG indisponível")
+    for indice in range(QTD_FRAMES):
+        escritor.write(np.full((48, 64, 3), indice * 6, dtype=np.uint8))
+    escritor.release()
+    return caminho
+
+def _ler_todos(caminho, **kwargs):
+    """
+    Lê todos os frames do vídeo com a função extrair_frames, retornando cópias deles
+    """
+    with abrir_video(caminho) as captura:
+        return [(tempo, frame.copy()) for tempo, frame in extrair_frames(captura, com_tempo=True, **kwargs)]
+
+@pytest.mark.parametrize("profundidade", [1, 4])
+def test_leitura_antecipada_igual_leitura_sincrona(arquivo_video, profundidade):
+    esperado = _ler_todos(arquivo_video)
+    assert len(esperado) == QTD_FRAMES
+    lidos = _ler_todos(arquivo_video, antecipar=profundidade)
+    assert len(lidos) == len(esperado)
+    for (tempo, frame), (tempo_esperado, frame_esperado) in zip(lidos, esperado):
+        assert tempo == tempo_esperado
+        assert np.array_equal(frame, frame_esperado)
+
+def _pular_e_ler(leitor, passos):
+    """
+    Alterna entre ler um frame e pular a quantidade de frames de cada passo,
+    retornando o brilho médio e a posição do leitor após cada frame lido
+    """
+    resultado = []
+    for passo in passos:
+        frame = next(leitor)
+        resultado.append((round(float(frame.mean()) / 6), leitor.posicao))
+        leitor.pular(passo)
+    return resultado
+
+def test_pular_frames_durante_leitura_antecipada(arquivo_video):
+    passos = [0, 5, 1, 0, 10, 3]
+    with abrir_video(arquivo_video) as captura:
+        esperado = _pular_e_ler(LeitorFrames(captura), passos)
+    with abrir_video(arquivo_video) as captura:
+        leitor = LeitorFramesAntecipado(captura, profundidade=4)
+        # espera a fila encher para que os frames pulados já tenham sido lidos
+        time.sleep(0.1)
+        assert _pular_e_ler(leitor, passos) == esperado
+    assert esperado == [(0, 1), (1, 2), (7, 8), (9, 10), (10, 11), (21, 22)]
+
+@pytest.mark.parametrize("classe", [LeitorFramesAntecipado, LeitorFramesRecentes])
+def test_encerramento_pelo_contexto_no_meio_do_video(arquivo_video, classe):
+    with abrir_video(arquivo_video) as captura:
+        leitor = classe(captura)
+        next(leitor)
+        assert leitor in video._leitores_ativos[id(captura)]
+    # a thread é encerrada antes da captura ser fechada, e o leitor termina
+    assert not leitor._thread.is_alive()
+    assert id(captura) not in video._leitores_ativos
+    with pytest.raises(StopIteration):
+        next(leitor)
+
+class _CapturaFalsa:
+    """
+    Dispositivo de captura falso que captura um frame a cada 'intervalo' segundos,
+    com o índice de cada frame como o seu único valor
+    """
+
+    def __init__(self, frames, intervalo=0.002):
+        self.frames    = frames
+        self.intervalo = intervalo
+        self.indice    = -1
+
+    def get(self, propriedade):
+        return 0
+
+    def grab(self):
+        time.sleep(self.intervalo)
+        if self.indice + 1 >= self.frames:
+            return False
+        self.indice += 1
+        return True
+
+    def retrieve(self):
+        return True, np.array([self.indice])
+
+def test_frames_descartados_no_modo_de_baixa_latencia():
+    captura = _CapturaFalsa(200)
+    leitor = LeitorFramesRecentes(captura, com_tempo=True)
+    indices, tempos = [], []
+    for tempo, frame in leitor:
+        indices.append(int(frame[0]))
+        tempos.append(tempo)
+        # processamento mais lento que a captura
+        time.sleep(0.01)
+    # os frames retornados são os mais recentes, em ordem, e todo frame
+    # capturado foi retornado ou contado como descartado
+    assert indices == sorted(set(indices))
+    assert tempos == sorted(tempos)
+    assert leitor.descartados > 0
+    assert len(indices) + leitor.descartados == captura.frames
+
+def test_espera_interrompida_ao_fechar_leitor():
+    # a captura demora para entregar o frame, e o leitor é fechado por outra thread
+    captura = _CapturaFalsa(10, intervalo=0.5)
+    leitor = LeitorFramesRecentes(captura)
+    resultado = []
+
+    def ler():
+        try:
+            resultado.append(next(leitor))
+        except StopIteration:
+            resultado.append(None)
+        # chamadas após o fechamento terminam sem esperar pela captura
+        inicio = time.monotonic()
+        with pytest.raises(StopIteration):
+            next(leitor)
+        resultado.append(time.monotonic() - inicio)
+
+    consumidor = threading.Thread(target=ler)
+    consumidor.start()
+    time.sleep(0.05)
+    leitor.fechar()
+    consumidor.join(2)
+    assert not consumidor.is_alive() and len(resultado) == 2
+    assert resultado[1] < 0.05
+
+@pytest.mark.parametrize("tamanho", [1, 16, QTD_FRAMES])
+def test_lotes_iguais_aos_frames_em_sequencia(arquivo_video, tamanho):
+    esperado = [frame for _, frame in _ler_todos(arquivo_video)]
+    with abrir_video(arquivo_video) as captura:
+        lotes = [lote.copy() for lote in video.extrair_lotes(captura, tamanho)]
+    # todos os lotes têm 'tamanho' frames, exceto o último
+    assert [len(lote) for lote in lotes[:-1]] == [tamanho] * (len(lotes) - 1)
+    assert 0 < len(lotes[-1]) <= tamanho
+    assert np.array_equal(np.concatenate(lotes), np.stack(esperado))
+
+def test_lotes_com_preprocessamento(arquivo_video):
+    with abrir_video(arquivo_video) as captura:
+        lotes = [lote.copy() for lote in video.extrair_lotes(captura, 16, lambda frame: frame[::2, ::2])]
+    esperado = [frame[::2, ::2] for _, frame in _ler_todos(arquivo_video)]
+    assert np.array_equal(np.concatenate(lotes), np.stack(esperado))
+
+    # frames preprocessados com dimensões diferentes não cabem no lote
+    dimensoes = iter(range(QTD_FRAMES, 0, -1))
+    with abrir_video(arquivo_video) as captura:
+        with pytest.raises(RuntimeError):
+            list(video.extrair_lotes(captura, 16, lambda frame: frame[:next(dimensoes)]))